@@ -0,0 +1,318 @@
+import numpy as np
+import pandas as pd
+
+from config.settings import CAPITAL_USDT, CAPITAL_PERCENTAGE_PER_TRADE, LEVERAGE
+
+# عمولة Taker في Binance Futures
+FEE_RATE = 0.0004
+
+# أول نافذة بحث عن الخروج بعد الدخول، وتتضاعف حتى نهاية البيانات
+SCAN_CHUNK = 64
+
+# عدد إشارات الدخول التي تُفحص معًا في المسح الأولي (يحد من حجم المصفوفات المؤقتة)
+SCAN_BATCH = 16384
+
+# أسعار مرجعية لاستنتاج نسب SL/TP من get_stop_loss_take_profit
+PROBE_PRICES = (10_000.0, 1_000_000.0)
+
+TRADE_COLUMNS = [
+    "entry_time", "exit_time", "side", "entry_price", "exit_price", "sl", "tp",
+    "quantity", "pnl", "fees", "return_pct", "bars", "reason",
+]
+
+# رموز سبب الخروج في المصفوفات
+REASONS = np.array(["SL", "TP", "EXIT", "END"])
+SL, TP, EXIT, END = range(4)
+
+
+def _first_tp(levels):
+    tp = levels.get("tp")
+    if isinstance(tp, (list, tuple)):
+        tp = tp[0] if tp else None
+    return tp
+
+
+def _level_ratios(strategy, data):
+    """
+    نسبة مسافة SL و TP إلى سعر الدخول إن كانت الاستراتيجية تحسبها كنسبة ثابتة من السعر
+    (كل الاستراتيجيات الحالية). تُستدعى بتاريخ فارغ بحيث تفشل أي استراتيجية تعتمد على
+    البيانات، وعندها يعيد None وتُحسب المستويات لكل صفقة على حدة.
+    """
+    ratios = []
+    try:
+        for price in PROBE_PRICES:
+            levels = strategy.get_stop_loss_take_profit(data.iloc[:0], price) or {}
+            sl, tp = levels.get("sl"), _first_tp(levels)
+            ratios.append((
+                np.nan if sl is None else abs(price - sl) / price,
+                np.nan if tp is None else abs(tp - price) / price,
+            ))
+    except Exception:
+        return None
+    (sl_a, tp_a), (sl_b, tp_b) = ratios
+    if not (np.isclose(sl_a, sl_b, rtol=1e-6, equal_nan=True) and np.isclose(tp_a, tp_b, rtol=1e-6, equal_nan=True)):
+        return None
+    return sl_b, tp_b
+
+
+def _place_levels(side, entry_price, sl_ratio, tp_ratio):
+    """
+    مستويات SL/TP باتجاه الصفقة. الاستراتيجيات تحسبها لصفقة شراء فقط، فنعكسها للبيع.
+    غياب أي منهما يصبح ±inf حتى لا تتحقق المقارنة أبدًا.
+    """
+    sl = np.where(np.isnan(sl_ratio), -side * np.inf, entry_price * (1 - side * sl_ratio))
+    tp = np.where(np.isnan(tp_ratio), side * np.inf, entry_price * (1 + side * tp_ratio))
+    return sl, tp
+
+
+def _trade_levels(strategy, data, bar, side, entry_price):
+    """SL/TP لصفقة واحدة من get_stop_loss_take_profit مع التاريخ حتى شمعة الدخول."""
+    levels = strategy.get_stop_loss_take_profit(data.iloc[: bar + 1], entry_price) or {}
+    sl, tp = levels.get("sl"), _first_tp(levels)
+    sl_ratio = np.nan if sl is None else abs(entry_price - sl) / entry_price
+    tp_ratio = np.nan if tp is None else abs(tp - entry_price) / entry_price
+    sl, tp = _place_levels(side, entry_price, sl_ratio, tp_ratio)
+    return float(sl), float(tp)
+
+
+def _stop_fill(side, sl, open_):
+    # فجوة سعرية تتجاوز SL تُنفذ بسعر الافتتاح، و TP أمر محدد يُنفذ بسعره
+    return np.where(side > 0, np.minimum(open_, sl), np.maximum(open_, sl))
+
+
+def _scan_window(entries, sides, sl, tp, open_, high, low, exit_signal, width):
+    """
+    يبحث لكل إشارة دخول في الشموع الـ width التالية دفعة واحدة (مصفوفة ثنائية الأبعاد).
+    إذا لُمس SL و TP في نفس الشمعة نفترض أن SL نُفذ أولاً.
+    يعيد (exit_bar, exit_price, reason) مع exit_bar = -1 لما لم يُحسم داخل النافذة.
+    """
+    n = len(high)
+    m = len(entries)
+    exit_bar = np.full(m, -1, dtype=np.int64)
+    exit_price = np.full(m, np.nan)
+    reason = np.full(m, END, dtype=np.int8)
+
+    for lo in range(0, m, SCAN_BATCH):
+        batch = slice(lo, lo + SCAN_BATCH)
+        bars = entries[batch, None] + np.arange(1, width + 1)
+        inside = bars < n
+        bars = np.minimum(bars, n - 1)
+        long = (sides[batch] > 0)[:, None]
+        level_sl, level_tp = sl[batch, None], tp[batch, None]
+        bar_high, bar_low = high[bars], low[bars]
+        hit_sl = np.where(long, bar_low <= level_sl, bar_high >= level_sl) & inside
+        hit_tp = np.where(long, bar_high >= level_tp, bar_low <= level_tp) & inside
+        hit = hit_sl | hit_tp
+        if exit_signal is not None:
+            hit |= exit_signal[bars] & inside
+
+        found = hit.any(axis=1)
+        rows = np.flatnonzero(found)
+        first = hit[rows].argmax(axis=1)
+        bar = bars[rows, first]
+        took_sl = hit_sl[rows, first]
+        took_tp = hit_tp[rows, first] & ~took_sl
+        rows += lo
+        exit_bar[rows] = bar
+        reason[rows] = np.where(took_sl, SL, np.where(took_tp, TP, EXIT))
+        exit_price[rows] = np.where(
+            took_sl, _stop_fill(sides[rows], sl[rows], open_[bar]), np.where(took_tp, tp[rows], np.nan))
+
+    # الإشارات التي غطت نافذتها بقية البيانات دون خروج تُغلق على آخر شمعة
+    exit_bar[(exit_bar < 0) & (entries + width >= n - 1)] = n - 1
+    return exit_bar, exit_price, reason
+
+
+def _find_exit(side, start, sl, tp, open_, high, low, exit_signal):
+    """
+    أول شمعة من start يلمس فيها السعر SL أو TP أو تظهر إشارة خروج، لصفقة واحدة.
+    البحث على دفعات متضاعفة الحجم بعمليات مصفوفات بدل المرور شمعة بشمعة.
+    """
+    n = len(high)
+    chunk = SCAN_CHUNK
+    while start < n:
+        stop = min(start + chunk, n)
+        if side > 0:
+            hit_sl = low[start:stop] <= sl
+            hit_tp = high[start:stop] >= tp
+        else:
+            hit_sl = high[start:stop] >= sl
+            hit_tp = low[start:stop] <= tp
+        hit = hit_sl | hit_tp
+        if exit_signal is not None:
+            hit |= exit_signal[start:stop]
+        if hit.any():
+            offset = int(hit.argmax())
+            i = start + offset
+            if hit_sl[offset]:
+                return i, float(_stop_fill(side, sl, open_[i])), SL
+            if hit_tp[offset]:
+                return i, tp, TP
+            return i, np.nan, EXIT
+        start = stop
+        chunk *= 2
+    return n - 1, np.nan, END
+
+
+def _summary(trades, equity, initial_balance):
+    pnl = trades["pnl"].to_numpy()
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl < 0]
+    gross_loss = -losses.sum()
+    peak = np.maximum.accumulate(equity)
+    drawdown = (peak - equity) / peak
+    final_balance = float(equity[-1]) if len(equity) else initial_balance
+    return {
+        "trades": len(pnl),
+        "wins": len(wins),
+        "losses": len(losses),
+        "win_rate": len(wins) / len(pnl) * 100 if len(pnl) else 0.0,
+        "net_profit": float(pnl.sum()),
+        "total_fees": float(trades["fees"].sum()),
+        "profit_factor": float(wins.sum() / gross_loss) if gross_loss > 0 else float("inf") if len(wins) else 0.0,
+        "max_drawdown_pct": float(drawdown.max() * 100) if len(drawdown) else 0.0,
+        "final_balance": final_balance,
+        "return_pct": (final_balance / initial_balance - 1) * 100,
+    }
+
+
+def _equity_curve(close, trades, initial_balance):
+    """
+    رصيد محسوب على سعر الإغلاق لكل شمعة: الأرباح المحققة تراكمية
+    والصفقة المفتوحة تُقيَّم على سعر الإغلاق دون حلقات.
+    """
+    n = len(close)
+    realized = np.zeros(n)
+    if len(trades) == 0:
+        return realized + initial_balance
+
+    entry_bar = trades["entry_bar"]
+    exit_bar = trades["exit_bar"]
+    np.add.at(realized, exit_bar, trades["pnl"])
+    equity = initial_balance + np.cumsum(realized)
+
+    # الشموع من الدخول حتى ما قبل الخروج تحمل ربحًا غير محقق
+    lengths = exit_bar - entry_bar
+    held = lengths > 0
+    lengths = lengths[held]
+    if len(lengths):
+        starts = np.cumsum(lengths) - lengths
+        trade = np.repeat(np.arange(len(lengths)), lengths)
+        bars = np.repeat(entry_bar[held], lengths) + np.arange(lengths.sum()) - starts[trade]
+        side = trades["side"][held][trade]
+        quantity = trades["quantity"][held][trade]
+        entry_price = trades["entry_price"][held][trade]
+        entry_fee = trades["entry_fee"][held][trade]
+        equity[bars] += side * quantity * (close[bars] - entry_price) - entry_fee
+    return equity
+
+
+def run_backtest(data, strategy, initial_balance=CAPITAL_USDT, capital_pct=CAPITAL_PERCENTAGE_PER_TRADE,
+                 leverage=LEVERAGE, fee_rate=FEE_RATE, use_exit_signals=False):
+    """
+    اختبار استراتيجية على بيانات تاريخية (DataFrame بأعمدة open/high/low/close/volume).
+
+    الإشارات تأتي من strategy.generate_signals دفعة واحدة. الدخول على إغلاق شمعة الإشارة
+    بحجم ثابت مثل get_trade_quantity، ويُراقَب SL/TP من الشمعة التالية. صفقة واحدة مفتوحة
+    في كل وقت. إشارات الخروج (should_exit_trade) اختيارية لأن التنفيذ الحي لا يستخدمها.
+
+    يعيد {"trades": DataFrame, "equity": Series, "summary": dict}.
+    """
+    open_ = data["open"].to_numpy(dtype=np.float64)
+    high = data["high"].to_numpy(dtype=np.float64)
+    low = data["low"].to_numpy(dtype=np.float64)
+    close = data["close"].to_numpy(dtype=np.float64)
+    n = len(close)
+
+    signals = strategy.generate_signals(data)
+    action = np.asarray(signals["action"])
+    exit_signal = np.asarray(signals["exit"], dtype=bool) if use_exit_signals else None
+    notional = initial_balance * capital_pct / 100.0 * leverage
+
+    entries = np.flatnonzero(action)
+    m = len(entries)
+    sides = action[entries].astype(np.int64)
+    entry_price = close[entries]
+
+    # مسح أولي لكل الإشارات دفعة واحدة؛ معظم الصفقات تُحسم داخل أول SCAN_CHUNK شمعة
+    ratios = _level_ratios(strategy, data)
+    if ratios is not None:
+        sl, tp = _place_levels(sides, entry_price, *ratios)
+        exit_bar, exit_price, reason = _scan_window(entries, sides, sl, tp, open_, high, low, exit_signal, SCAN_CHUNK)
+        scanned = SCAN_CHUNK
+    else:
+        sl, tp = np.full(m, np.nan), np.full(m, np.nan)
+        exit_bar, exit_price, reason = np.full(m, -1, dtype=np.int64), np.full(m, np.nan), np.full(m, END, dtype=np.int8)
+        scanned = 0
+
+    # ربط الصفقات: الصفقة التالية هي أول إشارة بعد شمعة خروج السابقة
+    unresolved = (exit_bar < 0).tolist()
+    following = np.searchsorted(entries, exit_bar, side="right").tolist()
+    taken = []
+    k = 0
+    while k < m:
+        if unresolved[k]:
+            bar, side = int(entries[k]), int(sides[k])
+            if ratios is None:
+                sl[k], tp[k] = _trade_levels(strategy, data, bar, side, entry_price[k])
+            exit_bar[k], exit_price[k], reason[k] = _find_exit(
+                side, bar + 1 + scanned, sl[k], tp[k], open_, high, low, exit_signal)
+            following[k] = int(np.searchsorted(entries, exit_bar[k], side="right"))
+        taken.append(k)
+        k = following[k]
+
+    taken = np.array(taken, dtype=np.int64)
+    raw = {
+        "entry_bar": entries[taken],
+        "exit_bar": exit_bar[taken],
+        "side": sides[taken],
+        "entry_price": entry_price[taken],
+        "sl": sl[taken],
+        "tp": tp[taken],
+    }
+    exit_price = exit_price[taken]
+    # الخروج بإشارة أو عند نهاية البيانات يكون على سعر الإغلاق
+    raw["exit_price"] = np.where(np.isnan(exit_price), close[raw["exit_bar"]], exit_price)
+    raw["quantity"] = notional / raw["entry_price"]
+
+    # حساب نتائج كل الصفقات مرة واحدة
+    quantity = raw["quantity"]
+    raw["entry_fee"] = raw["entry_price"] * quantity * fee_rate
+    fees = raw["entry_fee"] + raw["exit_price"] * quantity * fee_rate
+    pnl = raw["side"] * quantity * (raw["exit_price"] - raw["entry_price"]) - fees
+    raw["pnl"] = pnl
+
+    equity = _equity_curve(close, raw, initial_balance)
+    index = data.index
+    trades = pd.DataFrame({
+        "entry_time": index[raw["entry_bar"]],
+        "exit_time": index[raw["exit_bar"]],
+        "side": np.where(raw["side"] > 0, "BUY", "SELL"),
+        "entry_price": raw["entry_price"],
+        "exit_price": raw["exit_price"],
+        "sl": np.where(np.isfinite(raw["sl"]), raw["sl"], np.nan),
+        "tp": np.where(np.isfinite(raw["tp"]), raw["tp"], np.nan),
+        "quantity": quantity,
+        "pnl": pnl,
+        "fees": fees,
+        "return_pct": pnl / notional * 100 if notional else np.zeros(len(pnl)),
+        "bars": raw["exit_bar"] - raw["entry_bar"],
+        "reason": REASONS[reason[taken]],
+    }, columns=TRADE_COLUMNS)
+
+    return {
+        "trades": trades,
+        "equity": pd.Series(equity, index=index, name="equity"),
+        "summary": _summary(trades, equity, initial_balance),
+    }
+
+
+# مثال للاستخدام:
+if __name__ == "__main__":
+    from market_data import get_historical_data
+    from strategies.ai_strategies import load_strategy
+
+    data = get_historical_data("TRXUSDT", "15m", limit=1500)
+    result = run_backtest(data, load_strategy("ema_crossover_strategy", "TRXUSDT", "15m"))
+    for key, value in result["summary"].items():
+        print(f"{key}: {value}")
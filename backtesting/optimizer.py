@@ -0,0 +1,103 @@
+import itertools
+import os
+import random
+from multiprocessing import Pool
+
+from backtesting.backtest_engine import run_backtest
+from core.shared_ohlcv import SharedOHLCV, attach
+from strategies.ai_strategies import load_strategy
+
+# مقاييس الأفضل فيها الأقل؛ كل ما عداها يُرتب تنازليًا
+LOWER_IS_BETTER = {"max_drawdown_pct", "total_fees", "losses"}
+
+
+def grid_params(space):
+    """
+    كل التركيبات من قاموس قيم، مثلاً {"period": [7, 14], "oversold": [20, 30]}.
+    """
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+
+def random_params(space, samples, seed=None):
+    """
+    عينات عشوائية من فضاء المعاملات: القائمة تعني اختيارًا من قيمها، و (أدنى، أعلى)
+    تعني مجالاً متصلاً (أعداد صحيحة إذا كان الطرفان صحيحين).
+    """
+    rng = random.Random(seed)
+
+    def draw(values):
+        if isinstance(values, tuple):
+            low, high = values
+            if isinstance(low, int) and isinstance(high, int):
+                return rng.randint(low, high)
+            return rng.uniform(low, high)
+        return rng.choice(values)
+
+    return [{key: draw(values) for key, values in space.items()} for _ in range(samples)]
+
+
+# ───── حالة كل عملية عاملة ─────
+_worker = {}
+
+
+def _init_worker(spec, strategy_name, symbol, timeframe, backtest_kwargs):
+    # كل عملية ترتبط بالذاكرة المشتركة مرة واحدة بدل استلام الشموع مع كل مهمة
+    shm, data = attach(spec)
+    _worker.update(shm=shm, data=data, strategy_name=strategy_name, symbol=symbol,
+                   timeframe=timeframe, backtest_kwargs=backtest_kwargs)
+
+
+def _evaluate(params):
+    strategy = load_strategy(_worker["strategy_name"], _worker["symbol"], _worker["timeframe"], params)
+    if strategy is None:
+        return {"params": params, "summary": None}
+    try:
+        summary = run_backtest(_worker["data"], strategy, **_worker["backtest_kwargs"])["summary"]
+    except Exception as e:
+        print(f"❌ Backtest failed for {_worker['strategy_name']} {params}: {e}")
+        summary = None
+    return {"params": params, "summary": summary}
+
+
+def sweep(data, strategy_name, combinations, processes=None, symbol="BTCUSDT", timeframe="1m", **backtest_kwargs):
+    """
+    تشغيل run_backtest لكل تركيبة معاملات على مجموعة عمليات، مع إرجاع كل نتيجة
+    ({"params", "summary"}) فور انتهائها. الشموع تُنسخ مرة واحدة إلى ذاكرة مشتركة.
+    """
+    combinations = list(combinations)
+    processes = min(processes or os.cpu_count() or 1, max(len(combinations), 1))
+    with SharedOHLCV(data) as shared:
+        initargs = (shared.spec, strategy_name, symbol, timeframe, backtest_kwargs)
+        with Pool(processes, initializer=_init_worker, initargs=initargs) as pool:
+            yield from pool.imap_unordered(_evaluate, combinations)
+
+
+def optimize(data, strategy_name, combinations, metric="net_profit", processes=None, on_result=None,
+             symbol="BTCUSDT", timeframe="1m", **backtest_kwargs):
+    """
+    بحث عن أفضل معاملات استراتيجية حسب مقياس من ملخص run_backtest.
+    `on_result(result, ranking)` يُستدعى مع كل نتيجة جديدة والترتيب الحالي،
+    ويُعاد الترتيب النهائي (الأفضل أولاً) في النهاية.
+    """
+    reverse = metric not in LOWER_IS_BETTER
+    ranking = []
+    for result in sweep(data, strategy_name, combinations, processes, symbol, timeframe, **backtest_kwargs):
+        if result["summary"] is None:
+            continue
+        ranking.append(result)
+        ranking.sort(key=lambda r: r["summary"][metric], reverse=reverse)
+        if on_result:
+            on_result(result, ranking)
+    return ranking
+
+
+# مثال للاستخدام:
+if __name__ == "__main__":
+    from market_data import get_historical_data
+
+    data = get_historical_data("TRXUSDT", "15m", limit=1500)
+    space = {"period": [7, 14, 21], "overbought": [65, 70, 75, 80], "oversold": [20, 25, 30, 35]}
+    best = optimize(data, "rsi_strategy", grid_params(space), metric="net_profit")
+    for result in best[:5]:
+        print(result["params"], round(result["summary"]["net_profit"], 2))
@@ -0,0 +1,122 @@
+import threading
+import time
+
+# عمر سعر العلامة المقبول قبل الرجوع إلى REST (بالثواني)
+MARK_PRICE_MAX_AGE = 5.0
+
+
+def _fetch_balances():
+    from core.binance_api import client
+    return client.futures_account_balance()
+
+
+def _fetch_positions():
+    from core.binance_api import client
+    return client.futures_position_information()
+
+
+class AccountState:
+    """
+    In-memory balances, positions and mark prices.
+
+    `seed()` takes one REST snapshot; after that ACCOUNT_UPDATE events from the
+    user-data stream and markPriceUpdate events keep it current, so reads
+    never leave the process. Entries carry their exchange timestamp and older
+    updates are ignored, so a snapshot racing with a stream event cannot roll
+    state back. Balances and positions keep the REST field names so callers
+    of binance_api.get_balance/get_position see the same shape.
+    """
+
+    def __init__(self, fetch_balances=_fetch_balances, fetch_positions=_fetch_positions):
+        self.fetch_balances = fetch_balances
+        self.fetch_positions = fetch_positions
+        self.seeded = False
+        self._balances = {}
+        self._positions = {}
+        self._marks = {}
+        self._stream = None
+        self._lock = threading.Lock()
+
+    # ───── الربط والتعبئة ─────
+    def attach(self, user_stream):
+        """Follow ACCOUNT_UPDATE events and reseed after every reconnect."""
+        self._stream = user_stream
+        user_stream.subscribe("ACCOUNT_UPDATE", self.on_account_update)
+        user_stream.on_connected(self.seed)
+
+    def is_live(self):
+        """True while the cache is seeded and its user-data stream is connected."""
+        return self.seeded and self._stream is not None and self._stream.connected.is_set()
+
+    def seed(self):
+        balances = self.fetch_balances()
+        positions = self.fetch_positions()
+        with self._lock:
+            for entry in balances:
+                self._put(self._balances, entry["asset"], entry, entry.get("updateTime", 0))
+            for entry in positions:
+                key = (entry["symbol"], entry.get("positionSide", "BOTH"))
+                self._put(self._positions, key, entry, entry.get("updateTime", 0))
+            self.seeded = True
+
+    @staticmethod
+    def _put(table, key, entry, timestamp):
+        current = table.get(key)
+        if current is not None and current[0] > timestamp:
+            return
+        merged = dict(current[1]) if current is not None else {}
+        merged.update(entry)
+        table[key] = (timestamp, merged)
+
+    # ───── أحداث البث ─────
+    def on_account_update(self, event):
+        timestamp = event.get("E", 0)
+        account = event.get("a", {})
+        with self._lock:
+            for b in account.get("B", []):
+                self._put(self._balances, b["a"], {
+                    "asset": b["a"],
+                    "balance": b["wb"],
+                    "crossWalletBalance": b["cw"],
+                }, timestamp)
+            for p in account.get("P", []):
+                self._put(self._positions, (p["s"], p.get("ps", "BOTH")), {
+                    "symbol": p["s"],
+                    "positionAmt": p["pa"],
+                    "entryPrice": p["ep"],
+                    "unRealizedProfit": p["up"],
+                    "marginType": p.get("mt"),
+                    "positionSide": p.get("ps", "BOTH"),
+                }, timestamp)
+
+    def on_mark_price(self, event):
+        self._marks[event["s"]] = (float(event["p"]), time.time())
+
+    # ───── القراءة ─────
+    def get_balance(self, asset="USDT"):
+        entry = self._balances.get(asset)
+        return float(entry[1]["balance"]) if entry is not None else 0.0
+
+    def get_position(self, symbol):
+        """First non-zero position for the symbol (any position side), or None."""
+        with self._lock:
+            entries = [entry for (s, _), (_, entry) in self._positions.items() if s == symbol]
+        for entry in entries:
+            if float(entry["positionAmt"]) != 0:
+                return dict(entry)
+        return None
+
+    def positions(self):
+        with self._lock:
+            return [dict(entry) for _, entry in self._positions.values() if float(entry["positionAmt"]) != 0]
+
+    def get_mark_price(self, symbol, max_age=MARK_PRICE_MAX_AGE):
+        """Latest mark price, or None if none arrived within `max_age` seconds."""
+        entry = self._marks.get(symbol)
+        if entry is None or (max_age is not None and time.time() - entry[1] > max_age):
+            return None
+        return entry[0]
+
+
+# نسخة مشتركة يغذيها بث بيانات المستخدم وبث أسعار العلامة (انظر strategy_engine)
+account_state = AccountState()
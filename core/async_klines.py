@@ -0,0 +1,124 @@
+import asyncio
+import threading
+
+import aiohttp
+
+from core.rate_limiter import PRIORITY_MARKET, RateLimiter
+
+KLINES_PATH = "/fapi/v1/klines"
+
+# حد الوزن لكل دقيقة على عنوان IP في Binance Futures
+WEIGHT_LIMIT = 2400
+
+
+def klines_weight(limit):
+    """Request weight of /fapi/v1/klines for a given limit."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class KlineFetcher:
+    """
+    Concurrent kline downloader over one pooled keep-alive aiohttp session.
+
+    At most `concurrency` requests are in flight, and each one waits for room
+    in `limiter` at market-data priority. Pass the process-wide limiter so
+    klines share the IP budget with orders and yield to them. The session
+    lives on a private event loop thread so synchronous callers reuse its
+    connections.
+    """
+
+    def __init__(self, base_url, concurrency=10, weight_limit=WEIGHT_LIMIT, timeout=10.0, limiter=None):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.limiter = limiter if limiter is not None else RateLimiter(weight_limit)
+        self._loop = None
+        self._session = None
+        self._semaphore = None
+        self._thread_lock = threading.Lock()
+
+    @property
+    def used_weight(self):
+        return self.limiter.used_weight
+
+    @property
+    def total_weight(self):
+        return self.limiter.total_weight
+
+    # ───── دورة حياة الحلقة والجلسة ─────
+    def _ensure_loop(self):
+        with self._thread_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        return self._loop
+
+    async def _ensure_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def shutdown(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+
+    # ───── محاسبة الوزن ─────
+    async def _reserve(self, weight):
+        if self.limiter.acquire(weight, PRIORITY_MARKET, timeout=0):
+            return
+        # الانتظار يحجب الخيط، لذلك يتم خارج حلقة الأحداث
+        await asyncio.get_running_loop().run_in_executor(None, self.limiter.acquire, weight, PRIORITY_MARKET)
+
+    # ───── الطلبات ─────
+    async def fetch(self, symbol, interval, limit=100, start_time=None):
+        session = await self._ensure_session()
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = int(start_time)
+        weight = klines_weight(limit)
+
+        async with self._semaphore:
+            await self._reserve(weight)
+            headers = status = None
+            try:
+                async with session.get(self.base_url + KLINES_PATH, params=params) as resp:
+                    headers, status = resp.headers, resp.status
+                    if resp.status != 200:
+                        print(f"Error fetching klines for {symbol} {interval}: HTTP {resp.status} {await resp.text()}")
+                        return []
+                    return await resp.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"Error fetching klines for {symbol} {interval}: {e}")
+                return []
+            finally:
+                self.limiter.settle(weight, headers=headers, status=status)
+
+    async def fetch_many(self, requests):
+        """
+        `requests` is a list of (symbol, interval, limit, start_time) tuples.
+        Returns {(symbol, interval): raw kline rows}.
+        """
+        results = await asyncio.gather(*(self.fetch(*request) for request in requests))
+        return {(request[0], request[1]): rows for request, rows in zip(requests, results)}
+
+    def fetch_many_sync(self, requests):
+        """Blocking wrapper around fetch_many for code outside the event loop."""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self.fetch_many(requests), loop).result()
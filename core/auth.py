@@ -5,11 +5,12 @@ import asyncio
 from datetime import datetime
 
 from database.db_manager import (
-    check_user,
-    check_user_status,
-    get_device_id,
+    LOGIN_END_DATE,
+    LOGIN_START_DATE,
+    check_login_record,
+    get_login_record,
     get_subscription_dates,
-    get_user_by_username
+    subscription_is_current
 )
 from core.utils import check_superuser_login, decrypt_dev_info, get_ip_info, get_device_info
 
@@ -69,18 +70,9 @@ def send_telegram_request(username, request_id, device_id=None):
         return False, None, None
 
 def is_subscription_valid(username):
-    start_str, end_str = get_subscription_dates(username)
-    if not start_str or not end_str:
-        return False
-    try:
-        now = datetime.now()
-        start = datetime.fromisoformat(start_str)
-        end = datetime.fromisoformat(end_str)
-        return start <= now <= end
-    except Exception:
-        return False
-
-def login(username, password, device_id=None):
+    return subscription_is_current(*get_subscription_dates(username))
+
+def login(username, password, device_id=None, record=None):
     # Ensure we have a device_id (gather from system if not provided)
     if device_id is None:
         try:
@@ -90,10 +82,13 @@ def login(username, password, device_id=None):
             device_id = None
 
     # تحقق من وجود المستخدم في قاعدة البيانات
-    user_data = get_user_by_username(username)
+    # استعلام واحد (المستخدم + الاشتراك المفعل) تستخدمه كل الخطوات التالية
+    if record is None:
+        record = get_login_record(username)
+    user_data = record[:LOGIN_START_DATE] if record else None
     if user_data:
         stored_device_id = user_data[3] if len(user_data) > 3 else None
-        start_date, end_date = get_subscription_dates(username)
+        start_date, end_date = record[LOGIN_START_DATE], record[LOGIN_END_DATE]
         if stored_device_id and device_id and stored_device_id != device_id:
             print('❌ الجهاز الحالي غير مصرح به لهذا الحساب.')
             return {'status': 'fail', 'role': None}
@@ -119,8 +114,8 @@ def login(username, password, device_id=None):
         return {"status": "pending_superuser", "role": "superuser"}
 
     # تحقق من المستخدم العادي
-    if check_user(username, password):
-        status = check_user_status(username)
+    if check_login_record(record, password):
+        status = record[6]
         if status == "pending":
             print("📩 إرسال إشعار للمطور بخصوص مستخدم جديد...")
             ip_info = get_ip_info()
@@ -147,15 +142,11 @@ def login(username, password, device_id=None):
             print("⚠️ المستخدم غير مفعل.")
             return {"status": "fail", "role": None}
 
-        if not is_subscription_valid(username):
+        if not subscription_is_current(record[LOGIN_START_DATE], record[LOGIN_END_DATE]):
             print("⚠️ الاشتراك منتهي أو غير صالح.")
             return {"status": "fail", "role": None}
 
-        try:
-            user_data = get_user_by_username(username)
-            registered_device = user_data[3] if user_data and len(user_data) > 3 else None
-        except Exception:
-            registered_device = None
+        registered_device = user_data[3] if user_data and len(user_data) > 3 else None
 
         if registered_device and device_id and registered_device != device_id:
             print("⚠️ هذا الحساب مربوط بجهاز مختلف.")
@@ -200,12 +191,12 @@ def finalize_user_creation(username, device_id=None, approved=True):
     else:
         print(f"⚠️ لا يوجد طلب معلق لهذا المستخدم: {username}")
 
-def get_login_status(username, password, device_id=None):
+def get_login_status(username, password, device_id=None, record=None):
     """
     دالة تستخدم login() لكن ترجع حالة نصية فقط لتسهيل تعامل الواجهة معها
     """
     try:
-        result = login(username, password, device_id)
+        result = login(username, password, device_id, record)
         status = result.get('status')
         role = result.get('role')
 
@@ -1,8 +1,13 @@
+import inspect
 import json
 import os
+import threading
 from binance.client import Client
 from binance.enums import *
 from binance.exceptions import BinanceAPIException
+from core.account_state import account_state
+from core.bracket_orders import place_bracket
+from core.rate_limiter import RateLimitedClient, rate_limiter
 
 CONFIG_PATH = "config/config.json"
 
@@ -10,14 +15,82 @@ def load_config():
     with open(CONFIG_PATH, "r") as f:
         return json.load(f)
 
-config = load_config()
+# الإعدادات والعميل يُنشآن عند أول طلب لا عند الاستيراد، حتى يعمل التشغيل والاختبارات دون شبكة
+_config = None
+_client = None
+_client_lock = threading.Lock()
 
-BASE_URL = "https://testnet.binancefuture.com" if config["use_testnet"] else "https://fapi.binance.com"
+def get_config():
+    global _config
+    if _config is None:
+        _config = load_config()
+    return _config
 
-client = Client(config["api_key"], config["api_secret"])
-client.API_URL = BASE_URL
+def get_base_url():
+    return "https://testnet.binancefuture.com" if get_config()["use_testnet"] else "https://fapi.binance.com"
+
+def get_stream_url():
+    return "wss://stream.binancefuture.com" if get_config()["use_testnet"] else "wss://fstream.binance.com"
+
+def _client_options(config):
+    options = {"testnet": config["use_testnet"]}
+    # ping=False غير موجود في python-binance==1.0.16 المثبت في requirements.txt (يرسل ping عند الإنشاء)
+    if "ping" in inspect.signature(Client.__init__).parameters:
+        options["ping"] = False
+    return options
+
+def create_client():
+    """
+    المصنع الافتراضي: عميل python-binance (دون ping عند الإنشاء إن كان الإصدار يدعم ذلك)،
+    وكل طلباته تمر عبر محدد الوزن المشترك (الأوامر قبل بيانات السوق).
+    """
+    config = get_config()
+    raw = Client(config["api_key"], config["api_secret"], **_client_options(config))
+    return RateLimitedClient(raw, rate_limiter)
+
+_client_factory = create_client
+
+def set_client_factory(factory):
+    """
+    استبدال مصنع العميل، مثلًا بمنصة وهمية محلية في الاختبارات. `factory()`
+    بلا معاملات ويُستدعى عند الطلب التالي؛ None يعيد المصنع الافتراضي.
+    """
+    global _client_factory, _client
+    with _client_lock:
+        _client_factory = factory if factory is not None else create_client
+        _client = None
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _client_factory()
+    return _client
+
+class _LazyClient:
+    """يمرر كل وصول إلى العميل الحالي، فتبقى `from core.binance_api import client` صالحة."""
+
+    def __getattr__(self, name):
+        return getattr(get_client(), name)
+
+client = _LazyClient()
+
+def __getattr__(name):
+    # الأسماء القديمة ما زالت متاحة لكنها تُحسب عند أول وصول
+    if name == "config":
+        return get_config()
+    if name == "BASE_URL":
+        return get_base_url()
+    if name == "STREAM_URL":
+        return get_stream_url()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_price(symbol):
+    # سعر العلامة من البث إن كان حديثًا، وإلا طلب REST
+    mark = account_state.get_mark_price(symbol)
+    if mark is not None:
+        return mark
     try:
         ticker = client.futures_symbol_ticker(symbol=symbol)
         return float(ticker['price'])
@@ -26,6 +99,8 @@ def get_price(symbol):
         return None
 
 def get_balance(asset='USDT'):
+    if account_state.is_live():
+        return account_state.get_balance(asset)
     try:
         balances = client.futures_account_balance()
         for entry in balances:
@@ -37,6 +112,8 @@ def get_balance(asset='USDT'):
         return None
 
 def get_position(symbol):
+    if account_state.is_live():
+        return account_state.get_position(symbol)
     try:
         positions = client.futures_position_information(symbol=symbol)
         for pos in positions:
@@ -47,7 +124,15 @@ def get_position(symbol):
         print(f"Error getting position: {e}")
         return None
 
+def place_bracket_order(symbol, side, quantity, entry_type="MARKET", price=None, stop_loss=None, take_profits=()):
+    """
+    الدخول و SL وسلم TP في طلب batchOrders واحد بدل طلب لكل أمر (انظر core.bracket_orders).
+    """
+    return place_bracket(client, symbol, side, quantity, entry_type, price, stop_loss, take_profits)
+
 def place_order(symbol, side, quantity, entry_type="MARKET", price=None, stop_loss=None, take_profits=[]):
+    if stop_loss or take_profits:
+        return place_bracket_order(symbol, side, quantity, entry_type, price, stop_loss, take_profits)
     try:
         order_params = {
             'symbol': symbol,
@@ -64,42 +149,10 @@ def place_order(symbol, side, quantity, entry_type="MARKET", price=None, stop_lo
 
         main_order = client.futures_create_order(**order_params)
 
-        sl_orders = []
-        tp_orders = []
-
-        if stop_loss:
-            sl_type = ORDER_TYPE_STOP_MARKET
-            sl_side = SIDE_SELL if side == "BUY" else SIDE_BUY
-            sl_params = {
-                "symbol": symbol,
-                "side": sl_side,
-                "type": sl_type,
-                "stopPrice": str(stop_loss),
-                "closePosition": True,
-                "timeInForce": TIME_IN_FORCE_GTC
-            }
-            sl_orders.append(client.futures_create_order(**sl_params))
-
-        for tp in take_profits:
-            tp_price = tp.get("price")
-            tp_qty = tp.get("quantity", quantity)
-            tp_type = ORDER_TYPE_LIMIT
-            tp_side = SIDE_SELL if side == "BUY" else SIDE_BUY
-            tp_params = {
-                "symbol": symbol,
-                "side": tp_side,
-                "type": tp_type,
-                "price": str(tp_price),
-                "quantity": tp_qty,
-                "timeInForce": TIME_IN_FORCE_GTC,
-                "reduceOnly": True
-            }
-            tp_orders.append(client.futures_create_order(**tp_params))
-
         return {
             "main": main_order,
-            "sl": sl_orders,
-            "tp": tp_orders
+            "sl": [],
+            "tp": []
         }
 
     except BinanceAPIException as e:
@@ -162,10 +215,24 @@ def get_order_status(symbol, order_id):
         print(f"Status fetch failed: {e}")
         return None
 
-def get_klines(symbol, interval, limit=100):
-    """تحميل بيانات الشموع من Binance"""
+def create_listen_key():
+    """listenKey لبث بيانات المستخدم (أحداث الأوامر والحساب)"""
+    return client.futures_stream_get_listen_key()
+
+def keepalive_listen_key(listen_key):
+    return client.futures_stream_keepalive(listenKey=listen_key)
+
+def get_server_time():
+    """وقت خادم Binance Futures بالميلي ثانية"""
+    return client.futures_time()["serverTime"]
+
+def get_klines(symbol, interval, limit=100, start_time=None):
+    """تحميل بيانات الشموع من Binance (start_time بالميلي ثانية لطلب الشموع الأحدث فقط)"""
     try:
-        return client.futures_klines(symbol=symbol, interval=interval, limit=limit)
+        params = {"symbol": symbol, "interval": interval, "limit": limit}
+        if start_time is not None:
+            params["startTime"] = start_time
+        return client.futures_klines(**params)
     except Exception as e:
         print(f"Error fetching klines: {e}")
         return []
\ No newline at end of file
@@ -0,0 +1,129 @@
+from binance.enums import (
+    SIDE_BUY, SIDE_SELL, ORDER_TYPE_MARKET, ORDER_TYPE_LIMIT, FUTURE_ORDER_TYPE_STOP_MARKET,
+    FUTURE_ORDER_TYPE_TAKE_PROFIT_MARKET, TIME_IN_FORCE_GTC,
+)
+from binance.exceptions import BinanceAPIException
+
+# أقصى عدد أوامر في طلب batchOrders واحد
+BATCH_LIMIT = 5
+
+
+def bracket_legs(symbol, side, quantity, entry_type="MARKET", price=None, stop_loss=None, take_profits=()):
+    """
+    أوامر الدخول و SL و TP كقائمة (اسم الطرف، معاملات). كل القيم نصوص كما يتطلب batchOrders.
+
+    TP بسعر فقط يغلق الصفقة كاملة (TAKE_PROFIT_MARKET مع closePosition) فيُقبل حتى قبل
+    تنفيذ الدخول؛ TP بصيغة {"price", "quantity"} يصبح أمر LIMIT بخاصية reduceOnly لسلم الأهداف.
+    """
+    entry = {
+        "symbol": symbol,
+        "side": SIDE_BUY if side == "BUY" else SIDE_SELL,
+        "type": ORDER_TYPE_MARKET if entry_type == "MARKET" else ORDER_TYPE_LIMIT,
+        "quantity": str(quantity),
+    }
+    if entry_type == "LIMIT":
+        entry.update({"price": str(price), "timeInForce": TIME_IN_FORCE_GTC})
+    legs = [("entry", entry)]
+
+    exit_side = SIDE_SELL if side == "BUY" else SIDE_BUY
+    if stop_loss:
+        legs.append(("sl", {
+            "symbol": symbol,
+            "side": exit_side,
+            "type": FUTURE_ORDER_TYPE_STOP_MARKET,
+            "stopPrice": str(stop_loss),
+            "closePosition": "true",
+            "timeInForce": TIME_IN_FORCE_GTC,
+        }))
+
+    for tp in take_profits or []:
+        if isinstance(tp, dict) and "quantity" in tp:
+            params = {
+                "type": ORDER_TYPE_LIMIT,
+                "price": str(tp["price"]),
+                "quantity": str(tp["quantity"]),
+                "timeInForce": TIME_IN_FORCE_GTC,
+                "reduceOnly": "true",
+            }
+        else:
+            tp_price = tp.get("price") if isinstance(tp, dict) else tp
+            params = {
+                "type": FUTURE_ORDER_TYPE_TAKE_PROFIT_MARKET,
+                "stopPrice": str(tp_price),
+                "closePosition": "true",
+                "timeInForce": TIME_IN_FORCE_GTC,
+            }
+        legs.append(("tp", {"symbol": symbol, "side": exit_side, **params}))
+    return legs
+
+
+def _rejected(result):
+    return not isinstance(result, dict) or "code" in result or "orderId" not in result
+
+
+def _create(client, params):
+    try:
+        return client.futures_create_order(**params)
+    except BinanceAPIException as e:
+        return {"code": e.code, "msg": e.message}
+    except Exception as e:
+        return {"code": None, "msg": str(e)}
+
+
+def _submit(client, legs):
+    """
+    إرسال الأطراف على دفعات من BATCH_LIMIT. إذا رفضت المنصة الطلب كله (نقطة غير مدعومة
+    مثلاً) تُرسل الأطراف واحدًا واحدًا. أخطاء الشبكة لا يُعاد إرسالها لأن الأوامر قد تكون وصلت:
+    أطراف الدفعة تُسجَّل مرفوضة مع "unknown" حتى لا تضيع نتائج الدفعات السابقة.
+    """
+    results = []
+    for start in range(0, len(legs), BATCH_LIMIT):
+        chunk = [dict(params) for _, params in legs[start:start + BATCH_LIMIT]]
+        try:
+            results.extend(client.futures_place_batch_order(batchOrders=chunk))
+        except BinanceAPIException as e:
+            print(f"⚠️ Batch order rejected ({e.message}), placing legs one by one.")
+            results.extend(_create(client, params) for _, params in legs[start:start + BATCH_LIMIT])
+        except Exception as e:
+            print(f"❌ Batch order failed: {e}")
+            results.extend({"code": None, "msg": str(e), "unknown": True} for _ in chunk)
+    return results
+
+
+def place_bracket(client, symbol, side, quantity, entry_type="MARKET", price=None, stop_loss=None, take_profits=()):
+    """
+    الدخول و SL و TP في رحلة واحدة عبر batchOrders.
+
+    يعيد دائمًا {"main": أمر الدخول أو None، "sl": [...]، "tp": [...]، "errors": {"entry"|"sl"|"tp1"...: رسالة}}.
+    إذا رُفض الدخول تُلغى الأطراف الحامية المقبولة. الطرف الحامي المرفوض (reduceOnly قبل
+    فتح الصفقة مثلاً) يُعاد إرساله منفردًا مرة واحدة بعد قبول الدخول، إلا إذا فشلت دفعته
+    بخطأ شبكة فحالته غير معروفة ويبقى في errors.
+    """
+    legs = bracket_legs(symbol, side, quantity, entry_type, price, stop_loss, take_profits)
+    results = _submit(client, legs)
+
+    placed = {"main": None, "sl": [], "tp": [], "errors": {}}
+    entry = results[0]
+    if _rejected(entry):
+        placed["errors"]["entry"] = entry.get("msg") if isinstance(entry, dict) else str(entry)
+        print(f"❌ Entry order rejected for {symbol}: {placed['errors']['entry']}")
+        for (_, params), result in zip(legs[1:], results[1:]):
+            if not _rejected(result):
+                try:
+                    client.futures_cancel_order(symbol=symbol, orderId=result["orderId"])
+                except Exception as e:
+                    print(f"⚠️ Could not cancel {params['type']} order {result['orderId']}: {e}")
+        return placed
+    placed["main"] = entry
+
+    for position, ((leg, params), result) in enumerate(zip(legs[1:], results[1:])):
+        if _rejected(result) and not (isinstance(result, dict) and result.get("unknown")):
+            result = _create(client, params)
+        if _rejected(result):
+            # SL دائمًا أول الأطراف الحامية، فترتيب TP يبدأ بعده
+            name = leg if leg == "sl" else f"tp{position + (0 if stop_loss else 1)}"
+            placed["errors"][name] = result.get("msg")
+            print(f"⚠️ {leg.upper()} order rejected for {symbol}: {result.get('msg')}")
+            continue
+        placed[leg].append(result)
+    return placed
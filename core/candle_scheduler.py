@@ -0,0 +1,186 @@
+import threading
+import time
+
+import pandas as pd
+
+from core.kline_cache import interval_to_ms
+
+# مهلة بعد الإغلاق حتى تنشر المنصة الشمعة المغلقة (بالثواني)
+CLOSE_GRACE = 0.25
+
+# إعادة المحاولة إذا لم تظهر الشمعة المغلقة بعد
+CLOSE_RETRIES = 3
+RETRY_DELAY = 0.5
+
+# إعادة مزامنة فرق الساعة مع المنصة (بالثواني)
+RESYNC_INTERVAL = 30 * 60
+
+# شموع الأسبوع في Binance تبدأ يوم الاثنين، و 1970-01-01 كان خميسًا
+WEEK_OFFSET_MS = 4 * 24 * 60 * 60_000
+
+
+def next_close(now_ms, interval):
+    """Open time of the next candle, i.e. the close of the current one, in ms."""
+    step = interval_to_ms(interval)
+    if step is None:
+        raise ValueError(f"Unsupported interval {interval}")
+    offset = WEEK_OFFSET_MS if interval == "1w" else 0
+    return ((int(now_ms) - offset) // step + 1) * step + offset
+
+
+def _fetch_server_time():
+    from core.binance_api import get_server_time
+    return get_server_time()
+
+
+def _fetch_batch(pairs, limit):
+    from market_data import get_historical_data_batch
+    return get_historical_data_batch(pairs, limit)
+
+
+class ServerClock:
+    """
+    Local clock corrected by the exchange's time offset.
+
+    The offset is measured against the midpoint of the serverTime request and
+    refreshed every `resync_interval` seconds; if a refresh fails the last
+    offset is kept.
+    """
+
+    def __init__(self, fetch_server_time=_fetch_server_time, clock=time.time, resync_interval=RESYNC_INTERVAL):
+        self.fetch_server_time = fetch_server_time
+        self.clock = clock
+        self.resync_interval = resync_interval
+        self.offset = 0.0
+        self.round_trip = None
+        self._synced_at = None
+
+    def sync(self):
+        sent = self.clock()
+        server_ms = self.fetch_server_time()
+        received = self.clock()
+        self.offset = server_ms / 1000 - (sent + received) / 2
+        self.round_trip = received - sent
+        self._synced_at = received
+
+    def now(self):
+        """Exchange time in seconds."""
+        local = self.clock()
+        if self._synced_at is None or local - self._synced_at >= self.resync_interval:
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"⚠️ Could not sync server time: {e}")
+                self._synced_at = local
+            local = self.clock()
+        return local + self.offset
+
+
+class CandleScheduler:
+    """
+    Polling run loop for many (symbol, timeframe) engines.
+
+    Sleeps until the next candle close on the exchange clock and then runs
+    one pass for every pair that closes at that instant, so 5m, 15m and 1h
+    engines meet at the top of the hour in a single batched fetch. The
+    still-forming candle is dropped before evaluation, and pairs whose
+    closed candle has not been published yet are fetched again a few times.
+    Each engine's analysis goes to `on_results(engine, analysis)`; with an
+    `evaluator` (strategies.parallel_engine.ParallelEvaluator) all pairs of a
+    pass are evaluated together on its process pool.
+    """
+
+    def __init__(self, engines, on_results, fetch_batch=_fetch_batch, server_clock=None, limit=100,
+                 grace=CLOSE_GRACE, sleep=None, evaluator=None):
+        self.by_pair = {}
+        for engine in engines:
+            self.by_pair.setdefault((engine.symbol.upper(), engine.timeframe), []).append(engine)
+        self.on_results = on_results
+        self.fetch_batch = fetch_batch
+        self.server_clock = server_clock or ServerClock()
+        self.limit = limit
+        self.grace = grace
+        self.evaluator = evaluator
+        self._stop = threading.Event()
+        self.sleep = sleep or self._stop.wait
+
+    def due(self, now_ms):
+        """(close_ms, pairs) for the earliest upcoming candle close."""
+        closes = {pair: next_close(now_ms, pair[1]) for pair in self.by_pair}
+        close_ms = min(closes.values())
+        return close_ms, [pair for pair, close in closes.items() if close == close_ms]
+
+    def _closed_frames(self, pairs, close_ms):
+        # الشمعة الجارية (التي تفتح عند الإغلاق) تُستبعد، ونطلب شمعة إضافية بدلها
+        frames = self.fetch_batch(pairs, self.limit + 1)
+        cutoff = pd.Timestamp(close_ms, unit="ms")
+        closed = {}
+        for pair in pairs:
+            data = frames.get(pair)
+            if data is not None:
+                data = data[data.index < cutoff].iloc[-self.limit:]
+            closed[pair] = data
+        return closed
+
+    @staticmethod
+    def _missing(data, pair, close_ms):
+        last_closed = pd.Timestamp(close_ms - interval_to_ms(pair[1]), unit="ms")
+        return data is None or data.empty or data.index[-1] < last_closed
+
+    def evaluate(self, close_ms, pairs):
+        """Fetch the closed candles of `pairs` in one batch and run their engines."""
+        frames = {}
+        pending = list(pairs)
+        for attempt in range(CLOSE_RETRIES + 1):
+            for pair, data in self._closed_frames(pending, close_ms).items():
+                frames[pair] = data
+            pending = [pair for pair in pending if self._missing(frames.get(pair), pair, close_ms)]
+            if not pending or attempt == CLOSE_RETRIES or self._stop.is_set():
+                break
+            self.sleep(RETRY_DELAY)
+        for pair in pending:
+            print(f"⚠️ Closed {pair[1]} candle for {pair[0]} not available, skipping this close.")
+
+        ready = {pair: frames[pair] for pair in pairs if pair not in pending}
+        if self.evaluator is not None:
+            engines = [engine for pair in ready for engine in self.by_pair[pair]]
+            for engine, analysis in self.evaluator.analyze(engines, ready):
+                if analysis:
+                    self.on_results(engine, analysis)
+            return
+
+        for pair, data in ready.items():
+            for engine in self.by_pair[pair]:
+                try:
+                    analysis = engine.analyze_market(data)
+                except Exception as e:
+                    print(f"❌ Analysis failed for {pair[0]} {pair[1]}: {e}")
+                    continue
+                if analysis:
+                    self.on_results(engine, analysis)
+
+    def run_once(self):
+        """Wait for the next close and evaluate every pair closing then."""
+        close_ms, pairs = self.due(self.server_clock.now() * 1000)
+        while not self._stop.is_set():
+            # إعادة الحساب بعد كل استيقاظ لأن فرق الساعة قد يتغير أثناء الانتظار
+            delay = close_ms / 1000 + self.grace - self.server_clock.now()
+            if delay <= 0:
+                break
+            self.sleep(delay)
+        if self._stop.is_set():
+            return None
+        self.evaluate(close_ms, pairs)
+        return close_ms, pairs
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            self.run_once()
+
+    def start(self):
+        thread = threading.Thread(target=self.run_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from core.ohlcv_buffer import COLUMNS, OHLCVBuffer
+
+# مخزن محلي للشموع لكل (رمز، فريم) حتى لا نعيد تحميل النافذة كاملة في كل دورة
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "klines")
+
+# أقصى عدد شموع تسمح به Binance Futures في طلب واحد
+MAX_CANDLES = 1500
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 3 * 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 60 * 60_000,
+    "2h": 2 * 60 * 60_000,
+    "4h": 4 * 60 * 60_000,
+    "6h": 6 * 60 * 60_000,
+    "8h": 8 * 60 * 60_000,
+    "12h": 12 * 60 * 60_000,
+    "1d": 24 * 60 * 60_000,
+    "3d": 3 * 24 * 60 * 60_000,
+    "1w": 7 * 24 * 60 * 60_000,
+}
+
+
+def interval_to_ms(interval):
+    """Length of one candle in milliseconds, or None for calendar intervals like 1M."""
+    return INTERVAL_MS.get(interval)
+
+
+def parse_klines(klines):
+    """Convert raw Binance kline rows into a float array with the COLUMNS layout."""
+    if not klines:
+        return np.empty((0, len(COLUMNS)), dtype=np.float64)
+    return np.array([k[:7] for k in klines], dtype=np.float64)
+
+
+class KlineCache:
+    """
+    Persistent per-(symbol, interval) kline store.
+
+    `fetch(symbol, interval, limit, start_time=None)` must return raw Binance
+    kline rows. Once the store is warm only the last stored candle (which may
+    have been saved before it closed) and anything newer is requested;
+    everything else is served from memory or from the .npy file written on
+    the previous run.
+
+    `fetch_many(requests)`, when given, takes (symbol, interval, limit,
+    start_time) tuples and returns {(symbol, interval): rows}; get_buffers
+    uses it to refresh a whole symbol list in one concurrent round.
+    """
+
+    def __init__(self, fetch, cache_dir=CACHE_DIR, max_candles=MAX_CANDLES, fetch_many=None):
+        self._fetch = fetch
+        self._fetch_many = fetch_many
+        self.cache_dir = cache_dir
+        self.max_candles = max_candles
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def _path(self, symbol, interval):
+        return os.path.join(self.cache_dir, f"{symbol.upper()}_{interval}.npy")
+
+    def _load(self, symbol, interval):
+        key = (symbol, interval)
+        buffer = self._buffers.get(key)
+        if buffer is not None:
+            return buffer
+        buffer = self._buffers[key] = OHLCVBuffer(self.max_candles)
+        path = self._path(symbol, interval)
+        if not os.path.exists(path):
+            return buffer
+        try:
+            rows = np.load(path)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable kline cache {path}: {e}")
+            return buffer
+        if rows.ndim == 2 and rows.shape[1] == len(COLUMNS):
+            buffer.extend(rows)
+        return buffer
+
+    def _persist(self, symbol, interval, buffer):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(symbol, interval)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, buffer.to_array())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not persist kline cache for {symbol} {interval}: {e}")
+
+    def _plan(self, buffer, interval, limit, now_ms):
+        """(limit, start_time) of the request needed to bring `buffer` up to date."""
+        step = interval_to_ms(interval)
+        if len(buffer) >= limit and step is not None:
+            # الشمعة الأخيرة ربما حُفظت قبل إغلاقها، لذلك نبدأ الطلب منها
+            start_time = buffer.last_open_time
+            missing = int((now_ms - start_time) // step) + 1
+            if missing <= min(limit, self.max_candles):
+                return missing, int(start_time)
+        # لا يوجد تاريخ كافٍ أو الفجوة أكبر من النافذة: تحميل كامل
+        return limit, None
+
+    def _merge(self, symbol, interval, buffer, klines, start_time):
+        fresh = parse_klines(klines)
+        if len(fresh) == 0:
+            return None
+        if start_time is None:
+            buffer.pop(len(buffer))
+        else:
+            buffer.truncate_from(fresh[0, 0])
+        buffer.extend(fresh)
+        self._persist(symbol, interval, buffer)
+        return buffer
+
+    def get_buffer(self, symbol, interval, limit=100, now_ms=None):
+        """
+        Bring the (symbol, interval) buffer up to date and return it, or None
+        when the exchange returned nothing.
+        """
+        now_ms = now_ms if now_ms is not None else time.time() * 1000
+        with self._lock:
+            buffer = self._load(symbol, interval)
+            fetch_limit, start_time = self._plan(buffer, interval, limit, now_ms)
+            if start_time is None:
+                klines = self._fetch(symbol, interval, fetch_limit)
+            else:
+                klines = self._fetch(symbol, interval, fetch_limit, start_time=start_time)
+            return self._merge(symbol, interval, buffer, klines, start_time)
+
+    def get_buffers(self, pairs, limit=100, now_ms=None):
+        """
+        Refresh many (symbol, interval) buffers with one concurrent round of
+        requests through `fetch_many`. Pairs with no data map to None.
+        """
+        if self._fetch_many is None:
+            return {pair: self.get_buffer(pair[0], pair[1], limit, now_ms) for pair in pairs}
+
+        now_ms = now_ms if now_ms is not None else time.time() * 1000
+        with self._lock:
+            plans = {}
+            for symbol, interval in pairs:
+                buffer = self._load(symbol, interval)
+                plans[(symbol, interval)] = (buffer,) + self._plan(buffer, interval, limit, now_ms)
+            klines = self._fetch_many([
+                (symbol, interval, fetch_limit, start_time)
+                for (symbol, interval), (_, fetch_limit, start_time) in plans.items()
+            ])
+            return {
+                (symbol, interval): self._merge(symbol, interval, buffer, klines.get((symbol, interval)), start_time)
+                for (symbol, interval), (buffer, _, start_time) in plans.items()
+            }
+
+    def get(self, symbol, interval, limit=100, now_ms=None):
+        """
+        Return the newest `limit` candles as a read-only array with the
+        COLUMNS layout, or None when the exchange returned nothing.
+        """
+        buffer = self.get_buffer(symbol, interval, limit, now_ms)
+        return None if buffer is None else buffer.rows(limit)
+
+    def clear(self, symbol=None, interval=None):
+        """Forget cached candles in memory and on disk (all of them by default)."""
+        with self._lock:
+            for key in list(self._buffers):
+                if (symbol is None or key[0] == symbol) and (interval is None or key[1] == interval):
+                    del self._buffers[key]
+            if not os.path.isdir(self.cache_dir):
+                return
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".npy"):
+                    continue
+                sym, _, itv = name[:-4].partition("_")
+                if (symbol is None or sym == symbol.upper()) and (interval is None or itv == interval):
+                    os.remove(os.path.join(self.cache_dir, name))
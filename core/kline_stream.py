@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core.ohlcv_buffer import OHLCVBuffer
+from core.ws_stream import StreamClient
+
+FUTURES_STREAM_URL = "wss://fstream.binance.com"
+TESTNET_STREAM_URL = "wss://stream.binancefuture.com"
+
+
+class KlineStream(StreamClient):
+    """
+    Keeps a rolling OHLCV window per (symbol, interval) from the futures kline
+    streams and calls `on_candle_close(symbol, interval, data)` with a
+    DataFrame as soon as the exchange marks a candle as closed.
+
+    Callbacks run one at a time on a worker thread so slow strategy or order
+    code never stalls the socket.
+    """
+
+    def __init__(self, pairs, on_candle_close, base_url=FUTURES_STREAM_URL, window=100, seed=None):
+        self.pairs = [(symbol.upper(), interval) for symbol, interval in pairs]
+        streams = "/".join(f"{symbol.lower()}@kline_{interval}" for symbol, interval in self.pairs)
+        super().__init__(f"{base_url.rstrip('/')}/stream?streams={streams}")
+        self.on_candle_close = on_candle_close
+        self.window = window
+        self._seed = seed
+        self._buffers = {pair: OHLCVBuffer(window) for pair in self.pairs}
+        self._callbacks = ThreadPoolExecutor(max_workers=1)
+
+    async def on_connect(self):
+        # بعد أي انقطاع نعيد تعبئة النوافذ من الكاش حتى لا تضيع شموع
+        if self._seed is None:
+            return
+        for symbol, interval in self.pairs:
+            try:
+                rows = self._seed(symbol, interval, self.window)
+            except Exception as e:
+                print(f"⚠️ Could not seed {symbol} {interval}: {e}")
+                continue
+            if rows is not None and len(rows):
+                buffer = self._buffers[(symbol, interval)]
+                buffer.pop(len(buffer))
+                buffer.extend(rows)
+
+    def handle_message(self, msg):
+        data = msg.get("data", msg)
+        if data.get("e") != "kline":
+            return
+        k = data["k"]
+        key = (k["s"].upper(), k["i"])
+        row = np.array([k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"]], dtype=np.float64)
+
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            return
+        buffer.upsert(row)
+
+        if k.get("x"):
+            # نسخة مستقلة لأن المخزن سيُكتب فوقه مع الشمعة التالية
+            self._callbacks.submit(self._emit, key[0], key[1], buffer.frame(copy=True))
+
+    def _emit(self, symbol, interval, data):
+        try:
+            self.on_candle_close(symbol, interval, data)
+        except Exception as e:
+            print(f"❌ Candle close handler failed for {symbol} {interval}: {e}")
+
+    def get_data(self, symbol, interval):
+        """Current window (including the unfinished candle) as a DataFrame."""
+        buffer = self._buffers.get((symbol.upper(), interval))
+        return None if buffer is None else buffer.frame(copy=True)
+
+    def stop(self, timeout=5.0):
+        super().stop(timeout)
+        self._callbacks.shutdown(wait=True)
@@ -0,0 +1,24 @@
+from core.kline_stream import FUTURES_STREAM_URL
+from core.ws_stream import StreamClient
+
+
+class MarkPriceStream(StreamClient):
+    """
+    Futures mark prices pushed every second. Without `symbols` it follows the
+    all-market `!markPrice@arr@1s` stream, otherwise one `<symbol>@markPrice@1s`
+    stream per symbol. Each markPriceUpdate event goes to `on_update(event)`.
+    """
+
+    def __init__(self, on_update, symbols=None, base_url=FUTURES_STREAM_URL):
+        if symbols:
+            streams = "/".join(f"{symbol.lower()}@markPrice@1s" for symbol in symbols)
+        else:
+            streams = "!markPrice@arr@1s"
+        super().__init__(f"{base_url.rstrip('/')}/stream?streams={streams}")
+        self.on_update = on_update
+
+    def handle_message(self, msg):
+        data = msg.get("data", msg)
+        for event in data if isinstance(data, list) else [data]:
+            if event.get("e") == "markPriceUpdate":
+                self.on_update(event)
@@ -0,0 +1,559 @@
+import asyncio
+import itertools
+import json
+import threading
+import time
+
+import numpy as np
+from aiohttp import web
+from binance.exceptions import BinanceAPIException
+
+INTERVAL_MS = {
+    "1m": 60_000, "3m": 180_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "1d": 86_400_000,
+}
+
+# بداية التاريخ الوهمي (ميلي ثانية)، محاذاة على الدقيقة
+START_TIME = 1_700_000_000_000 - 1_700_000_000_000 % 60_000
+
+DEFAULT_FILTERS = {"tick_size": "0.01", "step_size": "0.001", "min_qty": "0.001", "min_notional": "5"}
+
+ORDER_TYPES = {"MARKET", "LIMIT", "STOP_MARKET", "TAKE_PROFIT_MARKET"}
+FINAL_STATUSES = {"FILLED", "CANCELED", "EXPIRED", "REJECTED"}
+
+# أقصى عدد أوامر في batchOrders كما في Binance
+BATCH_LIMIT = 5
+
+
+def _error(code, msg, status_code=400):
+    return BinanceAPIException(None, status_code, json.dumps({"code": code, "msg": msg}))
+
+
+def _fmt(value):
+    """Number as Binance prints it: plain decimal string without trailing zeros."""
+    text = f"{value:.8f}".rstrip("0").rstrip(".")
+    return "0" if text in ("", "-0") else text
+
+
+def _flag(value):
+    return str(value).lower() == "true"
+
+
+def _candle(point, previous_close):
+    """(open, high, low, close, volume) from a path point: a price or an (o, h, l, c[, v]) tuple."""
+    if np.ndim(point) == 0:
+        close = float(point)
+        open_ = close if previous_close is None else previous_close
+        return open_, max(open_, close), min(open_, close), close, 1.0
+    o, h, l, c = (float(x) for x in point[:4])
+    return o, h, l, c, float(point[4]) if len(point) > 4 else 1.0
+
+
+class MockExchange:
+    """
+    In-process stand-in for the Binance USDⓈ-M futures endpoints that
+    core.binance_api uses, for offline end-to-end tests and benchmarks.
+
+    Every symbol follows a scripted price path: `step()` closes one candle
+    per symbol, matches resting LIMIT, STOP_MARKET and TAKE_PROFIT_MARKET
+    orders against its range (in orderId order, filling gaps at the open) and
+    publishes kline, markPrice and user-data events. MARKET and marketable
+    LIMIT orders fill at the last price. Positions are one-way with a single
+    USDT wallet. Errors are raised as BinanceAPIException with Binance's
+    codes, so the exchange can be installed with
+    `binance_api.set_client_factory(lambda: exchange)`.
+
+    Every REST method sleeps `latency` seconds first. `serve()` exposes the
+    streams over a localhost WebSocket server in Binance's URL layout.
+    """
+
+    def __init__(self, paths, interval="1m", balance=10_000.0, leverage=20, fee_rate=0.0004, latency=0.0,
+                 filters=None, start_time=START_TIME):
+        self.interval = interval
+        self.interval_ms = INTERVAL_MS[interval]
+        self.fee_rate = fee_rate
+        self.latency = latency
+        self.time = start_time
+        self.balance = float(balance)
+        self.paths = {symbol.upper(): list(path) for symbol, path in paths.items()}
+        self.filters = {symbol: {**DEFAULT_FILTERS, **(filters or {}).get(symbol, {})} for symbol in self.paths}
+        self.leverage = {symbol: leverage for symbol in self.paths}
+        self.candles = {symbol: [] for symbol in self.paths}
+        self.prices = {symbol: float(_candle(path[0], None)[0]) for symbol, path in self.paths.items()}
+        self.positions = {symbol: [0.0, 0.0] for symbol in self.paths}
+        self.orders = {}
+        self.requests = 0
+        self._cursor = 0
+        self._length = min(len(path) for path in self.paths.values())
+        self._order_ids = itertools.count(1)
+        self._listen_keys = set()
+        self._listeners = []
+        self._lock = threading.RLock()
+
+        self._loop = None
+        self._runner = None
+        self._connections = []
+
+    # ───── محرك المطابقة ─────
+    def step(self, count=1):
+        """Close the next `count` candles. Returns False once a path is exhausted."""
+        for _ in range(count):
+            with self._lock:
+                if self._cursor >= self._length:
+                    return False
+                open_time = self.time
+                self.time += self.interval_ms
+                events = []
+                for symbol, path in self.paths.items():
+                    candles = self.candles[symbol]
+                    previous = candles[-1][4] if candles else None
+                    o, h, l, c, v = _candle(path[self._cursor], previous)
+                    candles.append([open_time, o, h, l, c, v, self.time - 1])
+                    self.prices[symbol] = c
+                    self._match(symbol, o, h, l, events)
+                    events.append((f"{symbol.lower()}@kline_{self.interval}", {
+                        "e": "kline", "E": self.time, "s": symbol,
+                        "k": {"t": open_time, "T": self.time - 1, "s": symbol, "i": self.interval,
+                              "o": _fmt(o), "h": _fmt(h), "l": _fmt(l), "c": _fmt(c), "v": _fmt(v), "x": True},
+                    }))
+                    events.append((f"{symbol.lower()}@markPrice@1s", {
+                        "e": "markPriceUpdate", "E": self.time, "s": symbol, "p": _fmt(c),
+                    }))
+                self._cursor += 1
+                self._publish(events)
+        return True
+
+    def _match(self, symbol, open_, high, low, events):
+        resting = sorted((o for o in self.orders.values() if o["symbol"] == symbol and o["status"] == "NEW"),
+                         key=lambda o: o["orderId"])
+        for order in resting:
+            price = self._trigger_price(order, open_, high, low)
+            if price is not None:
+                self._execute(order, price, events)
+
+    @staticmethod
+    def _trigger_price(order, open_, high, low):
+        buy = order["side"] == "BUY"
+        if order["type"] == "LIMIT":
+            limit = float(order["price"])
+            if buy and low <= limit:
+                return min(limit, open_)
+            if not buy and high >= limit:
+                return max(limit, open_)
+            return None
+        stop = float(order["stopPrice"])
+        # STOP يتفعل عند الاختراق في اتجاه الأمر، و TAKE_PROFIT عكسه
+        rising = buy if order["type"] == "STOP_MARKET" else not buy
+        if rising and high >= stop:
+            return max(stop, open_)
+        if not rising and low <= stop:
+            return min(stop, open_)
+        return None
+
+    def _closable(self, symbol, side):
+        """Position size an order on `side` can reduce."""
+        amount = self.positions[symbol][0]
+        return abs(amount) if (amount > 0 and side == "SELL") or (amount < 0 and side == "BUY") else 0.0
+
+    def _execute(self, order, price, events):
+        quantity = float(order["origQty"])
+        if order["closePosition"]:
+            quantity = self._closable(order["symbol"], order["side"])
+        elif order["reduceOnly"]:
+            quantity = min(quantity, self._closable(order["symbol"], order["side"]))
+        if quantity <= 0:
+            self._set_status(order, "EXPIRED", events)
+            return
+
+        symbol = order["symbol"]
+        position = self.positions[symbol]
+        amount, entry = position
+        signed = quantity if order["side"] == "BUY" else -quantity
+        realized = 0.0
+        new_amount = round(amount + signed, 8)
+        if amount == 0 or (amount > 0) == (signed > 0):
+            entry = (entry * abs(amount) + price * quantity) / abs(new_amount)
+        else:
+            realized = (price - entry) * min(quantity, abs(amount)) * (1 if amount > 0 else -1)
+            if new_amount == 0:
+                entry = 0.0
+            elif (new_amount > 0) != (amount > 0):
+                entry = price
+        position[:] = [new_amount, entry]
+        fee = price * quantity * self.fee_rate
+        self.balance += realized - fee
+
+        if order["closePosition"]:
+            order["origQty"] = _fmt(quantity)
+        order.update({"executedQty": _fmt(quantity), "avgPrice": _fmt(price)})
+        self._set_status(order, "FILLED", events, last_price=price, last_qty=quantity, fee=fee, realized=realized)
+        events.append(("user", self._account_event(symbol)))
+
+    def _set_status(self, order, status, events, last_price=0.0, last_qty=0.0, fee=0.0, realized=0.0):
+        order["status"] = status
+        order["updateTime"] = self.time
+        execution = "TRADE" if status == "FILLED" else status
+        events.append(("user", {
+            "e": "ORDER_TRADE_UPDATE", "E": self.time, "T": self.time,
+            "o": {
+                "s": order["symbol"], "c": order["clientOrderId"], "S": order["side"], "o": order["type"],
+                "f": order["timeInForce"], "q": order["origQty"], "p": order["price"], "ap": order["avgPrice"],
+                "sp": order["stopPrice"], "x": execution, "X": status, "i": order["orderId"],
+                "l": _fmt(last_qty), "z": order["executedQty"], "L": _fmt(last_price), "N": "USDT",
+                "n": _fmt(fee), "T": self.time, "R": order["reduceOnly"], "cp": order["closePosition"],
+                "ps": "BOTH", "rp": _fmt(realized),
+            },
+        }))
+
+    def _account_event(self, symbol):
+        amount, entry = self.positions[symbol]
+        return {
+            "e": "ACCOUNT_UPDATE", "E": self.time, "T": self.time,
+            "a": {
+                "m": "ORDER",
+                "B": [{"a": "USDT", "wb": _fmt(self.balance), "cw": _fmt(self.balance), "bc": "0"}],
+                "P": [{"s": symbol, "pa": _fmt(amount), "ep": _fmt(entry),
+                       "up": _fmt((self.prices[symbol] - entry) * amount), "mt": "cross", "ps": "BOTH"}],
+            },
+        }
+
+    # ───── الأوامر ─────
+    def _new_order(self, params):
+        symbol = str(params.get("symbol", "")).upper()
+        if symbol not in self.paths:
+            raise _error(-1121, "Invalid symbol.")
+        side = params.get("side")
+        kind = params.get("type")
+        if side not in ("BUY", "SELL"):
+            raise _error(-1117, "Invalid side.")
+        if kind not in ORDER_TYPES:
+            raise _error(-1116, "Invalid orderType.")
+        close_position = _flag(params.get("closePosition"))
+        reduce_only = _flag(params.get("reduceOnly"))
+        quantity = float(params.get("quantity") or 0)
+        if quantity <= 0 and not close_position:
+            raise _error(-1102, "Mandatory parameter 'quantity' was not sent, was empty/null, or malformed.")
+        if kind == "LIMIT" and not params.get("price"):
+            raise _error(-1102, "Mandatory parameter 'price' was not sent, was empty/null, or malformed.")
+        if kind in ("STOP_MARKET", "TAKE_PROFIT_MARKET") and not params.get("stopPrice"):
+            raise _error(-1102, "Mandatory parameter 'stopPrice' was not sent, was empty/null, or malformed.")
+
+        last = self.prices[symbol]
+        if kind in ("STOP_MARKET", "TAKE_PROFIT_MARKET"):
+            stop = float(params["stopPrice"])
+            rising = (side == "BUY") == (kind == "STOP_MARKET")
+            if (rising and stop <= last) or (not rising and stop >= last):
+                raise _error(-2021, "Order would immediately trigger.")
+        if reduce_only and not self._closable(symbol, side):
+            raise _error(-2022, "ReduceOnly Order is rejected.")
+        if not (reduce_only or close_position):
+            price = float(params["price"]) if kind == "LIMIT" else last
+            used = sum(abs(a) * e / self.leverage[s] for s, (a, e) in self.positions.items())
+            if quantity * price / self.leverage[symbol] > self.balance - used:
+                raise _error(-2019, "Margin is insufficient.")
+
+        order_id = next(self._order_ids)
+        order = {
+            "orderId": order_id, "symbol": symbol, "status": "NEW",
+            "clientOrderId": params.get("newClientOrderId") or f"mock{order_id}",
+            "side": side, "type": kind, "origType": kind,
+            "origQty": _fmt(quantity), "executedQty": "0", "price": str(params.get("price", "0")),
+            "avgPrice": "0", "stopPrice": str(params.get("stopPrice", "0")),
+            "timeInForce": params.get("timeInForce", "GTC"), "reduceOnly": reduce_only,
+            "closePosition": close_position, "positionSide": "BOTH", "workingType": "CONTRACT_PRICE",
+            "updateTime": self.time,
+        }
+        self.orders[order_id] = order
+        events = []
+        self._set_status(order, "NEW", events)
+        marketable = kind == "LIMIT" and ((side == "BUY" and float(order["price"]) >= last)
+                                          or (side == "SELL" and float(order["price"]) <= last))
+        if kind == "MARKET" or marketable:
+            self._execute(order, last, events)
+        self._publish(events)
+        return dict(order)
+
+    def _rest(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self.requests += 1
+
+    def futures_create_order(self, **params):
+        self._rest()
+        with self._lock:
+            return self._new_order(params)
+
+    def futures_place_batch_order(self, batchOrders, **params):
+        self._rest()
+        if len(batchOrders) > BATCH_LIMIT:
+            raise _error(-1130, "Data sent for parameter 'batchOrders' is not valid.")
+        results = []
+        with self._lock:
+            for order in batchOrders:
+                try:
+                    results.append(self._new_order(order))
+                except BinanceAPIException as e:
+                    results.append({"code": e.code, "msg": e.message})
+        return results
+
+    def futures_cancel_order(self, symbol, orderId, **params):
+        self._rest()
+        with self._lock:
+            order = self.orders.get(int(orderId))
+            if order is None or order["symbol"] != symbol.upper() or order["status"] in FINAL_STATUSES:
+                raise _error(-2011, "Unknown order sent.")
+            events = []
+            self._set_status(order, "CANCELED", events)
+            self._publish(events)
+            return dict(order)
+
+    def futures_get_order(self, symbol, orderId, **params):
+        self._rest()
+        with self._lock:
+            order = self.orders.get(int(orderId))
+            if order is None or order["symbol"] != symbol.upper():
+                raise _error(-2013, "Order does not exist.")
+            return dict(order)
+
+    def futures_get_open_orders(self, symbol=None, **params):
+        self._rest()
+        with self._lock:
+            return [dict(o) for o in self.orders.values()
+                    if o["status"] == "NEW" and (symbol is None or o["symbol"] == symbol.upper())]
+
+    # ───── الحساب والسوق ─────
+    def futures_account_balance(self, **params):
+        self._rest()
+        with self._lock:
+            used = sum(abs(a) * e / self.leverage[s] for s, (a, e) in self.positions.items())
+            return [{"asset": "USDT", "balance": _fmt(self.balance), "crossWalletBalance": _fmt(self.balance),
+                     "availableBalance": _fmt(self.balance - used), "updateTime": self.time}]
+
+    def futures_position_information(self, symbol=None, **params):
+        self._rest()
+        with self._lock:
+            return [{
+                "symbol": s, "positionAmt": _fmt(amount), "entryPrice": _fmt(entry),
+                "markPrice": _fmt(self.prices[s]), "unRealizedProfit": _fmt((self.prices[s] - entry) * amount),
+                "leverage": str(self.leverage[s]), "marginType": "cross", "positionSide": "BOTH",
+                "updateTime": self.time,
+            } for s, (amount, entry) in self.positions.items() if symbol is None or s == symbol.upper()]
+
+    def futures_change_leverage(self, symbol, leverage, **params):
+        self._rest()
+        with self._lock:
+            self.leverage[symbol.upper()] = int(leverage)
+            return {"symbol": symbol.upper(), "leverage": int(leverage), "maxNotionalValue": "1000000"}
+
+    def futures_symbol_ticker(self, symbol=None, **params):
+        self._rest()
+        with self._lock:
+            tickers = [{"symbol": s, "price": _fmt(p), "time": self.time} for s, p in self.prices.items()]
+        if symbol is None:
+            return tickers
+        for ticker in tickers:
+            if ticker["symbol"] == symbol.upper():
+                return ticker
+        raise _error(-1121, "Invalid symbol.")
+
+    def futures_time(self, **params):
+        self._rest()
+        return {"serverTime": self.time}
+
+    def futures_klines(self, symbol, interval, limit=500, startTime=None, endTime=None, **params):
+        """Closed candles in Binance's row format; only the exchange's own interval is available."""
+        self._rest()
+        if interval != self.interval:
+            raise _error(-1120, "Invalid interval.")
+        with self._lock:
+            rows = self.candles.get(symbol.upper())
+            if rows is None:
+                raise _error(-1121, "Invalid symbol.")
+            rows = [r for r in rows if (startTime is None or r[0] >= int(startTime))
+                    and (endTime is None or r[0] <= int(endTime))]
+            rows = rows[:int(limit)] if startTime is not None else rows[-int(limit):]
+            return [[r[0], _fmt(r[1]), _fmt(r[2]), _fmt(r[3]), _fmt(r[4]), _fmt(r[5]), r[6],
+                     _fmt(r[4] * r[5]), 1, "0", "0", "0"] for r in rows]
+
+    def futures_exchange_info(self, **params):
+        self._rest()
+        return {"serverTime": self.time, "symbols": [{
+            "symbol": symbol, "status": "TRADING", "baseAsset": symbol[:-4], "quoteAsset": "USDT",
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": "0.01", "maxPrice": "10000000", "tickSize": f["tick_size"]},
+                {"filterType": "LOT_SIZE", "minQty": f["min_qty"], "maxQty": "100000", "stepSize": f["step_size"]},
+                {"filterType": "MIN_NOTIONAL", "notional": f["min_notional"]},
+            ],
+        } for symbol, f in self.filters.items()]}
+
+    def futures_leverage_bracket(self, **params):
+        self._rest()
+        return [{"symbol": symbol, "brackets": [{"bracket": 1, "initialLeverage": 125}]} for symbol in self.paths]
+
+    def futures_stream_get_listen_key(self, **params):
+        self._rest()
+        with self._lock:
+            key = f"mock-listen-key-{len(self._listen_keys) + 1}"
+            self._listen_keys.add(key)
+            return key
+
+    def futures_stream_keepalive(self, listenKey, **params):
+        self._rest()
+        if listenKey not in self._listen_keys:
+            raise _error(-1125, "This listenKey does not exist.")
+        return {}
+
+    # ───── البث ─────
+    def add_listener(self, listener):
+        """Call `listener(stream, event)` in-process for every event; stream is "user" for user-data events."""
+        self._listeners.append(listener)
+
+    def _publish(self, events):
+        # يُستدعى والقفل ممسوك حتى يصل كل مستمع إلى الأحداث بترتيب حدوثها
+        for stream, event in events:
+            for listener in self._listeners:
+                try:
+                    listener(stream, event)
+                except Exception as e:
+                    print(f"⚠️ Mock exchange listener failed: {e}")
+        if self._loop is not None and events:
+            self._loop.call_soon_threadsafe(self._dispatch, events)
+
+    def _dispatch(self, events):
+        marks = [event for stream, event in events if stream.endswith("@markPrice@1s")]
+        for streams, queue in self._connections:
+            if streams is None:
+                for stream, event in events:
+                    if stream == "user":
+                        queue.put_nowait(json.dumps(event))
+                continue
+            for stream, event in events:
+                if stream in streams:
+                    queue.put_nowait(json.dumps({"stream": stream, "data": event}))
+            if marks and "!markPrice@arr@1s" in streams:
+                queue.put_nowait(json.dumps({"stream": "!markPrice@arr@1s", "data": marks}))
+
+    async def _handle(self, request, streams):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        queue = asyncio.Queue()
+        connection = (streams, queue)
+        self._connections.append(connection)
+
+        async def write():
+            while True:
+                await ws.send_str(await queue.get())
+
+        writer = asyncio.ensure_future(write())
+        try:
+            async for _ in ws:
+                pass
+        finally:
+            self._connections.remove(connection)
+            writer.cancel()
+        return ws
+
+    async def _user_stream(self, request):
+        if request.match_info["key"] not in self._listen_keys:
+            raise web.HTTPBadRequest(text="Invalid listenKey")
+        return await self._handle(request, None)
+
+    async def _market_stream(self, request):
+        return await self._handle(request, set(request.query.get("streams", "").split("/")))
+
+    async def _start_server(self, host, port):
+        app = web.Application()
+        app.router.add_get("/ws/{key}", self._user_stream)
+        app.router.add_get("/stream", self._market_stream)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        return f"http://{host}:{site._server.sockets[0].getsockname()[1]}"
+
+    def serve(self, host="127.0.0.1", port=0):
+        """Start the WebSocket streams on a background thread and return their base URL."""
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(self._start_server(host, port), self._loop).result()
+
+    def close(self):
+        if self._loop is None:
+            return
+        loop, self._loop = self._loop, None
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+
+
+def random_walk(steps, start=30_000.0, volatility=0.001, seed=0):
+    """Deterministic geometric random-walk closes for a scripted path."""
+    rng = np.random.default_rng(seed)
+    return start * np.exp(np.cumsum(rng.normal(0.0, volatility, steps)))
+
+
+def benchmark(trades=100, latency=0.001, symbol="BTCUSDT", seed=7, distance=0.005):
+    """
+    Signal-to-fill benchmark of the live path against a MockExchange:
+    TradeExecutor → batchOrders bracket → user-data stream over WebSocket →
+    OrderManager. Each trade enters at market with SL/TP `distance` away and
+    the path is stepped until the bracket closes. Uses the process-wide
+    binance_api client and order_manager, so run it as a script.
+    """
+    import tempfile
+
+    from core import binance_api
+    from core.order_tracker import order_manager
+    from core.symbol_info import symbol_info
+    from core.user_stream import UserDataStream
+    from strategies.trade_executor import TradeExecutor
+
+    exchange = MockExchange({symbol: random_walk(trades * 500 + 100, seed=seed)}, latency=latency, balance=1e6)
+    exchange.step(100)
+    url = exchange.serve()
+    binance_api.set_client_factory(lambda: exchange)
+    symbol_info.path = f"{tempfile.mkdtemp()}/exchange_info.json"
+    symbol_info.refresh(force=True)
+
+    filled = threading.Event()
+    stream = UserDataStream(binance_api.create_listen_key, binance_api.keepalive_listen_key, base_url=url)
+    stream.subscribe("ORDER_TRADE_UPDATE",
+                     lambda e: filled.set() if e["o"]["o"] == "MARKET" and e["o"]["X"] == "FILLED" else None)
+    order_manager.attach(stream)
+    stream.start()
+    stream.connected.wait(5)
+
+    executor = TradeExecutor(symbol, is_scalp_fast=True)
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(trades):
+        price = exchange.prices[symbol]
+        filled.clear()
+        t0 = time.perf_counter()
+        bracket = executor.execute_trade("BUY", price, price * (1 - distance), price * (1 + distance))
+        filled.wait(5)
+        latencies.append(time.perf_counter() - t0)
+        while exchange.positions[symbol][0] and exchange.step():
+            pass
+        if bracket is not None:
+            bracket["closed"].wait(5)
+    elapsed = time.perf_counter() - start
+
+    stream.stop()
+    exchange.close()
+    binance_api.set_client_factory(None)
+    latencies = np.array(latencies) * 1000
+    return {
+        "trades": trades,
+        "requests": exchange.requests,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "trades_per_s": trades / elapsed,
+        "balance": exchange.balance,
+    }
+
+
+# مثال للاستخدام:
+if __name__ == "__main__":
+    for rest_latency in (0.0, 0.005, 0.05):
+        stats = benchmark(trades=50, latency=rest_latency)
+        print(f"latency {rest_latency * 1000:.0f}ms: {stats}")
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+
+# open_time, open, high, low, close, volume, close_time
+COLUMNS = ["open_time", "open", "high", "low", "close", "volume", "close_time"]
+FRAME_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+class OHLCVBuffer:
+    """
+    Fixed-capacity rolling candle store backed by one preallocated array.
+
+    Every slot is written twice (at i and i + capacity) so the newest `size`
+    candles are always one contiguous slice: appends are O(1) and column
+    access never copies. Rows follow the COLUMNS layout.
+    """
+
+    def __init__(self, capacity, rows=None):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.full((len(COLUMNS), 2 * capacity), np.nan)
+        self._head = 0
+        self._size = 0
+        if rows is not None and len(rows):
+            self.extend(rows)
+
+    def __len__(self):
+        return self._size
+
+    def _slice(self, n=None):
+        n = self._size if n is None else min(n, self._size)
+        end = self._head + self.capacity
+        return slice(end - n, end)
+
+    def append(self, row):
+        """Add one candle, dropping the oldest when full."""
+        self._data[:, self._head] = row
+        self._data[:, self._head + self.capacity] = row
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def extend(self, rows):
+        rows = np.asarray(rows, dtype=np.float64)[-self.capacity:]
+        n = len(rows)
+        if n == 0:
+            return
+        slots = (self._head + np.arange(n)) % self.capacity
+        self._data[:, slots] = rows.T
+        self._data[:, slots + self.capacity] = rows.T
+        self._head = (self._head + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def update_last(self, row):
+        """Overwrite the newest candle (used while a candle is still forming)."""
+        if self._size == 0:
+            return self.append(row)
+        slot = (self._head - 1) % self.capacity
+        self._data[:, slot] = row
+        self._data[:, slot + self.capacity] = row
+
+    def upsert(self, row):
+        """Append a newer candle or refresh the newest one; older candles are ignored."""
+        if self._size and row[0] == self.last_open_time:
+            self.update_last(row)
+        elif not self._size or row[0] > self.last_open_time:
+            self.append(row)
+
+    def pop(self, n=1):
+        n = min(n, self._size)
+        self._head = (self._head - n) % self.capacity
+        self._size -= n
+
+    def truncate_from(self, open_time):
+        """Drop every candle that opened at or after `open_time`."""
+        times = self.column("open_time")
+        self.pop(len(times) - int(np.searchsorted(times, open_time)))
+
+    @property
+    def last_open_time(self):
+        return self._data[0, (self._head - 1) % self.capacity] if self._size else None
+
+    def column(self, name, n=None):
+        """Read-only zero-copy view of one column for the newest `n` candles."""
+        view = self._data[COLUMNS.index(name), self._slice(n)]
+        view.flags.writeable = False
+        return view
+
+    def rows(self, n=None):
+        """Read-only (n, len(COLUMNS)) view of the newest candles."""
+        view = self._data[:, self._slice(n)].T
+        view.flags.writeable = False
+        return view
+
+    def to_array(self, n=None):
+        return np.ascontiguousarray(self.rows(n))
+
+    def frame(self, n=None, copy=False):
+        """
+        OHLCV DataFrame indexed by open time. Without `copy` the values share
+        memory with the buffer, so it is only valid until the next write.
+        """
+        s = self._slice(n)
+        index = pd.to_datetime(self._data[0, s].astype("int64"), unit="ms")
+        index.name = "timestamp"
+        values = self._data[1:6, s].T
+        if copy:
+            values = values.copy()
+        return pd.DataFrame(values, index=index, columns=FRAME_COLUMNS, copy=False)
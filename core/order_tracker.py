@@ -1,3 +1,151 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 def track_order_execution(order):
     # يمكنك تحسين الدالة لاحقًا أو وضع منطقك هنا
-    return True
\ No newline at end of file
+    return True
+
+# حالات نهائية للأمر في أحداث ORDER_TRADE_UPDATE
+FINAL_STATUSES = {"FILLED", "CANCELED", "EXPIRED", "REJECTED"}
+
+# عدد الحالات النهائية المحفوظة لأوامر لم تُسجَّل بعد
+EARLY_EVENTS_LIMIT = 1000
+
+def order_id(order):
+    """orderId from a raw Binance order, a place_order() result or a plain id."""
+    if isinstance(order, dict):
+        if "main" in order:
+            order = order["main"]
+        return order.get("orderId") if order else None
+    return order
+
+def _default_cancel(symbol, order_id):
+    from core.binance_api import cancel_order
+    return cancel_order(symbol, order_id)
+
+def _closes_position(order):
+    """True for a closePosition leg (TAKE_PROFIT_MARKET), False for a reduce-only ladder leg or a plain id."""
+    if isinstance(order, dict):
+        order = order.get("main", order) or {}
+        return order.get("closePosition") in (True, "true")
+    return False
+
+class OrderManager:
+    """
+    Tracks TP/SL brackets from ORDER_TRADE_UPDATE events instead of polling.
+
+    A bracket is one SL and one or more TP legs (a ladder of reduce-only
+    LIMIT orders, or closePosition orders). It closes when the SL fills, a
+    closePosition TP fills or every TP leg has filled; the legs still open
+    are then cancelled on a worker thread so the stream thread never waits
+    on REST calls. Any number of brackets can be open at once;
+    `on_close(bracket)` is called once per bracket with bracket["result"]
+    set to "TP" or "SL".
+    """
+
+    def __init__(self, cancel=_default_cancel):
+        self.cancel = cancel
+        self._brackets = {}
+        self._legs = {}
+        self._early = OrderedDict()
+        self._lock = threading.Lock()
+        self._worker = ThreadPoolExecutor(max_workers=2)
+
+    def attach(self, stream):
+        """Subscribe to a UserDataStream's order events."""
+        stream.subscribe("ORDER_TRADE_UPDATE", self.on_order_update)
+
+    def track_bracket(self, symbol, tp_orders, sl_order, on_close=None):
+        """
+        Track one bracket. `tp_orders` is one TP order or the whole ladder;
+        orders are raw Binance orders, place_order() results or plain ids.
+        """
+        if not isinstance(tp_orders, (list, tuple)):
+            tp_orders = [tp_orders]
+        tp_ids = [order_id(order) for order in tp_orders]
+        sl_id = order_id(sl_order)
+        if not tp_ids or sl_id is None or None in tp_ids:
+            raise ValueError(f"Bracket for {symbol} needs order ids for every leg (TP {tp_ids}, SL {sl_id})")
+        bracket = {
+            "symbol": symbol,
+            "tp": tp_ids,
+            "sl": sl_id,
+            "result": None,
+            "on_close": on_close,
+            "closed": threading.Event(),
+            "closing": {i for i, order in zip(tp_ids, tp_orders) if _closes_position(order)},
+            "filled": set(),
+            "pending": set(tp_ids) | {sl_id},
+        }
+        legs = [(i, "TP") for i in tp_ids] + [(sl_id, "SL")]
+        with self._lock:
+            self._brackets[(symbol, sl_id)] = bracket
+            for i, leg in legs:
+                self._legs[(symbol, i)] = (bracket, leg)
+            # الحدث قد يصل قبل أن يعيد REST رقم الأمر
+            early = [(i, leg, self._early.pop((symbol, i), None)) for i, leg in legs]
+        for i, leg, status in early:
+            if status is not None:
+                self._leg_update(bracket, i, leg, status)
+        return bracket
+
+    def open_brackets(self):
+        with self._lock:
+            return [b for b in self._brackets.values() if b["result"] is None]
+
+    def on_order_update(self, event):
+        order = event.get("o", {})
+        status = order.get("X")
+        if status not in FINAL_STATUSES:
+            return
+        key = (order.get("s"), order.get("i"))
+        with self._lock:
+            entry = self._legs.get(key)
+            if entry is None:
+                self._early[key] = status
+                while len(self._early) > EARLY_EVENTS_LIMIT:
+                    self._early.popitem(last=False)
+                return
+        self._leg_update(entry[0], key[1], entry[1], status)
+
+    def _leg_update(self, bracket, leg_id, leg, status):
+        closed = False
+        with self._lock:
+            bracket["pending"].discard(leg_id)
+            self._legs.pop((bracket["symbol"], leg_id), None)
+            if status == "FILLED":
+                bracket["filled"].add(leg_id)
+                if bracket["result"] is None and (leg == "SL" or leg_id in bracket["closing"]
+                                                  or bracket["filled"].issuperset(bracket["tp"])):
+                    bracket["result"] = leg
+                    closed = True
+            # إلغاء أحد الأطراف يدويًا أو بسببنا: ننهي التتبع عندما تنتهي كل الأطراف
+            if not bracket["pending"]:
+                self._brackets.pop((bracket["symbol"], bracket["sl"]), None)
+            remaining = sorted(bracket["pending"], key=lambda i: i == bracket["sl"])
+
+        if closed:
+            names = ", ".join("SL" if i == bracket["sl"] else f"TP {i}" for i in remaining) or "nothing"
+            print(f"{'✅' if leg == 'TP' else '🛑'} {leg} hit on {bracket['symbol']}, cancelling {names}.")
+            self._worker.submit(self._close, bracket, remaining)
+
+    def _close(self, bracket, remaining):
+        for leg_id in remaining:
+            try:
+                self.cancel(bracket["symbol"], leg_id)
+            except Exception as e:
+                leg = "SL" if leg_id == bracket["sl"] else "TP"
+                print(f"❌ Failed to cancel {leg} order {leg_id} for {bracket['symbol']}: {e}")
+        bracket["closed"].set()
+        if bracket["on_close"]:
+            try:
+                bracket["on_close"](bracket)
+            except Exception as e:
+                print(f"❌ Bracket close handler failed: {e}")
+
+    def shutdown(self):
+        self._worker.shutdown(wait=True)
+
+# مدير مشترك يغذيه بث بيانات المستخدم (انظر strategy_engine)
+order_manager = OrderManager()
@@ -0,0 +1,271 @@
+import heapq
+import itertools
+import threading
+import time
+
+# حدود Binance Futures: وزن الطلبات لكل IP في الدقيقة، وعدد الأوامر لكل حساب
+WEIGHT_LIMIT = 2400
+ORDERS_PER_10S = 300
+ORDERS_PER_MINUTE = 1200
+
+# نسبة من وزن الدقيقة محجوزة للأوامر فلا تستهلكها طلبات البيانات
+ORDER_HEADROOM = 0.05
+
+# الأولوية: الأصغر يُخدم أولاً
+PRIORITY_ORDER = 0
+PRIORITY_ACCOUNT = 1
+PRIORITY_MARKET = 2
+
+
+def _header(headers, name):
+    if headers is None:
+        return None
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    return value
+
+
+class RateLimiter:
+    """
+    Shared request-weight and order-count budget for one IP/account.
+
+    Callers `acquire` before a request and `settle` with the response headers
+    after it. Waiting callers are served strictly by (priority, arrival), so an
+    order placed while kline fetches are queued goes out first, and market
+    data may only use the budget up to `1 - order_headroom` of the limit. The
+    used weight follows the exchange's X-MBX-USED-WEIGHT-1M header; a 418/429
+    response pauses every caller until its Retry-After has passed.
+    """
+
+    def __init__(self, weight_limit=WEIGHT_LIMIT, orders_per_10s=ORDERS_PER_10S,
+                 orders_per_minute=ORDERS_PER_MINUTE, order_headroom=ORDER_HEADROOM, clock=time.time):
+        self.weight_limit = weight_limit
+        self.orders_per_10s = orders_per_10s
+        self.orders_per_minute = orders_per_minute
+        self.order_headroom = order_headroom
+        self.clock = clock
+
+        self.used_weight = 0
+        self.orders_10s = 0
+        self.orders_1m = 0
+        self._reserved_weight = 0
+        self._reserved_orders = 0
+        self._minute = None
+        self._ten_seconds = None
+        self._banned_until = 0.0
+
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        # إحصاءات
+        self.calls = 0
+        self.total_weight = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.bans = 0
+
+    # ───── النوافذ الزمنية ─────
+    def _roll(self, now):
+        minute = int(now // 60)
+        if minute != self._minute:
+            self._minute = minute
+            self.used_weight = 0
+            self.orders_1m = 0
+        ten_seconds = int(now // 10)
+        if ten_seconds != self._ten_seconds:
+            self._ten_seconds = ten_seconds
+            self.orders_10s = 0
+
+    def _fits(self, weight, orders, priority, now):
+        if now < self._banned_until:
+            return False
+        limit = self.weight_limit
+        if priority != PRIORITY_ORDER:
+            limit = int(limit * (1 - self.order_headroom))
+        if self.used_weight + self._reserved_weight + weight > limit:
+            return False
+        if orders:
+            if self.orders_10s + self._reserved_orders + orders > self.orders_per_10s:
+                return False
+            if self.orders_1m + self._reserved_orders + orders > self.orders_per_minute:
+                return False
+        return True
+
+    def _until_next_window(self, now):
+        if now < self._banned_until:
+            return self._banned_until - now
+        return min(60 - now % 60, 10 - now % 10) + 0.01
+
+    # ───── الحجز والتسوية ─────
+    def acquire(self, weight=1, priority=PRIORITY_MARKET, orders=0, timeout=None):
+        """
+        Block until the request fits the budget and nothing more urgent is
+        waiting. Returns False if `timeout` (seconds) passes first.
+        """
+        ticket = (priority, next(self._seq))
+        with self._cond:
+            start = self.clock()
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    now = self.clock()
+                    self._roll(now)
+                    head = self._queue[0] == ticket
+                    if head and self._fits(weight, orders, priority, now):
+                        heapq.heappop(self._queue)
+                        break
+                    remaining = None if timeout is None else timeout - (now - start)
+                    if remaining is not None and remaining <= 0:
+                        self._queue.remove(ticket)
+                        heapq.heapify(self._queue)
+                        return False
+                    wait = self._until_next_window(now) if head else None
+                    if remaining is not None:
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            except BaseException:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                raise
+            finally:
+                self._cond.notify_all()
+
+            waited = self.clock() - start
+            if waited > 0.001:
+                self.waits += 1
+                self.wait_time += waited
+            self._reserved_weight += weight
+            self._reserved_orders += orders
+            return True
+
+    def settle(self, weight=1, orders=0, headers=None, status=None):
+        """Release a reservation and sync the counters with the response headers."""
+        with self._cond:
+            now = self.clock()
+            self._roll(now)
+            self._reserved_weight -= weight
+            self._reserved_orders -= orders
+            self.calls += 1
+            self.total_weight += weight
+
+            used = _header(headers, "X-MBX-USED-WEIGHT-1M")
+            self.used_weight = max(self.used_weight, int(used)) if used is not None else self.used_weight + weight
+            count_10s = _header(headers, "X-MBX-ORDER-COUNT-10S")
+            count_1m = _header(headers, "X-MBX-ORDER-COUNT-1M")
+            self.orders_10s = max(self.orders_10s, int(count_10s)) if count_10s is not None else self.orders_10s + orders
+            self.orders_1m = max(self.orders_1m, int(count_1m)) if count_1m is not None else self.orders_1m + orders
+
+            if status in (418, 429):
+                retry_after = _header(headers, "Retry-After")
+                pause = float(retry_after) if retry_after is not None else 60 - now % 60
+                self._banned_until = max(self._banned_until, now + pause)
+                self.bans += 1
+                print(f"🛑 Binance rate limit hit (HTTP {status}), pausing requests for {pause:.0f}s")
+            self._cond.notify_all()
+
+    def call(self, fn, *args, weight=1, priority=PRIORITY_MARKET, orders=0, **kwargs):
+        """Run `fn` inside acquire/settle (without headers, the weight is counted locally)."""
+        self.acquire(weight, priority, orders)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.settle(weight, orders)
+
+    def metrics(self):
+        with self._cond:
+            now = self.clock()
+            self._roll(now)
+            queued = {}
+            for priority, _ in self._queue:
+                queued[priority] = queued.get(priority, 0) + 1
+            return {
+                "used_weight": self.used_weight,
+                "reserved_weight": self._reserved_weight,
+                "weight_limit": self.weight_limit,
+                "remaining_weight": max(self.weight_limit - self.used_weight - self._reserved_weight, 0),
+                "orders_10s": self.orders_10s,
+                "orders_1m": self.orders_1m,
+                "window_reset_in": 60 - now % 60,
+                "banned_for": max(self._banned_until - now, 0.0),
+                "queued": queued,
+                "calls": self.calls,
+                "total_weight": self.total_weight,
+                "waits": self.waits,
+                "wait_time": self.wait_time,
+                "bans": self.bans,
+            }
+
+
+def _klines_weight(params):
+    from core.async_klines import klines_weight
+    return klines_weight(params.get("limit", 500))
+
+
+# (الوزن، الأولوية، عدد الأوامر) لدوال python-binance المستخدمة، حسب توثيق Binance Futures.
+# الوزن قد يكون دالة في معاملات الطلب.
+ENDPOINTS = {
+    "futures_create_order": (0, PRIORITY_ORDER, 1),
+    "futures_place_batch_order": (5, PRIORITY_ORDER, lambda params: len(params.get("batchOrders", []))),
+    "futures_cancel_order": (1, PRIORITY_ORDER, 0),
+    "futures_get_order": (1, PRIORITY_ACCOUNT, 0),
+    "futures_account_balance": (5, PRIORITY_ACCOUNT, 0),
+    "futures_account": (5, PRIORITY_ACCOUNT, 0),
+    "futures_position_information": (5, PRIORITY_ACCOUNT, 0),
+    "futures_stream_get_listen_key": (1, PRIORITY_ACCOUNT, 0),
+    "futures_stream_keepalive": (1, PRIORITY_ACCOUNT, 0),
+    "futures_leverage_bracket": (1, PRIORITY_ACCOUNT, 0),
+    "futures_symbol_ticker": (lambda params: 1 if "symbol" in params else 2, PRIORITY_MARKET, 0),
+    "futures_exchange_info": (1, PRIORITY_MARKET, 0),
+    "futures_time": (1, PRIORITY_MARKET, 0),
+    "futures_klines": (_klines_weight, PRIORITY_MARKET, 0),
+}
+DEFAULT_ENDPOINT = (1, PRIORITY_ACCOUNT, 0)
+
+
+class RateLimitedClient:
+    """
+    Wraps a python-binance Client so every `futures_*` call goes through a
+    RateLimiter with the weight and priority from ENDPOINTS. Response headers
+    are read through a requests session hook, per thread.
+    """
+
+    def __init__(self, client, limiter):
+        object.__setattr__(self, "_client", client)
+        object.__setattr__(self, "_limiter", limiter)
+        object.__setattr__(self, "_local", threading.local())
+        session = getattr(client, "session", None)
+        if session is not None:
+            session.hooks.setdefault("response", []).append(self._on_response)
+
+    def _on_response(self, response, *args, **kwargs):
+        self._local.headers = response.headers
+        self._local.status = response.status_code
+        return response
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not name.startswith("futures_") or not callable(attr):
+            return attr
+        weight, priority, orders = ENDPOINTS.get(name, DEFAULT_ENDPOINT)
+
+        def limited(*args, **params):
+            w = weight(params) if callable(weight) else weight
+            n = orders(params) if callable(orders) else orders
+            self._limiter.acquire(w, priority, n)
+            self._local.headers = self._local.status = None
+            try:
+                return attr(*args, **params)
+            finally:
+                self._limiter.settle(w, n, getattr(self._local, "headers", None), getattr(self._local, "status", None))
+
+        return limited
+
+    def __setattr__(self, name, value):
+        setattr(self._client, name, value)
+
+
+# ميزانية مشتركة لكل طلبات REST من هذه العملية (binance_api و KlineFetcher)
+rate_limiter = RateLimiter()
@@ -0,0 +1,198 @@
+import threading
+
+import numpy as np
+
+from core.candle_scheduler import next_close
+from core.kline_cache import interval_to_ms
+from core.kline_stream import FUTURES_STREAM_URL, KlineStream
+from core.ohlcv_buffer import OHLCVBuffer
+
+# الفريمات المشتقة افتراضيًا من شموع الدقيقة
+RESAMPLED_INTERVALS = ("3m", "5m", "15m", "30m", "1h", "2h", "4h")
+
+
+def bucket_open(open_time, interval):
+    """Open time of the `interval` candle that contains `open_time` (ms)."""
+    return next_close(open_time, interval) - interval_to_ms(interval)
+
+
+class CandleResampler:
+    """
+    Builds higher-timeframe candles from one closed base (1m) series per symbol.
+
+    Every closed base candle updates the forming candle of each interval in
+    O(1): high/low/close/volume are folded into the newest row, or a new row
+    is opened on a bucket boundary. Buckets follow the exchange's alignment
+    (weeks start on Monday), so the bars match what the exchange serves for
+    that interval. A bucket is only built from base candles if its first
+    minute was seen; earlier candles come from `seed` history instead.
+    """
+
+    def __init__(self, intervals=RESAMPLED_INTERVALS, base_interval="1m", window=500):
+        self.base_interval = base_interval
+        self.base_step = interval_to_ms(base_interval)
+        if self.base_step is None:
+            raise ValueError(f"Unsupported interval {base_interval}")
+        self.steps = {}
+        for interval in intervals:
+            step = interval_to_ms(interval)
+            if step is None or step <= self.base_step or step % self.base_step:
+                raise ValueError(f"{interval} cannot be built from {base_interval} candles")
+            self.steps[interval] = step
+        self.window = window
+        self._buffers = {}
+        self._last_base = {}
+        self._valid_from = {}
+        self._lock = threading.Lock()
+
+    @property
+    def intervals(self):
+        return list(self.steps)
+
+    def _buffer(self, symbol, interval):
+        key = (symbol, interval)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = OHLCVBuffer(self.window)
+        return buffer
+
+    def _add(self, symbol, row):
+        t = int(row[0])
+        last = self._last_base.get(symbol)
+        if last is not None and t <= last:
+            return []
+        self._last_base[symbol] = t
+        closed = []
+        for interval, step in self.steps.items():
+            start = bucket_open(t, interval)
+            valid_from = self._valid_from.setdefault((symbol, interval), next_close(t - 1, interval))
+            if start < valid_from:
+                # بداية هذه الشمعة لم تصل، فلا نبني شمعة ناقصة
+                continue
+            buffer = self._buffer(symbol, interval)
+            if len(buffer) and buffer.last_open_time == start:
+                current = buffer.rows(1)[0]
+                buffer.update_last([start, current[1], max(current[2], row[2]), min(current[3], row[3]),
+                                    row[4], current[5] + row[5], start + step - 1])
+            else:
+                buffer.append([start, row[1], row[2], row[3], row[4], row[5], start + step - 1])
+            if t + self.base_step == start + step:
+                closed.append(interval)
+        return closed
+
+    def add(self, symbol, row):
+        """
+        Feed one closed base candle (COLUMNS layout). Returns the intervals
+        whose candle closed with it; candles already seen are ignored.
+        """
+        with self._lock:
+            return self._add(symbol.upper(), row)
+
+    def extend(self, symbol, rows):
+        """Feed many closed base candles; returns every interval close they caused, in order."""
+        symbol = symbol.upper()
+        rows = np.asarray(rows, dtype=np.float64)
+        closed = []
+        with self._lock:
+            last = self._last_base.get(symbol)
+            if last is not None and len(rows):
+                rows = rows[np.searchsorted(rows[:, 0], last, side="right"):]
+            for row in rows:
+                closed.extend(self._add(symbol, row))
+        return closed
+
+    def seed(self, symbol, base_rows, higher=None):
+        """
+        Reset `symbol` from closed base candles plus, optionally, closed
+        history per interval ({interval: rows}) from the exchange. History is
+        kept up to the first bucket the base candles cover from its start;
+        from there on every candle is rebuilt from the base series.
+        """
+        symbol = symbol.upper()
+        base_rows = np.asarray(base_rows, dtype=np.float64)
+        with self._lock:
+            for interval in self.steps:
+                buffer = self._buffer(symbol, interval)
+                buffer.pop(len(buffer))
+                self._valid_from.pop((symbol, interval), None)
+            self._last_base.pop(symbol, None)
+            if not len(base_rows):
+                return
+            first, end = int(base_rows[0, 0]), int(base_rows[-1, 0]) + self.base_step
+            for interval, step in self.steps.items():
+                boundary = self._valid_from[(symbol, interval)] = next_close(first - 1, interval)
+                rows = (higher or {}).get(interval)
+                if rows is not None and len(rows):
+                    rows = np.asarray(rows, dtype=np.float64)
+                    keep = (rows[:, 0] < boundary) & (rows[:, 0] + step <= end)
+                    self._buffer(symbol, interval).extend(rows[keep])
+            for row in base_rows:
+                self._add(symbol, row)
+
+    def last_base_time(self, symbol):
+        """Open time of the newest base candle fed for `symbol`, or None."""
+        return self._last_base.get(symbol.upper())
+
+    def rows(self, symbol, interval, n=None):
+        with self._lock:
+            buffer = self._buffers.get((symbol.upper(), interval))
+            return None if buffer is None else buffer.to_array(n)
+
+    def frame(self, symbol, interval, n=None):
+        """Independent OHLCV DataFrame of the newest `n` candles, or None."""
+        with self._lock:
+            buffer = self._buffers.get((symbol.upper(), interval))
+            return None if buffer is None or not len(buffer) else buffer.frame(n, copy=True)
+
+
+class ResampledKlineStream(KlineStream):
+    """
+    KlineStream over a single base-interval stream per symbol. Higher
+    timeframes are derived by `resampler`, and `on_candle_close` fires for
+    every requested (symbol, interval) whose candle closed, the base one
+    included. `history(symbol)`, when given, returns (base_rows, {interval:
+    rows}) to reseed the resampler after each (re)connect.
+    """
+
+    def __init__(self, pairs, on_candle_close, resampler, base_url=FUTURES_STREAM_URL, window=100, seed=None,
+                 history=None):
+        self.resampler = resampler
+        self.wanted = {(symbol.upper(), interval) for symbol, interval in pairs}
+        for symbol, interval in self.wanted:
+            if interval != resampler.base_interval and interval not in resampler.steps:
+                raise ValueError(f"{interval} is not resampled from {resampler.base_interval}")
+        symbols = sorted({symbol for symbol, _ in self.wanted})
+        super().__init__([(symbol, resampler.base_interval) for symbol in symbols], on_candle_close,
+                         base_url=base_url, window=window, seed=seed)
+        self.history = history
+
+    async def on_connect(self):
+        await super().on_connect()
+        if self.history is None:
+            return
+        for symbol, _ in self.pairs:
+            try:
+                self.resampler.seed(symbol, *self.history(symbol))
+            except Exception as e:
+                print(f"⚠️ Could not seed resampled candles for {symbol}: {e}")
+
+    def handle_message(self, msg):
+        data = msg.get("data", msg)
+        if data.get("e") != "kline":
+            return
+        k = data["k"]
+        key = (k["s"].upper(), k["i"])
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            return
+        buffer.upsert(np.array([k["t"], k["o"], k["h"], k["l"], k["c"], k["v"], k["T"]], dtype=np.float64))
+        if not k.get("x"):
+            return
+
+        symbol = key[0]
+        # النافذة كلها مغلقة الآن، فتملأ أيضًا أي شموع فاتت أثناء الانقطاع
+        for interval in dict.fromkeys(self.resampler.extend(symbol, buffer.rows())):
+            if (symbol, interval) in self.wanted:
+                self._callbacks.submit(self._emit, symbol, interval, self.resampler.frame(symbol, interval, self.window))
+        if key in self.wanted:
+            self._callbacks.submit(self._emit, symbol, key[1], buffer.frame(copy=True))
@@ -0,0 +1,58 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from core.ohlcv_buffer import FRAME_COLUMNS
+
+
+class SharedOHLCV:
+    """
+    OHLCV DataFrame copied once into a shared memory block so worker processes
+    can read it without pickling the candles for every task.
+
+    Layout: the int64 timestamp index followed by one float64 row per column.
+    `spec` is a small picklable tuple that workers pass to `attach`. The
+    creating process owns the block and must call `close()` when done.
+    """
+
+    def __init__(self, data, columns=FRAME_COLUMNS):
+        self.columns = list(columns)
+        n = len(data)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(8 * n * (len(self.columns) + 1), 1))
+        index, values = _views(self._shm, n, len(self.columns))
+        index[:] = np.asarray(data.index, dtype="datetime64[ns]").view(np.int64)
+        values[:] = data[self.columns].to_numpy(dtype=np.float64).T
+        self.spec = (self._shm.name, n, tuple(self.columns), data.index.name)
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _views(shm, n, width):
+    index = np.ndarray((n,), dtype=np.int64, buffer=shm.buf)
+    values = np.ndarray((width, n), dtype=np.float64, buffer=shm.buf, offset=8 * n)
+    return index, values
+
+
+def attach(spec):
+    """
+    Read-only DataFrame over a block created by SharedOHLCV. Returns
+    (handle, data); keep the handle alive for as long as the data is used.
+    """
+    name, n, columns, index_name = spec
+    shm = shared_memory.SharedMemory(name=name)
+    index, values = _views(shm, n, len(columns))
+    index.flags.writeable = False
+    values.flags.writeable = False
+    timestamps = pd.DatetimeIndex(index.view("datetime64[ns]"), name=index_name)
+    return shm, pd.DataFrame(values.T, index=timestamps, columns=list(columns), copy=False)
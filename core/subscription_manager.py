@@ -2,22 +2,14 @@ import json
 
 import requests
 from datetime import datetime, timedelta
-from database.db_manager import get_connection, get_subscription_dates, get_user_id, get_user_device_id, set_user_device_id, update_user_status
+from database.db_manager import get_connection, get_subscription_dates, get_user_id, get_user_device_id, set_user_device_id, subscription_days_left, update_user_status
 from core.utils import decrypt_dev_info
 
 USDT_WALLET_ADDRESS = "TRX-USDT-XXXXXXXXXXXXXXXXX"  # العنوان الثابت للمطور
 
 def get_days_remaining(username):
     _, end_str = get_subscription_dates(username)
-    if not end_str:
-        return None
-    try:
-        end_date = datetime.fromisoformat(end_str)
-        delta = end_date - datetime.now()
-        days_left = delta.days + (1 if delta.seconds > 0 else 0)
-        return days_left
-    except Exception:
-        return None
+    return subscription_days_left(end_str)
 
 def should_show_renewal_prompt(username):
     days = get_days_remaining(username)
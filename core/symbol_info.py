@@ -0,0 +1,199 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+# نسخة محلية من exchangeInfo حتى لا نطلبها في كل تشغيل
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "exchange_info.json")
+
+# عمر النسخة المحلية قبل إعادة التحميل (بالثواني)
+MAX_AGE = 6 * 60 * 60
+
+# مهلة قبل إعادة المحاولة بعد فشل التحميل
+RETRY_DELAY = 60
+
+# قائمة احتياطية للواجهة إذا تعذر تحميل الرموز
+DEFAULT_PAIRS = ["BTCUSDT", "ETHUSDT", "BNBUSDT"]
+
+
+def _decimals(step):
+    """Number of decimals in a filter step string such as "0.00100000"."""
+    step = step.rstrip("0")
+    return len(step.split(".")[1]) if "." in step else 0
+
+
+def parse_symbol(raw):
+    """Flatten one exchangeInfo symbol entry into the fields orders need."""
+    filters = {f["filterType"]: f for f in raw.get("filters", [])}
+    lot = filters.get("LOT_SIZE", {})
+    market_lot = filters.get("MARKET_LOT_SIZE", lot)
+    price = filters.get("PRICE_FILTER", {})
+    notional = filters.get("MIN_NOTIONAL", {})
+    step_size = lot.get("stepSize", "0.001")
+    tick_size = price.get("tickSize", "0.0001")
+    return {
+        "symbol": raw["symbol"],
+        "status": raw.get("status"),
+        "base_asset": raw.get("baseAsset"),
+        "quote_asset": raw.get("quoteAsset"),
+        "step_size": float(step_size),
+        "quantity_decimals": _decimals(step_size),
+        "min_qty": float(lot.get("minQty", 0)),
+        "max_qty": float(lot.get("maxQty", "inf")),
+        "market_max_qty": float(market_lot.get("maxQty", "inf")),
+        "tick_size": float(tick_size),
+        "price_decimals": _decimals(tick_size),
+        "min_price": float(price.get("minPrice", 0)),
+        "max_price": float(price.get("maxPrice", 0)) or float("inf"),
+        # العقود الآجلة تسمي الحد "notional" والفوري "minNotional"
+        "min_notional": float(notional.get("notional", notional.get("minNotional", 0))),
+        "max_leverage": None,
+    }
+
+
+def _fetch_exchange_info():
+    from core.binance_api import client
+    return client.futures_exchange_info()
+
+
+def _fetch_leverage_brackets():
+    from core.binance_api import client
+    return client.futures_leverage_bracket()
+
+
+class SymbolInfo:
+    """
+    exchangeInfo metadata per symbol: LOT_SIZE, PRICE_FILTER, MIN_NOTIONAL
+    and max leverage, with O(1) lookups.
+
+    Loaded lazily on first use from the local copy, or from the exchange when
+    that copy is older than `max_age`; if a refresh fails the stale copy is
+    kept. Rounding helpers accept scalars or NumPy arrays.
+    """
+
+    def __init__(self, fetch_exchange_info=_fetch_exchange_info, fetch_leverage_brackets=_fetch_leverage_brackets,
+                 path=CACHE_PATH, max_age=MAX_AGE):
+        self.fetch_exchange_info = fetch_exchange_info
+        self.fetch_leverage_brackets = fetch_leverage_brackets
+        self.path = path
+        self.max_age = max_age
+        self.updated = None
+        self._symbols = None
+        self._failed_at = None
+        self._lock = threading.Lock()
+
+    # ───── التحميل والتخزين ─────
+    def _read(self):
+        try:
+            with open(self.path, "r") as f:
+                cached = json.load(f)
+            return cached["updated"], cached["symbols"]
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+    def _persist(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"updated": self.updated, "symbols": self._symbols}, f)
+        os.replace(tmp, self.path)
+
+    def _download(self):
+        symbols = {raw["symbol"]: parse_symbol(raw) for raw in self.fetch_exchange_info()["symbols"]}
+        if self.fetch_leverage_brackets is not None:
+            try:
+                for entry in self.fetch_leverage_brackets():
+                    if entry["symbol"] in symbols and entry.get("brackets"):
+                        symbols[entry["symbol"]]["max_leverage"] = max(b["initialLeverage"] for b in entry["brackets"])
+            except Exception as e:
+                print(f"⚠️ Could not load leverage brackets: {e}")
+        return symbols
+
+    def refresh(self, force=False):
+        """Reload if the data is older than max_age (or always with force)."""
+        with self._lock:
+            now = time.time()
+            if self._symbols is None:
+                self.updated, self._symbols = self._read()
+            if not force and self.updated is not None and now - self.updated < self.max_age:
+                return
+            try:
+                self._symbols = self._download()
+                self.updated = now
+                self._persist()
+                self._failed_at = None
+            except Exception as e:
+                print(f"⚠️ Could not load exchangeInfo: {e}")
+                self._failed_at = now
+                if self._symbols is None:
+                    self._symbols = {}
+
+    def _data(self):
+        now = time.time()
+        stale = self._symbols is None or self.updated is None or now - self.updated >= self.max_age
+        if stale and (self._failed_at is None or now - self._failed_at >= RETRY_DELAY):
+            self.refresh()
+        return self._symbols
+
+    # ───── الاستعلام ─────
+    def get(self, symbol):
+        """Metadata dict for a symbol, or None if unknown."""
+        return self._data().get(symbol.upper())
+
+    def symbols(self, quote_asset="USDT", status="TRADING"):
+        return sorted(
+            name for name, info in self._data().items()
+            if (quote_asset is None or info["quote_asset"] == quote_asset)
+            and (status is None or info["status"] == status)
+        )
+
+    def pair_list(self):
+        """Symbols for the GUI pair combos, falling back to DEFAULT_PAIRS."""
+        return self.symbols() or list(DEFAULT_PAIRS)
+
+    def max_leverage(self, symbol):
+        info = self.get(symbol)
+        return None if info is None else info["max_leverage"]
+
+    # ───── التقريب ─────
+    @staticmethod
+    def _to_steps(values, step, decimals, mode):
+        values = np.asarray(values, dtype=np.float64)
+        # هامش صغير حتى لا تسقط قيمة مثل 0.3/0.1 = 2.9999999 خطوةً كاملة
+        steps = values / step
+        steps = np.floor(steps + 1e-9) if mode == "floor" else np.ceil(steps - 1e-9) if mode == "ceil" else np.round(steps)
+        rounded = np.round(steps * step, decimals)
+        return float(rounded) if rounded.ndim == 0 else rounded
+
+    def round_quantity(self, symbol, quantity):
+        """Quantity floored to LOT_SIZE stepSize (never more than requested), or None if unknown."""
+        info = self.get(symbol)
+        if info is None:
+            return None
+        return self._to_steps(quantity, info["step_size"], info["quantity_decimals"], "floor")
+
+    def round_price(self, symbol, price, mode="nearest"):
+        """Price on the PRICE_FILTER tick grid; mode is "nearest", "floor" or "ceil"."""
+        info = self.get(symbol)
+        if info is None:
+            return None
+        return self._to_steps(price, info["tick_size"], info["price_decimals"], mode)
+
+    def check_order(self, symbol, quantity, price):
+        """Reason the exchange would reject the order size, or None if it passes the filters."""
+        info = self.get(symbol)
+        if info is None:
+            return f"Unknown symbol {symbol}"
+        if quantity < info["min_qty"]:
+            return f"Quantity {quantity} below minimum {info['min_qty']}"
+        if quantity > info["max_qty"]:
+            return f"Quantity {quantity} above maximum {info['max_qty']}"
+        if price and quantity * price < info["min_notional"]:
+            return f"Notional {quantity * price:.4f} below minimum {info['min_notional']}"
+        return None
+
+
+# نسخة مشتركة تُحمَّل عند أول استخدام
+symbol_info = SymbolInfo()
@@ -0,0 +1,510 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from database.db_manager import ConnectionManager
+from database.log_writer import BatchWriter
+from database.models import create_journal_tables
+
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "database", "trade_journal.db")
+
+DAY_MS = 24 * 60 * 60_000
+
+# حفظ أعمدة الصفقات المغلقة على القرص بعد هذا العدد من الصفقات الجديدة
+SNAPSHOT_ROWS = 10_000
+
+# كمية أصغر من هذا تعتبر صفرًا عند إغلاق المركز
+QTY_EPSILON = 1e-12
+
+SIGNAL_COLUMNS = ("ts", "symbol", "timeframe", "strategy", "action", "price", "sl", "tp")
+ORDER_COLUMNS = ("order_id", "ts", "update_ts", "symbol", "strategy", "side", "type", "quantity", "price", "status")
+FILL_COLUMNS = ("ts", "symbol", "order_id", "strategy", "side", "quantity", "price", "fee", "realized_pnl")
+POSITION_COLUMNS = ("symbol", "strategy", "side", "entry_ts", "exit_ts", "quantity", "entry_price", "exit_price",
+                    "pnl", "fees")
+
+NUMERIC_POSITION_COLUMNS = ("entry_ts", "exit_ts", "quantity", "entry_price", "exit_price", "pnl", "fees")
+
+TEXT_COLUMNS = {"symbol", "timeframe", "strategy", "action", "side", "type", "status"}
+INT_COLUMNS = {"id", "ts", "update_ts", "entry_ts", "exit_ts", "order_id"}
+
+# عمود الوقت الذي تُفلتر به كل جدول
+TIME_COLUMN = {"signals": "ts", "orders": "ts", "fills": "ts", "positions": "exit_ts"}
+TABLE_COLUMNS = {"signals": SIGNAL_COLUMNS, "orders": ORDER_COLUMNS, "fills": FILL_COLUMNS,
+                 "positions": POSITION_COLUMNS}
+
+
+def _insert_sql(table, columns):
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+SIGNAL_SQL = _insert_sql("signals", SIGNAL_COLUMNS)
+FILL_SQL = _insert_sql("fills", FILL_COLUMNS)
+POSITION_SQL = _insert_sql("positions", POSITION_COLUMNS)
+# تحديثات نفس الأمر تعدّل صفه بدل إضافة صف جديد
+ORDER_SQL = _insert_sql("orders", ORDER_COLUMNS) + """
+    ON CONFLICT(symbol, order_id) DO UPDATE SET
+        update_ts = excluded.update_ts,
+        status = excluded.status,
+        strategy = COALESCE(orders.strategy, excluded.strategy)
+"""
+
+
+# صافي الكمية لكل رمز بعد آخر تنفيذ أعاده إلى صفر أو عكس اتجاهه؛ ما بعده هو المركز المفتوح
+OPEN_FILLS_SQL = f"""
+WITH running AS (
+    SELECT id, symbol, SUM(CASE side WHEN 'BUY' THEN quantity ELSE -quantity END)
+        OVER (PARTITION BY symbol ORDER BY id) AS net
+    FROM fills
+), steps AS (
+    SELECT id, symbol, net, LAG(net, 1, 0) OVER (PARTITION BY symbol ORDER BY id) AS before FROM running
+), last_flat AS (
+    SELECT symbol, MAX(CASE WHEN ABS(net) <= {QTY_EPSILON} OR net * before < 0 THEN id ELSE 0 END) AS id
+    FROM steps GROUP BY symbol
+)
+SELECT last_flat.symbol, last_flat.id, steps.net FROM last_flat LEFT JOIN steps ON steps.id = last_flat.id
+"""
+REPLAY_COLUMNS = ("id", "symbol", "side", "quantity", "price", "fee", "realized_pnl", "ts", "strategy")
+LAST_SIGNAL_SQL = "SELECT symbol, strategy FROM signals WHERE id IN (SELECT MAX(id) FROM signals GROUP BY symbol)"
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def _columns(rows, names):
+    """Rows from SQLite as {name: ndarray}; text columns are object arrays."""
+    values = list(zip(*rows)) if rows else [()] * len(names)
+    result = {}
+    for name, column in zip(names, values):
+        if name in TEXT_COLUMNS:
+            result[name] = np.array(column, dtype=object)
+        elif name in INT_COLUMNS:
+            result[name] = np.array(column, dtype=np.int64)
+        else:
+            # None (عمود فارغ) يصبح NaN
+            result[name] = np.array(column, dtype=np.float64)
+    return result
+
+
+class TradeJournal:
+    """
+    Persistent journal of signals, orders, fills and closed positions.
+
+    Writes are queued and inserted in batches by a BatchWriter. Fills are
+    folded into per-symbol round trips: a position row is written when the
+    net quantity returns to zero, attributed to the strategy of the latest
+    signal for that symbol. Queries return {column: ndarray} (or a
+    DataFrame) and are answered from covering indexes; pending writes are
+    flushed first.
+    """
+
+    def __init__(self, path=JOURNAL_PATH, **writer_options):
+        self.db = ConnectionManager(path)
+        self.writer = BatchWriter(self._transaction, **writer_options)
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._open = {}
+        self._strategies = {}
+        self._restored = False
+        # أعمدة الصفقات المغلقة في الذاكرة لتحليلات سريعة (انظر _position_cache)
+        self._cache = None
+        self._cache_id = 0
+        self._saved_id = 0
+        self.snapshot_path = os.path.splitext(path)[0] + "_positions.npz"
+        self._cache_lock = threading.Lock()
+        self._codes = {"symbol": {}, "strategy": {}}
+        self._names = {"symbol": [], "strategy": []}
+
+    def _connection(self):
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    with self.db.transaction() as cursor:
+                        create_journal_tables(cursor)
+                    self._schema_ready = True
+        return self.db.connection()
+
+    def _transaction(self):
+        self._connection()
+        return self.db.transaction()
+
+    # ───── التسجيل ─────
+    def record_signal(self, symbol, strategy, action, price, timeframe=None, sl=None, tp=None, ts=None):
+        symbol = symbol.upper()
+        with self._lock:
+            self._strategies[symbol] = strategy
+        return self.writer.put(SIGNAL_SQL, (ts or _now_ms(), symbol, timeframe, strategy, action, price, sl, tp))
+
+    def record_order(self, symbol, order_id, side, order_type, quantity, price, status, ts=None, strategy=None):
+        symbol = symbol.upper()
+        ts = ts or _now_ms()
+        strategy = strategy or self._strategies.get(symbol)
+        return self.writer.put(ORDER_SQL, (order_id, ts, ts, symbol, strategy, side, order_type, quantity, price,
+                                           status))
+
+    def record_fill(self, symbol, order_id, side, quantity, price, fee=0.0, realized_pnl=None, ts=None,
+                    strategy=None):
+        """
+        One execution. `realized_pnl` is the exchange's figure for the
+        reducing part; without it the PnL is computed from the entry price.
+        """
+        symbol = symbol.upper()
+        ts = ts or _now_ms()
+        with self._lock:
+            self._restore_open()
+            strategy = strategy or self._strategies.get(symbol)
+            closed = self._apply_fill(symbol, side, quantity, price, fee, realized_pnl, ts, strategy)
+        self.writer.put(FILL_SQL, (ts, symbol, order_id, strategy, side, quantity, price, fee, realized_pnl or 0.0))
+        for position in closed:
+            self.writer.put(POSITION_SQL, position)
+        return closed
+
+    def record_position(self, symbol, side, quantity, entry_price, exit_price, pnl, entry_ts, exit_ts, fees=0.0,
+                        strategy=None):
+        """Write a closed trade directly (imports, backtests)."""
+        return self.writer.put(POSITION_SQL, (symbol.upper(), strategy, side, entry_ts, exit_ts, quantity,
+                                              entry_price, exit_price, pnl, fees))
+
+    def _apply_fill(self, symbol, side, quantity, price, fee, realized_pnl, ts, strategy):
+        direction = 1 if side == "BUY" else -1
+        closed = []
+        remaining = quantity
+        position = self._open.get(symbol)
+        if position is not None and position["direction"] != direction:
+            closing = min(remaining, position["open"])
+            share = closing / quantity
+            entry_price = position["entry_value"] / position["quantity"]
+            position["open"] -= closing
+            position["exit_qty"] += closing
+            position["exit_value"] += closing * price
+            position["fees"] += fee * share
+            if realized_pnl is None:
+                position["pnl"] += (price - entry_price) * closing * position["direction"]
+            else:
+                position["pnl"] += realized_pnl
+            remaining -= closing
+            if position["open"] <= QTY_EPSILON:
+                del self._open[symbol]
+                closed.append((symbol, position["strategy"], "BUY" if position["direction"] > 0 else "SELL",
+                               position["entry_ts"], ts, position["quantity"], entry_price,
+                               position["exit_value"] / position["exit_qty"], position["pnl"], position["fees"]))
+        if remaining > QTY_EPSILON:
+            # مركز جديد، أو إضافة لمركز مفتوح، أو الجزء الزائد بعد انعكاس الاتجاه
+            position = self._open.get(symbol)
+            if position is None:
+                position = self._open[symbol] = {
+                    "direction": direction, "open": 0.0, "quantity": 0.0, "entry_value": 0.0, "exit_qty": 0.0,
+                    "exit_value": 0.0, "pnl": 0.0, "fees": 0.0, "entry_ts": ts, "strategy": strategy,
+                }
+            position["open"] += remaining
+            position["quantity"] += remaining
+            position["entry_value"] += remaining * price
+            position["fees"] += fee * remaining / quantity
+        return closed
+
+    def _restore_open(self):
+        """
+        Rebuild open round trips (and each symbol's latest signal strategy)
+        from the tables after a restart, replaying only the fills since the
+        last time each symbol's net quantity was flat or flipped. Called
+        once, under self._lock, before the first fill is applied.
+        """
+        if self._restored:
+            return
+        self._restored = True
+        conn = self._connection()
+        for symbol, strategy in conn.execute(LAST_SIGNAL_SQL).fetchall():
+            self._strategies.setdefault(symbol, strategy)
+        columns = ", ".join(REPLAY_COLUMNS)
+        for symbol, last_flat, net in conn.execute(OPEN_FILLS_SQL).fetchall():
+            rows = conn.execute(f"SELECT {columns} FROM fills WHERE symbol = ? AND id >= ? ORDER BY id",
+                                (symbol, last_flat)).fetchall()
+            for fill_id, _, side, quantity, price, fee, realized_pnl, ts, strategy in rows:
+                if fill_id == last_flat:
+                    # التنفيذ الذي عكس الاتجاه: الباقي منه فقط هو المركز المفتوح
+                    if abs(net) <= QTY_EPSILON:
+                        continue
+                    fee, quantity, realized_pnl = fee * abs(net) / quantity, abs(net), None
+                # rp = 0 يعني تنفيذًا يفتح المركز، فيُحسب الربح من سعر الدخول كما في التشغيل الحي
+                self._apply_fill(symbol, side, quantity, price, fee or 0.0, realized_pnl or None, ts, strategy)
+
+    def open_positions(self):
+        with self._lock:
+            self._restore_open()
+            return {symbol: dict(position) for symbol, position in self._open.items()}
+
+    def attach(self, stream):
+        """Journal every order update and fill from a UserDataStream."""
+        stream.subscribe("ORDER_TRADE_UPDATE", self.on_order_update)
+
+    def on_order_update(self, event):
+        o = event.get("o", {})
+        symbol, ts = o.get("s"), o.get("T") or event.get("T")
+        if not symbol:
+            return
+        price = float(o.get("ap") or 0) or float(o.get("p") or 0) or float(o.get("sp") or 0)
+        self.record_order(symbol, o.get("i"), o.get("S"), o.get("o"), float(o.get("q") or 0), price, o.get("X"),
+                          ts=ts)
+        if o.get("x") == "TRADE" and float(o.get("l") or 0) > 0:
+            self.record_fill(symbol, o.get("i"), o.get("S"), float(o["l"]), float(o["L"]), fee=float(o.get("n") or 0),
+                             realized_pnl=float(o["rp"]) if "rp" in o else None, ts=ts)
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+        with self._cache_lock:
+            self._save_snapshot()
+        self.db.close_all()
+
+    # ───── الاستعلامات ─────
+    def _where(self, table, symbol, strategy, start, end):
+        clauses, params = [], []
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            params.append(symbol.upper())
+        if strategy is not None:
+            clauses.append("strategy = ?")
+            params.append(strategy)
+        if start is not None:
+            clauses.append(f"{TIME_COLUMN[table]} >= ?")
+            params.append(int(start))
+        if end is not None:
+            clauses.append(f"{TIME_COLUMN[table]} < ?")
+            params.append(int(end))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, table="positions", symbol=None, strategy=None, start=None, end=None, columns=None):
+        """
+        {column: ndarray} of `table` rows ordered by time; `start`/`end` are
+        ms timestamps (end exclusive), filtering positions by exit time.
+        """
+        if table not in TABLE_COLUMNS:
+            raise ValueError(f"Unknown journal table {table}")
+        columns = tuple(columns or TABLE_COLUMNS[table])
+        self.flush()
+        where, params = self._where(table, symbol, strategy, start, end)
+        rows = self._connection().execute(
+            f"SELECT {', '.join(columns)} FROM {table}{where} ORDER BY {TIME_COLUMN[table]}", params).fetchall()
+        return _columns(rows, columns)
+
+    def frame(self, table="positions", **filters):
+        """query() as a DataFrame."""
+        return pd.DataFrame(self.query(table, **filters))
+
+    def _load_snapshot(self):
+        try:
+            with np.load(self.snapshot_path, allow_pickle=False) as saved:
+                cache = {name: saved[name] for name in saved.files if name not in ("cache_id", "names")}
+                cache_id = int(saved["cache_id"])
+                names = json.loads(str(saved["names"]))
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable journal snapshot {self.snapshot_path}: {e}")
+            return
+        # القاعدة أُعيد إنشاؤها بعد حفظ اللقطة
+        last_id = self._connection().execute("SELECT MAX(id) FROM positions").fetchone()[0]
+        if last_id is None or last_id < cache_id:
+            return
+        self._cache, self._cache_id, self._saved_id = cache, cache_id, cache_id
+        self._names = names
+        self._codes = {name: {value: code for code, value in enumerate(values)} for name, values in names.items()}
+
+    def _save_snapshot(self):
+        if not self._cache or self._saved_id == self._cache_id:
+            return
+        try:
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(f, cache_id=self._cache_id, names=json.dumps(self._names), **self._cache)
+            os.replace(tmp_path, self.snapshot_path)
+            self._saved_id = self._cache_id
+        except OSError as e:
+            print(f"⚠️ Could not save journal snapshot: {e}")
+
+    def _position_cache(self):
+        """
+        Every closed position as in-memory columns, topped up with the rows
+        written since the last call; symbol and strategy are integer codes
+        into self._names. The columns are saved next to the database every
+        SNAPSHOT_ROWS new positions so a restart does not read them all again.
+        """
+        self.flush()
+        with self._cache_lock:
+            if self._cache is None and os.path.exists(self.snapshot_path):
+                self._load_snapshot()
+            conn = self._connection()
+            rows = conn.execute(f"""
+                SELECT id, side = 'BUY', {', '.join(NUMERIC_POSITION_COLUMNS)}
+                FROM positions WHERE id > ? ORDER BY id
+            """, (self._cache_id,)).fetchall()
+            if not rows:
+                return self._cache
+            width = len(NUMERIC_POSITION_COLUMNS) + 2
+            values = np.fromiter(chain.from_iterable(rows), dtype=np.float64, count=width * len(rows))
+            values = values.reshape(len(rows), width)
+            last_id = int(values[-1, 0])
+            fresh = {"long": values[:, 1].astype(bool)}
+            for i, name in enumerate(NUMERIC_POSITION_COLUMNS, start=2):
+                fresh[name] = values[:, i].astype(np.int64) if name in INT_COLUMNS else values[:, i]
+
+            # النصوص تُحوّل إلى أرقام ثابتة لكل قيمة حتى تُفلتر وتُجمع كمصفوفات
+            labels = conn.execute("SELECT symbol, strategy FROM positions WHERE id > ? AND id <= ? ORDER BY id",
+                                  (self._cache_id, last_id)).fetchall()
+            for i, name in enumerate(("symbol", "strategy")):
+                codes = self._codes[name]
+                for value in {row[i] for row in labels} - codes.keys():
+                    codes[value] = len(self._names[name])
+                    self._names[name].append(value)
+                fresh[name] = np.fromiter((codes[row[i]] for row in labels), dtype=np.int64, count=len(labels))
+
+            self._cache_id = last_id
+            if self._cache:
+                fresh = {name: np.concatenate([self._cache[name], fresh[name]]) for name in fresh}
+            self._cache = fresh
+            if self._cache_id - self._saved_id >= SNAPSHOT_ROWS:
+                self._save_snapshot()
+            return self._cache
+
+    def _cached_mask(self, cache, symbol=None, strategy=None, start=None, end=None):
+        mask = np.ones(len(cache["exit_ts"]), dtype=bool)
+        for name, value in (("symbol", symbol.upper() if symbol else None), ("strategy", strategy)):
+            if value is not None:
+                mask &= cache[name] == self._codes[name].get(value, -1)
+        if start is not None:
+            mask &= cache["exit_ts"] >= start
+        if end is not None:
+            mask &= cache["exit_ts"] < end
+        return mask
+
+    def positions(self, symbol=None, strategy=None, start=None, end=None):
+        """
+        Closed positions as {column: ndarray} sorted by exit time, served
+        from the in-memory cache (only new rows are read from disk).
+        """
+        cache = self._position_cache()
+        if not cache:
+            return _columns([], POSITION_COLUMNS)
+        mask = self._cached_mask(cache, symbol, strategy, start, end)
+        order = np.argsort(cache["exit_ts"][mask], kind="stable")
+        result = {}
+        for name in POSITION_COLUMNS:
+            if name == "side":
+                result[name] = np.where(cache["long"][mask][order], "BUY", "SELL").astype(object)
+                continue
+            column = cache[name][mask][order]
+            result[name] = np.array(self._names[name], dtype=object)[column] if name in self._names else column
+        return result
+
+    def daily_pnl(self, symbol=None, strategy=None, start=None, end=None):
+        """Closed-position totals per UTC day: day (ms), trades, wins, pnl, fees."""
+        cache = self._position_cache()
+        if not cache:
+            return _columns([], ("day", "trades", "wins", "pnl", "fees"))
+        mask = self._cached_mask(cache, symbol, strategy, start, end)
+        days, index = np.unique(cache["exit_ts"][mask] // DAY_MS, return_inverse=True)
+        pnl = cache["pnl"][mask]
+        return {
+            "day": days * DAY_MS,
+            "trades": np.bincount(index, minlength=len(days)),
+            "wins": np.bincount(index, weights=pnl > 0, minlength=len(days)).astype(np.int64),
+            "pnl": np.bincount(index, weights=pnl, minlength=len(days)),
+            "fees": np.bincount(index, weights=cache["fees"][mask], minlength=len(days)),
+        }
+
+    def breakdown(self, by="strategy", start=None, end=None):
+        """Closed-position totals per strategy or symbol: key, trades, wins, pnl, fees."""
+        if by not in ("strategy", "symbol"):
+            raise ValueError("breakdown is by 'strategy' or 'symbol'")
+        cache = self._position_cache()
+        if not cache:
+            return _columns([], ("trades", "wins", "pnl", "fees")) | {"key": np.array([], dtype=object)}
+        mask = self._cached_mask(cache, start=start, end=end)
+        codes, pnl = cache[by][mask], cache["pnl"][mask]
+        size = len(self._names[by])
+        trades = np.bincount(codes, minlength=size)
+        present = np.flatnonzero(trades)
+        # نفس ترتيب ORDER BY في SQLite: القيمة الفارغة أولًا ثم أبجديًا
+        present = np.array(sorted(present, key=lambda code: (self._names[by][code] is not None,
+                                                              self._names[by][code] or "")), dtype=np.int64)
+        return {
+            "key": np.array(self._names[by], dtype=object)[present],
+            "trades": trades[present],
+            "wins": np.bincount(codes, weights=pnl > 0, minlength=size)[present].astype(np.int64),
+            "pnl": np.bincount(codes, weights=pnl, minlength=size)[present],
+            "fees": np.bincount(codes, weights=cache["fees"][mask], minlength=size)[present],
+        }
+
+
+# دفتر مشترك يغذيه execute_signals وبث بيانات المستخدم (انظر strategy_engine)
+trade_journal = TradeJournal()
+
+
+def benchmark(trades=300_000, symbols=20, strategies=8, days=365, seed=0):
+    """
+    Batched insert rate and query latency of a TradeJournal holding `trades`
+    random closed positions, on a scratch database. Returns {name: seconds}
+    plus "insert_rate" in rows per second. "cold_cache" is the first
+    analytics call without a snapshot, which reads every position from
+    SQLite once; "snapshot_cache" is the same call after a restart.
+    """
+    rng = np.random.default_rng(seed)
+    directory = tempfile.mkdtemp()
+    journal = TradeJournal(os.path.join(directory, "journal.db"), batch_size=5000)
+    symbol_names = [f"SYM{i}USDT" for i in range(symbols)]
+    strategy_names = [f"strategy_{i}" for i in range(strategies)]
+    exit_ts = np.sort(rng.integers(0, days * DAY_MS, trades)) + 1_700_000_000_000
+    pnl = rng.normal(0.5, 10, trades)
+
+    start = time.perf_counter()
+    for i in range(trades):
+        journal.record_position(symbol_names[i % symbols], "BUY", 1.0, 100.0, 100.0 + pnl[i], float(pnl[i]),
+                                int(exit_ts[i]) - 60_000, int(exit_ts[i]), fees=0.04,
+                                strategy=strategy_names[i % strategies])
+    journal.flush()
+    timings = {"insert_rate": trades / (time.perf_counter() - start)}
+
+    start = time.perf_counter()
+    journal.positions()
+    timings["cold_cache"] = time.perf_counter() - start
+    journal.close()
+
+    # تشغيل جديد: الأعمدة تُقرأ من اللقطة المحفوظة لا من SQLite
+    journal = TradeJournal(os.path.join(directory, "journal.db"))
+    start = time.perf_counter()
+    journal.positions()
+    timings["snapshot_cache"] = time.perf_counter() - start
+
+    queries = {
+        "all_positions": journal.positions,
+        "one_symbol_cached": lambda: journal.positions(symbol=symbol_names[0]),
+        "one_symbol": lambda: journal.query("positions", symbol=symbol_names[0], columns=("exit_ts", "pnl")),
+        "one_strategy_month": lambda: journal.query("positions", strategy=strategy_names[0], start=exit_ts[0],
+                                                    end=exit_ts[0] + 30 * DAY_MS, columns=("exit_ts", "pnl")),
+        "daily_pnl": journal.daily_pnl,
+        "by_strategy": lambda: journal.breakdown("strategy"),
+        "by_symbol": lambda: journal.breakdown("symbol"),
+    }
+    for name, query in queries.items():
+        start = time.perf_counter()
+        query()
+        timings[name] = time.perf_counter() - start
+
+    journal.close()
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+    return timings
+
+
+# مثال للاستخدام:
+if __name__ == "__main__":
+    for name, value in benchmark().items():
+        print(f"{name}: {value:.0f} rows/s" if name == "insert_rate" else f"{name}: {value * 1000:.1f} ms")
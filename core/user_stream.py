@@ -0,0 +1,89 @@
+import asyncio
+
+from core.kline_stream import FUTURES_STREAM_URL
+from core.ws_stream import StreamClient
+
+# Binance تنهي صلاحية listenKey بعد 60 دقيقة دون تجديد
+KEEPALIVE_INTERVAL = 30 * 60
+
+
+class UserDataStream(StreamClient):
+    """
+    Futures user-data stream (order, account and margin events).
+
+    A fresh listenKey is requested on every (re)connect and renewed every
+    `keepalive_interval` seconds. Handlers registered with `subscribe` receive
+    the raw event dict on the stream thread, so they must not block; anything
+    slow belongs on a worker thread.
+    """
+
+    def __init__(self, create_listen_key, keepalive_listen_key=None, base_url=FUTURES_STREAM_URL,
+                 keepalive_interval=KEEPALIVE_INTERVAL):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        self.create_listen_key = create_listen_key
+        self.keepalive_listen_key = keepalive_listen_key
+        self.keepalive_interval = keepalive_interval
+        self.listen_key = None
+        self._handlers = {}
+        self._connect_handlers = []
+        self._keepalive = None
+
+    def subscribe(self, event_type, handler):
+        """Call `handler(event)` for every event whose "e" field equals `event_type`."""
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    def on_connected(self, handler):
+        """
+        Call `handler()` after every (re)connect, on a worker thread so it may
+        use REST to resync state for events missed while disconnected.
+        """
+        self._connect_handlers.append(handler)
+
+    async def get_url(self):
+        # طلب REST متزامن، لذلك يُنفذ خارج حلقة الأحداث
+        loop = asyncio.get_running_loop()
+        self.listen_key = await loop.run_in_executor(None, self.create_listen_key)
+        return f"{self.base_url}/ws/{self.listen_key}"
+
+    async def on_connect(self):
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+        if self.keepalive_listen_key is not None:
+            self._keepalive = asyncio.ensure_future(self._keep_alive(self.listen_key))
+        loop = asyncio.get_running_loop()
+        for handler in self._connect_handlers:
+            loop.run_in_executor(None, self._run_connect_handler, handler)
+
+    @staticmethod
+    def _run_connect_handler(handler):
+        try:
+            handler()
+        except Exception as e:
+            print(f"❌ Stream connect handler failed: {e}")
+
+    async def _keep_alive(self, listen_key):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await loop.run_in_executor(None, self.keepalive_listen_key, listen_key)
+            except Exception as e:
+                print(f"⚠️ listenKey keepalive failed: {e}")
+
+    def handle_message(self, msg):
+        event_type = msg.get("e")
+        if event_type == "listenKeyExpired" and self._ws is not None:
+            # إغلاق الاتصال يجعل run() يعيد الاتصال بمفتاح جديد
+            asyncio.ensure_future(self._ws.close())
+            return
+        for handler in self._handlers.get(event_type, []):
+            try:
+                handler(msg)
+            except Exception as e:
+                print(f"❌ {event_type} handler failed: {e}")
+
+    def _shutdown(self):
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+        super()._shutdown()
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import threading
+
+import aiohttp
+
+
+class StreamClient:
+    """
+    Reconnecting JSON WebSocket reader.
+
+    Subclasses implement `handle_message(msg)` and may override `get_url()`
+    when the endpoint is only known at connect time. `run()` is a coroutine
+    for callers that already own an event loop; `start()` runs it on a
+    background thread.
+    """
+
+    def __init__(self, url=None, reconnect_delay=1.0, max_reconnect_delay=30.0, heartbeat=30.0):
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.heartbeat = heartbeat
+        self.connected = threading.Event()
+        self._loop = None
+        self._ws = None
+        self._stop_event = None
+        self._stopping = False
+        self._thread = None
+
+    async def get_url(self):
+        return self.url
+
+    async def on_connect(self):
+        pass
+
+    def handle_message(self, msg):
+        raise NotImplementedError
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        if self._stopping:
+            self._stop_event.set()
+        delay = self.reconnect_delay
+
+        async with aiohttp.ClientSession() as session:
+            while not self._stop_event.is_set():
+                try:
+                    url = await self.get_url()
+                    async with session.ws_connect(url, heartbeat=self.heartbeat) as ws:
+                        self._ws = ws
+                        delay = self.reconnect_delay
+                        await self.on_connect()
+                        self.connected.set()
+                        async for msg in ws:
+                            if msg.type == aiohttp.WSMsgType.TEXT:
+                                try:
+                                    self.handle_message(json.loads(msg.data))
+                                except Exception as e:
+                                    print(f"⚠️ Failed to handle stream message: {e}")
+                            elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                                break
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                    print(f"⚠️ Stream disconnected: {e}")
+                finally:
+                    self._ws = None
+                    self.connected.clear()
+
+                if self._stop_event.is_set():
+                    break
+                # إعادة الاتصال مع تأخير متزايد
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    def start(self):
+        """Run the stream on a daemon thread and return immediately."""
+        self._stopping = False
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def run_forever(self):
+        """Block the calling thread until the stream is stopped."""
+        asyncio.run(self.run())
+
+    def _shutdown(self):
+        self._stop_event.set()
+        if self._ws is not None:
+            asyncio.ensure_future(self._ws.close())
+
+    def stop(self, timeout=5.0):
+        self._stopping = True
+        if self._loop is not None and self._stop_event is not None and not self._loop.is_closed():
+            try:
+                self._loop.call_soon_threadsafe(self._shutdown)
+            except RuntimeError:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
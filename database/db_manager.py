@@ -1,97 +1,225 @@
 import os
 import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from core.utils import load_key, encrypt_data, decrypt_data
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "basim_trading.db")
 key = load_key()
 
+# WAL يسمح للقراءة بالاستمرار أثناء الكتابة، و NORMAL كافٍ معه دون fsync لكل commit
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# انتظار القفل بدل رمي "database is locked" فورًا (بالثواني)
+BUSY_TIMEOUT = 10.0
+
+# عدد الاستعلامات المحضّرة المحفوظة في كل اتصال
+STATEMENT_CACHE = 256
+
+
+class ConnectionManager:
+    """
+    One reused SQLite connection per thread (and per process after a fork),
+    opened with WAL journaling and the PRAGMAS above. sqlite3 keeps the
+    prepared statements of each connection, so repeated queries skip
+    parsing once the connection lives on.
+    """
+
+    def __init__(self, path, pragmas=PRAGMAS, timeout=BUSY_TIMEOUT):
+        self.path = path
+        self.pragmas = pragmas
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=self.timeout, cached_statements=STATEMENT_CACHE,
+                               check_same_thread=False)
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """
+        Cursor inside BEGIN IMMEDIATE ... COMMIT, rolled back on error. The
+        write lock is taken up front so two writers never deadlock upgrading
+        a read lock. Nested blocks join the outer transaction.
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn.cursor()
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn.cursor()
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def close(self):
+        """Close the calling thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+    def close_all(self):
+        # عند إيقاف البرنامج؛ الاتصالات المفتوحة في خيوط أخرى تُغلق أيضًا
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+
+class _ReusedConnection:
+    """
+    What get_connection() hands out: the thread's shared connection, whose
+    close() only discards uncommitted work instead of closing it.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn.in_transaction:
+            self._conn.rollback()
+
+
+db = ConnectionManager(DB_PATH)
+
 def get_connection():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    return conn, cursor
+    # نفس الواجهة القديمة (conn, cursor) لكن فوق اتصال الخيط المُعاد استخدامه
+    conn = db.connection()
+    return _ReusedConnection(conn), conn.cursor()
+
+def transaction():
+    return db.transaction()
+
+def fetch_one(sql, params=()):
+    return db.connection().execute(sql, params).fetchone()
+
+def fetch_all(sql, params=()):
+    return db.connection().execute(sql, params).fetchall()
+
+def execute(sql, params=()):
+    """Run one write statement in its own transaction; returns lastrowid."""
+    with db.transaction() as cursor:
+        cursor.execute(sql, params)
+        return cursor.lastrowid
 
 
 def user_exists(username):
     """Return True if a user with given username exists."""
-    conn, cursor = get_connection()
-    cursor.execute("SELECT 1 FROM users WHERE username = ?", (username,))
-    exists = cursor.fetchone() is not None
-    conn.close()
-    return exists
+    return fetch_one("SELECT 1 FROM users WHERE username = ?", (username,)) is not None
 
 # ───── إنشاء الجداول ─────
 def init_db():
-    conn, cursor = get_connection()
-
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE,
-        password TEXT,
-        is_superuser INTEGER DEFAULT 0,
-        device_id TEXT,
-        telegram_id TEXT,
-        status TEXT DEFAULT 'pending',
-        txid TEXT,
-        approved INTEGER DEFAULT 0,
-        start_date TEXT,
-        end_date TEXT
-    );
-    """)
-
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS subscriptions (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        start_date TEXT,
-        end_date TEXT,
-        is_active INTEGER DEFAULT 1,
-        FOREIGN KEY(user_id) REFERENCES users(id)
-    );
-    """)
-
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS user_settings (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        language TEXT DEFAULT 'en',
-        theme TEXT DEFAULT 'light',
-        notifications_enabled INTEGER DEFAULT 1,
-        FOREIGN KEY(user_id) REFERENCES users(id)
-    );
-    """)
-
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS activity_logs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER,
-        action TEXT,
-        timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY(user_id) REFERENCES users(id)
-    );
-    """)
-
-    conn.commit()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE,
+            password TEXT,
+            is_superuser INTEGER DEFAULT 0,
+            device_id TEXT,
+            telegram_id TEXT,
+            status TEXT DEFAULT 'pending',
+            txid TEXT,
+            approved INTEGER DEFAULT 0,
+            start_date TEXT,
+            end_date TEXT
+        );
+        """)
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS subscriptions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            start_date TEXT,
+            end_date TEXT,
+            is_active INTEGER DEFAULT 1,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        );
+        """)
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_settings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            language TEXT DEFAULT 'en',
+            theme TEXT DEFAULT 'light',
+            notifications_enabled INTEGER DEFAULT 1,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        );
+        """)
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS activity_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            action TEXT,
+            timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        );
+        """)
+
+        create_indexes()
+
+# فهارس مسار الدخول والاشتراكات وسجل النشاط
+INDEXES = {
+    "idx_subscriptions_user_active": "subscriptions(user_id, is_active)",
+    "idx_activity_logs_user_time": "activity_logs(user_id, timestamp)",
+}
+
+def create_indexes():
+    """Add INDEXES to an existing database (safe to run repeatedly)."""
+    with transaction() as cursor:
+        for name, target in INDEXES.items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
 
 # ───── المستخدمين ─────
 def add_user(username, password, is_superuser=0, device_id=None, telegram_id=None):
-    conn, cursor = get_connection()
     encrypted_password = encrypt_data(password, key)
     encrypted_device_id = encrypt_data(device_id, key) if device_id else None
-    cursor.execute("""
+    execute("""
     INSERT INTO users (username, password, is_superuser, device_id, telegram_id)
     VALUES (?, ?, ?, ?, ?)
     """, (username, encrypted_password, is_superuser, encrypted_device_id, telegram_id))
-    conn.commit()
-    conn.close()
 
 def check_user(username, password):
-    conn, cursor = get_connection()
-    cursor.execute("SELECT password, status FROM users WHERE username=?", (username,))
-    row = cursor.fetchone()
-    conn.close()
+    row = fetch_one("SELECT password, status FROM users WHERE username=?", (username,))
+    return _password_matches(row, password)
+
+def _password_matches(row, password):
     if row:
         encrypted, status = row
         try:
@@ -102,49 +230,28 @@ def check_user(username, password):
     return False
 
 def check_user_status(username):
-    conn, cursor = get_connection()
-    cursor.execute("SELECT status FROM users WHERE username=?", (username,))
-    row = cursor.fetchone()
-    conn.close()
+    row = fetch_one("SELECT status FROM users WHERE username=?", (username,))
     return row[0] if row else None
 
 def activate_user(username):
-    conn, cursor = get_connection()
-    cursor.execute("UPDATE users SET status='active' WHERE username=?", (username,))
-    conn.commit()
-    conn.close()
+    execute("UPDATE users SET status='active' WHERE username=?", (username,))
 
 def reject_user(username):
-    conn, cursor = get_connection()
-    cursor.execute("UPDATE users SET status='rejected' WHERE username=?", (username,))
-    conn.commit()
-    conn.close()
+    execute("UPDATE users SET status='rejected' WHERE username=?", (username,))
 
 def update_user_password(username, new_password):
-    conn, cursor = get_connection()
     encrypted = encrypt_data(new_password, key)
-    cursor.execute("UPDATE users SET password=? WHERE username=?", (encrypted, username))
-    conn.commit()
-    conn.close()
+    execute("UPDATE users SET password=? WHERE username=?", (encrypted, username))
 
 def delete_user(username):
-    conn, cursor = get_connection()
-    cursor.execute("DELETE FROM users WHERE username=?", (username,))
-    conn.commit()
-    conn.close()
+    execute("DELETE FROM users WHERE username=?", (username,))
 
 def set_device_id(username, device_id):
-    conn, cursor = get_connection()
     encrypted_device_id = encrypt_data(device_id, key)
-    cursor.execute("UPDATE users SET device_id=? WHERE username=?", (encrypted_device_id, username))
-    conn.commit()
-    conn.close()
+    execute("UPDATE users SET device_id=? WHERE username=?", (encrypted_device_id, username))
 
 def get_device_id(username):
-    conn, cursor = get_connection()
-    cursor.execute("SELECT device_id FROM users WHERE username=?", (username,))
-    row = cursor.fetchone()
-    conn.close()
+    row = fetch_one("SELECT device_id FROM users WHERE username=?", (username,))
     if row and row[0]:
         try:
             return decrypt_data(row[0], key)
@@ -154,73 +261,114 @@ def get_device_id(username):
 
 # ───── الاشتراكات ─────
 def add_subscription(user_id, start_date, end_date):
-    conn, cursor = get_connection()
-    cursor.execute("""
+    execute("""
     INSERT INTO subscriptions (user_id, start_date, end_date)
     VALUES (?, ?, ?)
     """, (user_id, start_date, end_date))
-    conn.commit()
-    conn.close()
 
 def get_active_subscription(user_id):
-    conn, cursor = get_connection()
-    cursor.execute("""
+    return fetch_one("""
     SELECT start_date, end_date FROM subscriptions
     WHERE user_id=? AND is_active=1
     ORDER BY id DESC LIMIT 1
     """, (user_id,))
-    row = cursor.fetchone()
-    conn.close()
-    return row
 
 def cancel_subscription(user_id):
-    conn, cursor = get_connection()
-    cursor.execute("UPDATE subscriptions SET is_active=0 WHERE user_id=?", (user_id,))
-    conn.commit()
-    conn.close()
+    execute("UPDATE subscriptions SET is_active=0 WHERE user_id=?", (user_id,))
 
 # ───── الإعدادات ─────
 def get_user_settings(user_id):
-    conn, cursor = get_connection()
-    cursor.execute("SELECT language, theme, notifications_enabled FROM user_settings WHERE user_id=?", (user_id,))
-    row = cursor.fetchone()
-    conn.close()
+    row = fetch_one("SELECT language, theme, notifications_enabled FROM user_settings WHERE user_id=?", (user_id,))
     return row if row else ("en", "light", 1)
 
 def update_user_settings(user_id, language=None, theme=None, notifications_enabled=None):
-    conn, cursor = get_connection()
-    cursor.execute("SELECT id FROM user_settings WHERE user_id=?", (user_id,))
-    exists = cursor.fetchone()
-    if exists:
-        cursor.execute("""
-        UPDATE user_settings SET language=?, theme=?, notifications_enabled=?
-        WHERE user_id=?
-        """, (language, theme, notifications_enabled, user_id))
-    else:
-        cursor.execute("""
-        INSERT INTO user_settings (user_id, language, theme, notifications_enabled)
-        VALUES (?, ?, ?, ?)
-        """, (user_id, language, theme, notifications_enabled))
-    conn.commit()
-    conn.close()
+    with transaction() as cursor:
+        cursor.execute("SELECT id FROM user_settings WHERE user_id=?", (user_id,))
+        exists = cursor.fetchone()
+        if exists:
+            cursor.execute("""
+            UPDATE user_settings SET language=?, theme=?, notifications_enabled=?
+            WHERE user_id=?
+            """, (language, theme, notifications_enabled, user_id))
+        else:
+            cursor.execute("""
+            INSERT INTO user_settings (user_id, language, theme, notifications_enabled)
+            VALUES (?, ?, ?, ?)
+            """, (user_id, language, theme, notifications_enabled))
 
 # ───── السجلات ─────
 def log_action(user_id, action):
-    conn, cursor = get_connection()
-    cursor.execute("INSERT INTO activity_logs (user_id, action) VALUES (?, ?)", (user_id, action))
-    conn.commit()
-    conn.close()
+    # يُكتب على دفعات من خيط في الخلفية؛ log_writer.flush() لقراءته فورًا
+    from database.log_writer import log_writer
+    log_writer.log(user_id, action)
+
+# ───── قياس الأداء ─────
+def benchmark(queries=2000, path=None):
+    """
+    Queries per second of the old pattern (new connection, default rollback
+    journal, commit and close per call) against ConnectionManager on a
+    scratch database. Returns {"fresh": {...}, "reused": {...}} with
+    "read" and "write" rates.
+    """
+    directory = None
+    if path is None:
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "benchmark.db")
+    setup = sqlite3.connect(path)
+    setup.execute("CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, username TEXT UNIQUE, status TEXT)")
+    setup.execute("CREATE TABLE IF NOT EXISTS activity_logs (id INTEGER PRIMARY KEY, user_id INTEGER, action TEXT)")
+    setup.executemany("INSERT OR IGNORE INTO users (username, status) VALUES (?, 'active')",
+                      [(f"user{i}",) for i in range(100)])
+    setup.commit()
+    setup.close()
+
+    def fresh_read(i):
+        conn = sqlite3.connect(path)
+        conn.execute("SELECT status FROM users WHERE username=?", (f"user{i % 100}",)).fetchone()
+        conn.close()
+
+    def fresh_write(i):
+        conn = sqlite3.connect(path)
+        conn.execute("INSERT INTO activity_logs (user_id, action) VALUES (?, ?)", (i % 100, "bench"))
+        conn.commit()
+        conn.close()
+
+    def rate(fn):
+        start = time.perf_counter()
+        for i in range(queries):
+            fn(i)
+        return queries / (time.perf_counter() - start)
+
+    results = {"fresh": {"read": rate(fresh_read), "write": rate(fresh_write)}}
+
+    manager = ConnectionManager(path)
+
+    def reused_read(i):
+        manager.connection().execute("SELECT status FROM users WHERE username=?", (f"user{i % 100}",)).fetchone()
+
+    def reused_write(i):
+        with manager.transaction() as cursor:
+            cursor.execute("INSERT INTO activity_logs (user_id, action) VALUES (?, ?)", (i % 100, "bench"))
+
+    results["reused"] = {"read": rate(reused_read), "write": rate(reused_write)}
+    manager.close_all()
+    if directory is not None:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+    return results
 
 # ───── تنفيذ مباشر ─────
 if __name__ == "__main__":
     init_db()
     print("✅ تم إنشاء قاعدة البيانات والجداول بنجاح.")
+    for mode, rates in benchmark().items():
+        print(f"{mode}: {rates['read']:.0f} reads/s, {rates['write']:.0f} writes/s")
 
 # ───── دوال متقدمة للمشروع ─────
 
 def insert_user_with_subscription(username, password, device_id, start_date, end_date):
-    conn, cursor = get_connection()
-    try:
+    with transaction() as cursor:
         # Check if username already exists - avoid UNIQUE constraint problems
         cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
         existing = cursor.fetchone()
@@ -239,36 +387,24 @@ def insert_user_with_subscription(username, password, device_id, start_date, end
             INSERT INTO subscriptions (user_id, start_date, end_date, is_active)
             VALUES (?, ?, ?, 1)
         """, (user_id, start_date, end_date))
-        conn.commit()
         return {"status": "created", "user_id": user_id}
-    finally:
-        conn.close()
 
 def get_subscription_dates(username):
-    conn, cursor = get_connection()
-    cursor.execute("""
+    row = fetch_one("""
         SELECT s.start_date, s.end_date
         FROM subscriptions s
         JOIN users u ON s.user_id = u.id
         WHERE u.username = ? AND s.is_active = 1
         ORDER BY s.id DESC LIMIT 1
     """, (username,))
-    row = cursor.fetchone()
-    conn.close()
     return row if row else (None, None)
 
 def get_user_id(username):
-    conn, cursor = get_connection()
-    cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
-    row = cursor.fetchone()
-    conn.close()
+    row = fetch_one("SELECT id FROM users WHERE username = ?", (username,))
     return row[0] if row else None
 
 def get_user_device_id(username):
-    conn, cursor = get_connection()
-    cursor.execute("SELECT device_id FROM users WHERE username = ?", (username,))
-    row = cursor.fetchone()
-    conn.close()
+    row = fetch_one("SELECT device_id FROM users WHERE username = ?", (username,))
     if row and row[0]:
         try:
             return decrypt_data(row[0], key)
@@ -277,38 +413,27 @@ def get_user_device_id(username):
     return None
 
 def set_user_device_id(username, device_id):
-    conn, cursor = get_connection()
     encrypted_device_id = encrypt_data(device_id, key)
-    cursor.execute("UPDATE users SET device_id = ? WHERE username = ?", (encrypted_device_id, username))
-    conn.commit()
-    conn.close()
+    execute("UPDATE users SET device_id = ? WHERE username = ?", (encrypted_device_id, username))
 
 def update_user_status(username, status):
-    conn, cursor = get_connection()
-    cursor.execute("UPDATE users SET status = ? WHERE username = ?", (status, username))
-    conn.commit()
-    conn.close()
+    execute("UPDATE users SET status = ? WHERE username = ?", (status, username))
 
 def approve_user(username):
-    conn, cursor = get_connection()
-    cursor.execute("UPDATE users SET approved = 1 WHERE username = ?", (username,))
-    conn.commit()
-    conn.close()
+    execute("UPDATE users SET approved = 1 WHERE username = ?", (username,))
 
 def save_txid_for_user(username, txid):
-    conn, cursor = get_connection()
-    cursor.execute("UPDATE users SET txid = ? WHERE username = ?", (txid, username))
-    conn.commit()
-    conn.close()
+    execute("UPDATE users SET txid = ? WHERE username = ?", (txid, username))
 
 
 def update_subscription_status(username, start=None, end=None, is_renewal=False):
     print(f"⚙️ تحديث الاشتراك: {username} من {start} إلى {end} (is_renewal={is_renewal})")
     username = username.strip().split()[1] if username.startswith("renew") else username
-    conn, cursor = get_connection()
-    cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
-    user_row = cursor.fetchone()
-    if user_row:
+    with transaction() as cursor:
+        cursor.execute("SELECT id FROM users WHERE username = ?", (username,))
+        user_row = cursor.fetchone()
+        if not user_row:
+            return
         user_id = user_row[0]
 
         cursor.execute("SELECT id FROM subscriptions WHERE user_id = ?", (user_id,))
@@ -334,13 +459,13 @@ def update_subscription_status(username, start=None, end=None, is_renewal=False)
                 ("فعال", 1, username)
             )
 
-        conn.commit()
-    conn.close()
-
 
 # ───── دالة التحقق من الاشتراك (للاستخدام في الواجهة والمشروع) ─────
 def is_subscription_valid(username):
-    start_str, end_str = get_subscription_dates(username)
+    return subscription_is_current(*get_subscription_dates(username))
+
+def subscription_is_current(start_str, end_str):
+    """True when now falls between the subscription's start and end dates."""
     if not start_str or not end_str:
         return False
 
@@ -353,6 +478,17 @@ def is_subscription_valid(username):
         return False
         # باقي أكواد db_manager الأصلية هنا...
 
+def subscription_days_left(end_str):
+    """Whole days until `end_str`, counting a started day; None if unknown."""
+    if not end_str:
+        return None
+    try:
+        end_date = datetime.fromisoformat(end_str)
+        delta = end_date - datetime.now()
+        return delta.days + (1 if delta.seconds > 0 else 0)
+    except Exception:
+        return None
+
 # ───────────────────────────────
 # دالة الحصول على بيانات المستخدم حسب اسم المستخدم
 def get_user_by_username(username):
@@ -360,12 +496,35 @@ def get_user_by_username(username):
     ترجع بيانات المستخدم من جدول users حسب اسم المستخدم.
     تعيد None إذا لم يتم العثور على المستخدم.
     """
-    conn, cursor = get_connection()
-    cursor.execute("""
+    return fetch_one("""
         SELECT id, username, password, is_superuser, device_id, telegram_id, status, txid, approved, start_date, end_date
         FROM users
         WHERE username = ?
     """, (username,))
-    row = cursor.fetchone()
-    conn.close()
-    return row
+
+# أعمدة get_user_by_username ثم تاريخا آخر اشتراك مفعل
+LOGIN_START_DATE = 11
+LOGIN_END_DATE = 12
+
+def get_login_record(username):
+    """
+    بيانات المستخدم مع تاريخي آخر اشتراك مفعل في استعلام واحد، ليشاركه مسار
+    الدخول كاملًا (auth.login ونافذة الدخول) بدل تكرار الاستعلامات.
+    أول 11 عمودًا مثل get_user_by_username، ثم start_date و end_date للاشتراك.
+    تعيد None إذا لم يتم العثور على المستخدم.
+    """
+    return fetch_one("""
+        SELECT u.id, u.username, u.password, u.is_superuser, u.device_id, u.telegram_id, u.status, u.txid,
+               u.approved, u.start_date, u.end_date, s.start_date, s.end_date
+        FROM users u
+        LEFT JOIN subscriptions s ON s.id = (
+            SELECT id FROM subscriptions
+            WHERE user_id = u.id AND is_active = 1
+            ORDER BY id DESC LIMIT 1
+        )
+        WHERE u.username = ?
+    """, (username,))
+
+def check_login_record(record, password):
+    """check_user على سجل get_login_record دون استعلام جديد."""
+    return bool(record) and _password_matches((record[2], record[6]), password)
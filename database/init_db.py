@@ -42,6 +42,14 @@ def ensure_column(table, column, coltype, default=None):
     conn.commit()
     conn.close()
 
+def ensure_index(name, table, columns):
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+    cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}({columns})")
+    print(f"Index {name} on {table}({columns}) is in place")
+    conn.commit()
+    conn.close()
+
 def main():
     # ensure users table has required columns used by code
     ensure_column("users", "txid", "TEXT", "NULL")
@@ -49,6 +57,10 @@ def main():
     ensure_column("users", "start_date", "TEXT", "NULL")
     ensure_column("users", "end_date", "TEXT", "NULL")
 
+    # فهارس مسار الدخول (نفس INDEXES في db_manager)
+    ensure_index("idx_subscriptions_user_active", "subscriptions", "user_id, is_active")
+    ensure_index("idx_activity_logs_user_time", "activity_logs", "user_id, timestamp")
+
     print("init_db completed.")
 
 if __name__ == '__main__':
@@ -0,0 +1,208 @@
+import atexit
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+# حجم الدفعة وأقصى انتظار قبل كتابتها (بالثواني)
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5
+
+# أقصى عدد أحداث في الذاكرة؛ بعده ينتظر المستدعي حتى يُفرَّغ جزء منها
+MAX_QUEUE = 10_000
+PUT_TIMEOUT = 2.0
+
+# انتظار قبل كل إعادة محاولة لدفعة فشلت (database is locked مثلًا)، ثم تُحسب فاشلة
+RETRY_DELAYS = (0.5, 2.0, 5.0)
+
+INSERT_SQL = "INSERT INTO activity_logs (user_id, action, timestamp) VALUES (?, ?, ?)"
+
+_FLUSH = object()
+_STOP = object()
+
+
+def _transaction():
+    from database.db_manager import transaction
+    return transaction()
+
+
+def _now():
+    # نفس صيغة CURRENT_TIMESTAMP في SQLite، لكن وقت الحدث لا وقت الكتابة
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class BatchWriter:
+    """
+    Background batched writer for insert-only tables.
+
+    put(sql, row) only enqueues; one thread drains the queue and runs each
+    batch with executemany (one call per statement) in a single transaction
+    once `batch_size` rows are waiting or `flush_interval` seconds passed
+    since the first one. A batch that fails is retried after each of
+    `retry_delays` before its rows are counted as failed. The queue is
+    bounded: a full queue blocks the caller for up to `timeout` seconds and
+    then drops the row. close() (also run at exit) writes everything queued
+    before it; rows put after it are refused.
+    """
+
+    def __init__(self, transaction=_transaction, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 max_queue=MAX_QUEUE, timeout=PUT_TIMEOUT, retry_delays=RETRY_DELAYS):
+        self.transaction = transaction
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.retry_delays = retry_delays
+        self._queue = queue.Queue(max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        self.stats = {"written": 0, "batches": 0, "dropped": 0, "failed": 0, "retries": 0}
+
+    def put(self, sql, row):
+        """Queue one row for `sql`. Returns False if it was dropped."""
+        # الفحص والإضافة تحت القفل حتى لا يُضاف صف بعد _STOP فلا يُكتب أبدًا
+        with self._lock:
+            if self._closed:
+                return False
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+            try:
+                self._queue.put((sql, row), timeout=self.timeout)
+                return True
+            except queue.Full:
+                self.stats["dropped"] += 1
+        print(f"⚠️ Write queue full, dropped a row for: {sql.split('(')[0].strip()}")
+        return False
+
+    def flush(self):
+        """Block until every event queued so far is written."""
+        if self._thread is None or self._closed:
+            return
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def _write(self, batch):
+        if not batch:
+            return
+        grouped = {}
+        for sql, row in batch:
+            grouped.setdefault(sql, []).append(row)
+        for attempt, delay in enumerate((*self.retry_delays, None)):
+            try:
+                with self.transaction() as cursor:
+                    for sql, rows in grouped.items():
+                        cursor.executemany(sql, rows)
+                self.stats["written"] += len(batch)
+                self.stats["batches"] += 1
+                return
+            except Exception as e:
+                if delay is None:
+                    self.stats["failed"] += len(batch)
+                    print(f"❌ Could not write {len(batch)} rows after {attempt + 1} attempts: {e}")
+                    return
+                self.stats["retries"] += 1
+                print(f"⚠️ Write of {len(batch)} rows failed ({e}), retrying in {delay}s.")
+                time.sleep(delay)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch, taken, stop = [], 1, False
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                    break
+                if item is _FLUSH:
+                    break
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                taken += 1
+            self._write(batch)
+            for _ in range(taken):
+                self._queue.task_done()
+            if stop:
+                return
+
+
+class ActivityLogWriter(BatchWriter):
+    """BatchWriter for activity_logs; each row keeps the time of the event."""
+
+    def log(self, user_id, action, timestamp=None):
+        """Queue one event. Returns False if it was dropped."""
+        return self.put(INSERT_SQL, (user_id, action, timestamp or _now()))
+
+
+log_writer = ActivityLogWriter()
+
+
+def benchmark(events=5000, path=None):
+    """
+    Events per second of one commit per row (the old log_action) against
+    ActivityLogWriter on a scratch database, measured until the last row
+    is on disk. Returns {"per_row": rate, "batched": rate}.
+    """
+    from database.db_manager import ConnectionManager
+
+    directory = None
+    if path is None:
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "benchmark.db")
+    manager = ConnectionManager(path)
+    manager.connection().execute(
+        "CREATE TABLE IF NOT EXISTS activity_logs (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, "
+        "action TEXT, timestamp TEXT DEFAULT CURRENT_TIMESTAMP)")
+
+    results = {}
+    start = time.perf_counter()
+    for i in range(events):
+        conn = sqlite3.connect(path)
+        conn.execute("INSERT INTO activity_logs (user_id, action) VALUES (?, ?)", (i % 100, "signal"))
+        conn.commit()
+        conn.close()
+    results["per_row"] = events / (time.perf_counter() - start)
+
+    writer = ActivityLogWriter(manager.transaction)
+    start = time.perf_counter()
+    for i in range(events):
+        writer.log(i % 100, "signal")
+    writer.close()
+    results["batched"] = events / (time.perf_counter() - start)
+
+    manager.close_all()
+    if directory is not None:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+    return results
+
+
+# مثال للاستخدام:
+if __name__ == "__main__":
+    rates = benchmark()
+    print(f"per-row commits: {rates['per_row']:.0f} events/s, batched writer: {rates['batched']:.0f} events/s")
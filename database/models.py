@@ -0,0 +1,82 @@
+# ───── جداول دفتر الصفقات ─────
+# كل الأوقات بالمللي ثانية (UTC) كأرقام صحيحة حتى تُقرأ مباشرة كمصفوفات NumPy
+
+JOURNAL_TABLES = {
+    "signals": """
+    CREATE TABLE IF NOT EXISTS signals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts INTEGER NOT NULL,
+        symbol TEXT NOT NULL,
+        timeframe TEXT,
+        strategy TEXT,
+        action TEXT NOT NULL,
+        price REAL,
+        sl REAL,
+        tp REAL
+    );
+    """,
+    "orders": """
+    CREATE TABLE IF NOT EXISTS orders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        order_id INTEGER NOT NULL,
+        ts INTEGER NOT NULL,
+        update_ts INTEGER NOT NULL,
+        symbol TEXT NOT NULL,
+        strategy TEXT,
+        side TEXT,
+        type TEXT,
+        quantity REAL,
+        price REAL,
+        status TEXT,
+        UNIQUE(symbol, order_id)
+    );
+    """,
+    "fills": """
+    CREATE TABLE IF NOT EXISTS fills (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ts INTEGER NOT NULL,
+        symbol TEXT NOT NULL,
+        order_id INTEGER,
+        strategy TEXT,
+        side TEXT NOT NULL,
+        quantity REAL NOT NULL,
+        price REAL NOT NULL,
+        fee REAL DEFAULT 0,
+        realized_pnl REAL DEFAULT 0
+    );
+    """,
+    # صفقة مغلقة: من أول تنفيذ يفتح المركز حتى عودته إلى صفر
+    "positions": """
+    CREATE TABLE IF NOT EXISTS positions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT NOT NULL,
+        strategy TEXT,
+        side TEXT NOT NULL,
+        entry_ts INTEGER NOT NULL,
+        exit_ts INTEGER NOT NULL,
+        quantity REAL NOT NULL,
+        entry_price REAL NOT NULL,
+        exit_price REAL NOT NULL,
+        pnl REAL NOT NULL,
+        fees REAL DEFAULT 0
+    );
+    """,
+}
+
+# فهارس مغطية: استعلامات الرمز والاستراتيجية واليوم تُجاب من الفهرس دون قراءة الجدول
+JOURNAL_INDEXES = {
+    "idx_positions_symbol": "positions(symbol, exit_ts, pnl, fees, strategy)",
+    "idx_positions_strategy": "positions(strategy, exit_ts, pnl, fees, symbol)",
+    "idx_positions_exit": "positions(exit_ts, pnl, fees, symbol, strategy)",
+    "idx_fills_symbol": "fills(symbol, ts)",
+    "idx_fills_strategy": "fills(strategy, ts)",
+    "idx_signals_symbol": "signals(symbol, ts)",
+    "idx_signals_strategy": "signals(strategy, ts)",
+}
+
+
+def create_journal_tables(cursor):
+    for sql in JOURNAL_TABLES.values():
+        cursor.execute(sql)
+    for name, target in JOURNAL_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
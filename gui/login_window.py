@@ -1,5 +1,4 @@
 import sys
-from datetime import datetime
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QGraphicsDropShadowEffect, QFrame
@@ -10,19 +9,18 @@ from core import auth
 from gui.main_window import MainWindow
 from gui.renewal_prompt_window import RenewalPromptWindow
 from gui.pending_approval_window import PendingApprovalWindow
-from database.db_manager import get_subscription_dates, is_subscription_valid
+from database.db_manager import (
+    LOGIN_END_DATE,
+    LOGIN_START_DATE,
+    get_login_record,
+    get_subscription_dates,
+    subscription_days_left,
+    subscription_is_current
+)
 
 def get_days_remaining(username):
     _, end_str = get_subscription_dates(username)
-    if not end_str:
-        return None
-    try:
-        end_date = datetime.fromisoformat(end_str)
-        delta = end_date - datetime.now()
-        days_left = delta.days + (1 if delta.seconds > 0 else 0)
-        return days_left
-    except Exception:
-        return None
+    return subscription_days_left(end_str)
 
 class LoginWindow(QWidget):
     def __init__(self, lang="ar"):
@@ -220,13 +218,16 @@ class LoginWindow(QWidget):
             return
 
         try:
-            status = auth.get_login_status(username, password)
+            # سجل واحد للمستخدم واشتراكه يكفي للدخول وحساب الأيام المتبقية
+            record = get_login_record(username)
+            status = auth.get_login_status(username, password, record=record)
             print("Login status for user:", username, "=", status)
         except Exception as e:
             self.msg_label.setText("خطأ في الاتصال" if self.lang=="ar" else "Connection error")
             return
 
-        days_remaining = get_days_remaining(username)
+        start_str, end_str = (record[LOGIN_START_DATE], record[LOGIN_END_DATE]) if record else (None, None)
+        days_remaining = subscription_days_left(end_str)
 
         # شاشة انتظار الموافقة للمستخدم الجديد (غير موجود بقاعدة البيانات)
         if status == 'waiting_approval':
@@ -234,7 +235,7 @@ class LoginWindow(QWidget):
             self.open_pending_approval(username)
         # إذا كان الاشتراك منتهي أو غير صالح
         elif status == 'active':
-            if not is_subscription_valid(username):
+            if not subscription_is_current(start_str, end_str):
                 self.msg_label.setText("انتهت مدة اشتراكك. يمكنك التجديد الآن.")
                 self.open_renewal_prompt(username, days_remaining=0, early_discount=False)
             elif days_remaining is not None and days_remaining <= 5:
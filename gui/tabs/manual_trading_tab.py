@@ -1,6 +1,7 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QHBoxLayout, QComboBox, QLineEdit, QPushButton, QGroupBox, QFormLayout
 )
+from core.symbol_info import symbol_info
 
 class ManualTradingTab(QWidget):
     def __init__(self, lang="en"):
@@ -11,7 +12,7 @@ class ManualTradingTab(QWidget):
         pair_layout = QHBoxLayout()
         pair_label = QLabel("Pair:")
         self.pair_combo = QComboBox()
-        self.pair_combo.addItems(["BTCUSDT", "ETHUSDT", "BNBUSDT"])
+        self.pair_combo.addItems(symbol_info.pair_list())
         pair_layout.addWidget(pair_label)
         pair_layout.addWidget(self.pair_combo)
 
@@ -1,4 +1,5 @@
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QComboBox, QPushButton, QHBoxLayout, QLineEdit
+from core.symbol_info import symbol_info
 
 class TradingTab(QWidget):
     def __init__(self, lang="en"):
@@ -9,7 +10,7 @@ class TradingTab(QWidget):
         pair_layout = QHBoxLayout()
         pair_label = QLabel("Pair:")
         self.pair_combo = QComboBox()
-        self.pair_combo.addItems(["BTCUSDT", "ETHUSDT", "BNBUSDT"])  # يمكنك التوسعة لاحقًا
+        self.pair_combo.addItems(symbol_info.pair_list())
         pair_layout.addWidget(pair_label)
         pair_layout.addWidget(self.pair_combo)
 
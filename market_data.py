@@ -1,25 +1,107 @@
+import time
 
-import pandas as pd
-from core.binance_api import get_klines
+from core.async_klines import KlineFetcher
+from core.binance_api import get_base_url, get_klines, get_stream_url
+from core.kline_cache import KlineCache
+from core.rate_limiter import rate_limiter
+from core.resampler import CandleResampler, ResampledKlineStream
+
+# طلبات متوازية عبر جلسة aiohttp واحدة عند تحديث عدة رموز معًا
+_kline_fetcher = None
+
+def get_kline_fetcher():
+    # يُنشأ عند أول تحديث لأن عنوان المنصة يأتي من الإعدادات
+    global _kline_fetcher
+    if _kline_fetcher is None:
+        _kline_fetcher = KlineFetcher(get_base_url(), limiter=rate_limiter)
+    return _kline_fetcher
+
+def _fetch_many(requests):
+    return get_kline_fetcher().fetch_many_sync(requests)
+
+# الشموع المحملة سابقًا تُحفظ في data/klines ولا يُطلب من المنصة إلا الجديد منها
+kline_cache = KlineCache(get_klines, fetch_many=_fetch_many)
+
+# سلسلة دقيقة واحدة لكل رمز، والفريمات الأعلى تُبنى منها محليًا بنفس التوقيت
+resampler = CandleResampler()
+
+# عدد الدقائق اللازم لتغطية الشمعة الجارية لأكبر فريم مشتق
+BASE_HISTORY = max(resampler.steps.values()) // resampler.base_step
 
 def get_historical_data(symbol: str, interval: str, limit: int = 100):
     try:
-        klines = get_klines(symbol, interval, limit)
-        if not klines:
+        buffer = kline_cache.get_buffer(symbol, interval, limit)
+        if buffer is None or len(buffer) == 0:
             print("❌ No kline data received.")
             return None
+        return buffer.frame(limit, copy=True)
+    except Exception as e:
+        print(f"❌ Error loading historical data: {e}")
+        return None
 
-        df = pd.DataFrame(klines, columns=[
-            "timestamp", "open", "high", "low", "close",
-            "volume", "close_time", "quote_asset_volume",
-            "number_of_trades", "taker_buy_base_volume",
-            "taker_buy_quote_volume", "ignore"
-        ])
-
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-        df.set_index("timestamp", inplace=True)
-        df = df.astype(float)
-        return df[["open", "high", "low", "close", "volume"]]
+def get_historical_data_batch(pairs, limit: int = 100):
+    """
+    تحميل بيانات عدة أزواج (symbol, interval) دفعة واحدة بطلبات متوازية.
+    ترجع dict من (symbol, interval) إلى DataFrame أو None.
+    """
+    try:
+        buffers = kline_cache.get_buffers(pairs, limit)
     except Exception as e:
         print(f"❌ Error loading historical data: {e}")
+        return {pair: None for pair in pairs}
+    return {
+        pair: buffer.frame(limit, copy=True) if buffer is not None and len(buffer) else None
+        for pair, buffer in buffers.items()
+    }
+
+def _closed(rows, now_ms=None):
+    # الشمعة الجارية لا تدخل في البناء حتى تُغلق
+    now_ms = now_ms if now_ms is not None else time.time() * 1000
+    return rows[rows[:, 6] < now_ms]
+
+def get_resample_history(symbol: str, base=None):
+    """
+    (base_rows, {interval: rows}) لإعادة بناء الفريمات المشتقة لرمز واحد:
+    شموع الدقيقة المغلقة مع تاريخ كل فريم من الكاش (يُحمّل مرة واحدة ثم يُحدّث تدريجيًا).
+    """
+    if base is None:
+        base = kline_cache.get(symbol, resampler.base_interval, BASE_HISTORY)
+    buffers = kline_cache.get_buffers([(symbol, interval) for interval in resampler.intervals], resampler.window)
+    higher = {
+        interval: buffer.rows(resampler.window)
+        for (_, interval), buffer in buffers.items() if buffer is not None
+    }
+    return (_closed(base) if base is not None else []), higher
+
+def get_resampled_data(symbol: str, interval: str, limit: int = 100):
+    """
+    مثل get_historical_data لكن الفريمات الأعلى تُبنى من شموع الدقيقة، فلا يُطلب
+    من المنصة بعد أول تحميل إلا الجديد من سلسلة الدقيقة. آخر شمعة هي الجارية
+    حتى آخر دقيقة مغلقة.
+    """
+    symbol = symbol.upper()
+    if interval not in resampler.steps:
+        return get_historical_data(symbol, interval, limit)
+    try:
+        base = kline_cache.get(symbol, resampler.base_interval, BASE_HISTORY)
+        if base is None or len(base) == 0:
+            print("❌ No kline data received.")
+            return None
+        last = resampler.last_base_time(symbol)
+        if last is None or base[0, 0] > last + resampler.base_step:
+            # أول طلب أو فجوة أكبر من النافذة: إعادة البناء من التاريخ
+            resampler.seed(symbol, *get_resample_history(symbol, base))
+        else:
+            resampler.extend(symbol, _closed(base))
+        return resampler.frame(symbol, interval, limit)
+    except Exception as e:
+        print(f"❌ Error resampling {symbol} {interval}: {e}")
         return None
+
+def stream_resampled(pairs, on_candle_close, base_url=None, window=100):
+    """
+    بث واحد لشموع الدقيقة لكل رمز بدل بث لكل فريم؛ الفريمات الأعلى تُبنى
+    وتُرسل إلى on_candle_close(symbol, interval, data) عند إغلاقها.
+    """
+    return ResampledKlineStream(pairs, on_candle_close, resampler, base_url=base_url or get_stream_url(),
+                                window=window, seed=kline_cache.get, history=get_resample_history)
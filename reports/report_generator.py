@@ -0,0 +1,356 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from config.settings import CAPITAL_USDT
+
+DAY_MS = 24 * 60 * 60_000
+YEAR_MS = 365 * DAY_MS
+
+# السوق يعمل كل أيام السنة، فالعائد اليومي يُضرب في جذر 365
+PERIODS_PER_YEAR = 365
+
+BREAKDOWN_COLUMNS = ("trades", "wins", "losses", "gross_profit", "gross_loss", "pnl", "fees")
+
+
+def _ms(values):
+    """Times as int64 ms from ms integers or datetimes (backtester trades)."""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64) or values.dtype == object:
+        return pd.DatetimeIndex(values).as_unit("ms").asi8
+    return values.astype(np.int64)
+
+
+def _trade_columns(trades):
+    """
+    Normalize a trade list to {column: ndarray} sorted by exit time. Accepts
+    TradeJournal.positions() columns or a backtester trades DataFrame.
+    """
+    def column(*names):
+        for name in names:
+            if name in trades:
+                return np.asarray(trades[name])
+        return None
+
+    pnl = column("pnl")
+    entry, exit_ = column("entry_ts", "entry_time"), column("exit_ts", "exit_time")
+    if pnl is None or entry is None or exit_ is None:
+        raise ValueError("trades need pnl, entry_ts/entry_time and exit_ts/exit_time columns")
+    n = len(pnl)
+    fees = column("fees")
+    columns = {
+        "pnl": pnl.astype(np.float64),
+        "fees": np.zeros(n) if fees is None else fees.astype(np.float64),
+        "entry_ts": _ms(entry),
+        "exit_ts": _ms(exit_),
+    }
+    for name in ("symbol", "strategy"):
+        labels = column(name)
+        columns[name] = np.full(n, None, dtype=object) if labels is None else labels
+    if n > 1 and (np.diff(columns["exit_ts"]) < 0).any():
+        order = np.argsort(columns["exit_ts"], kind="stable")
+        columns = {name: values[order] for name, values in columns.items()}
+    return columns
+
+
+def _merge_intervals(starts, ends):
+    """Union of [start, end) intervals as sorted, disjoint (starts, ends)."""
+    if not len(starts):
+        return starts, ends
+    order = np.argsort(starts, kind="stable")
+    starts, ends = starts[order], ends[order]
+    reach = np.maximum.accumulate(ends)
+    first = np.ones(len(starts), dtype=bool)
+    first[1:] = starts[1:] > reach[:-1]
+    firsts = np.flatnonzero(first)
+    return starts[firsts], np.maximum.reduceat(ends, firsts)
+
+
+def _drawdown(equity, times, peak, peak_time, underwater=False):
+    """
+    Drawdown fraction and drawdown length for every point, given the peak,
+    its time and whether equity was below it before the first point. A
+    drawdown lasts from the peak until equity is back at it (or the point
+    itself while still below). Returns (drawdown, duration, peak, peak_time,
+    underwater), the last three carried to the next call.
+    """
+    running = np.maximum.accumulate(np.maximum(equity, peak))
+    at_peak = equity >= running
+    since = np.maximum(np.maximum.accumulate(np.where(at_peak, times, peak_time)), peak_time)
+    before = np.concatenate([[peak_time], since[:-1]])
+    was_below = np.concatenate([[underwater], ~at_peak[:-1]])
+    duration = np.where(~at_peak | was_below, times - before, 0)
+    drawdown = np.where(running > 0, (running - equity) / np.where(running > 0, running, 1), 0.0)
+    return drawdown, duration, float(running[-1]), int(since[-1]), bool(~at_peak[-1])
+
+
+def _ratios(returns, periods_per_year):
+    """Annualized (sharpe, sortino) of per-period returns; 0.0 when undefined."""
+    if len(returns) < 2:
+        return 0.0, 0.0
+    mean = returns.mean()
+    std = returns.std(ddof=1)
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    scale = np.sqrt(periods_per_year)
+    sharpe = float(mean / std * scale) if std > 0 else 0.0
+    sortino = float(mean / downside * scale) if downside > 0 else 0.0
+    return sharpe, sortino
+
+
+def _profit_factor(gross_profit, gross_loss):
+    return gross_profit / gross_loss if gross_loss > 0 else float("inf") if gross_profit > 0 else 0.0
+
+
+class MetricsEngine:
+    """
+    Performance metrics over a growing list of closed trades.
+
+    update() folds each batch of trades into running totals with array
+    operations only: counts and sums, the equity peak and worst drawdown,
+    the merged time-in-market intervals, per-day PnL and per-strategy /
+    per-symbol accumulators. A new batch costs O(batch), so a live view can
+    call update() with just the newly closed trades. Trades are expected to
+    arrive in exit order; a batch closing before the previous one is still
+    correct for everything except the drawdown, which then covers each batch
+    in the order given.
+
+    Sharpe and Sortino use daily returns (UTC days, PnL over the equity at the
+    start of the day, days without trades count as 0) annualized over 365 days.
+    """
+
+    def __init__(self, initial_balance=CAPITAL_USDT, periods_per_year=PERIODS_PER_YEAR):
+        self.initial_balance = float(initial_balance)
+        self.periods_per_year = periods_per_year
+        self.reset()
+
+    def reset(self):
+        self.totals = {name: 0.0 for name in BREAKDOWN_COLUMNS}
+        self.equity = self.initial_balance
+        self._peak = self.initial_balance
+        self._peak_time = None
+        self._underwater = False
+        self.max_drawdown = 0.0
+        self.max_drawdown_duration = 0
+        self.first_entry = None
+        self.last_exit = None
+        self._in_market = (np.array([], dtype=np.int64), np.array([], dtype=np.int64))
+        self._time_in_market = 0
+        self._first_day = None
+        self._day_pnl = np.zeros(0)
+        self._groups = {"symbol": {}, "strategy": {}}
+        self._group_totals = {by: np.zeros((len(BREAKDOWN_COLUMNS), 0)) for by in self._groups}
+        return self
+
+    def update(self, trades):
+        """Fold closed trades (see _trade_columns) into the metrics. Returns self."""
+        columns = _trade_columns(trades)
+        pnl = columns["pnl"]
+        if not len(pnl):
+            return self
+        entry_ts, exit_ts = columns["entry_ts"], columns["exit_ts"]
+
+        win, loss = pnl > 0, pnl < 0
+        stats = np.vstack([np.ones(len(pnl)), win, loss, np.where(win, pnl, 0.0), np.where(loss, -pnl, 0.0),
+                           pnl, columns["fees"]])
+        for name, total in zip(BREAKDOWN_COLUMNS, stats.sum(axis=1)):
+            self.totals[name] += float(total)
+
+        # منحنى الرصيد بعد كل صفقة، مع القمة السابقة من الدفعات الماضية
+        equity = self.equity + np.cumsum(pnl)
+        if self._peak_time is None:
+            self._peak_time = int(min(entry_ts.min(), exit_ts[0]))
+        drawdown, duration, self._peak, self._peak_time, self._underwater = _drawdown(
+            equity, exit_ts, self._peak, self._peak_time, self._underwater)
+        self.max_drawdown = max(self.max_drawdown, float(drawdown.max()))
+        self.max_drawdown_duration = max(self.max_drawdown_duration, int(duration.max()))
+        self.equity = float(equity[-1])
+
+        first, last = int(entry_ts.min()), int(exit_ts.max())
+        self.first_entry = first if self.first_entry is None else min(self.first_entry, first)
+        self.last_exit = last if self.last_exit is None else max(self.last_exit, last)
+        self._add_in_market(entry_ts, exit_ts)
+        self._add_days(exit_ts, pnl)
+        for by in self._groups:
+            self._add_groups(by, columns[by], stats)
+        return self
+
+    def _add_in_market(self, entry_ts, exit_ts):
+        # تُدمج فقط الفترات القديمة التي قد تتقاطع مع الدفعة الجديدة
+        starts, ends = self._in_market
+        keep = np.searchsorted(ends, entry_ts.min(), side="left")
+        self._time_in_market -= int((ends[keep:] - starts[keep:]).sum())
+        tail = _merge_intervals(np.concatenate([starts[keep:], entry_ts]),
+                                np.concatenate([ends[keep:], np.maximum(exit_ts, entry_ts)]))
+        self._time_in_market += int((tail[1] - tail[0]).sum())
+        self._in_market = (np.concatenate([starts[:keep], tail[0]]), np.concatenate([ends[:keep], tail[1]]))
+
+    def _add_days(self, exit_ts, pnl):
+        days = exit_ts // DAY_MS
+        low = int(days.min())
+        if self._first_day is None:
+            self._first_day = low
+        elif low < self._first_day:
+            self._day_pnl = np.concatenate([np.zeros(self._first_day - low), self._day_pnl])
+            self._first_day = low
+        index = days - self._first_day
+        size = max(len(self._day_pnl), int(index.max()) + 1)
+        if size > len(self._day_pnl):
+            self._day_pnl = np.concatenate([self._day_pnl, np.zeros(size - len(self._day_pnl))])
+        self._day_pnl += np.bincount(index, weights=pnl, minlength=size)
+
+    def _add_groups(self, by, labels, stats):
+        codes, uniques = pd.factorize(labels, use_na_sentinel=False)
+        known = self._groups[by]
+        # حلقة على المجموعات (استراتيجيات أو رموز) لا على الصفقات
+        uniques = [None if pd.isna(label) else label for label in uniques]
+        mapping = np.array([known.setdefault(label, len(known)) for label in uniques], dtype=np.int64)
+        totals = self._group_totals[by]
+        if len(known) > totals.shape[1]:
+            totals = np.hstack([totals, np.zeros((len(BREAKDOWN_COLUMNS), len(known) - totals.shape[1]))])
+        codes = mapping[codes]
+        for row, values in enumerate(stats):
+            totals[row] += np.bincount(codes, weights=values, minlength=len(known))
+        self._group_totals[by] = totals
+
+    def daily_returns(self):
+        """Return of every UTC day from the first to the last trade."""
+        if not len(self._day_pnl):
+            return np.zeros(0)
+        start_equity = self.initial_balance + np.cumsum(self._day_pnl) - self._day_pnl
+        return np.divide(self._day_pnl, start_equity, out=np.zeros(len(start_equity)), where=start_equity > 0)
+
+    def summary(self):
+        totals = self.totals
+        trades = int(totals["trades"])
+        span = (self.last_exit - self.first_entry) if trades else 0
+        sharpe, sortino = _ratios(self.daily_returns(), self.periods_per_year)
+        return {
+            "trades": trades,
+            "wins": int(totals["wins"]),
+            "losses": int(totals["losses"]),
+            "win_rate": totals["wins"] / trades * 100 if trades else 0.0,
+            "net_profit": totals["pnl"],
+            "gross_profit": totals["gross_profit"],
+            "gross_loss": totals["gross_loss"],
+            "total_fees": totals["fees"],
+            "profit_factor": _profit_factor(totals["gross_profit"], totals["gross_loss"]),
+            "avg_win": totals["gross_profit"] / totals["wins"] if totals["wins"] else 0.0,
+            "avg_loss": -totals["gross_loss"] / totals["losses"] if totals["losses"] else 0.0,
+            "expectancy": totals["pnl"] / trades if trades else 0.0,
+            "sharpe": sharpe,
+            "sortino": sortino,
+            "max_drawdown_pct": self.max_drawdown * 100,
+            "max_drawdown_days": self.max_drawdown_duration / DAY_MS,
+            "exposure_pct": self._time_in_market / span * 100 if span > 0 else 0.0,
+            "final_balance": self.equity,
+            "return_pct": (self.equity / self.initial_balance - 1) * 100 if self.initial_balance else 0.0,
+        }
+
+    def breakdown(self, by="strategy"):
+        """
+        Totals per strategy or symbol as {column: ndarray}: key, trades, wins,
+        losses, win_rate, pnl, fees, profit_factor; sorted by key, None first.
+        """
+        if by not in self._groups:
+            raise ValueError("breakdown is by 'strategy' or 'symbol'")
+        keys = list(self._groups[by])
+        order = np.array(sorted(range(len(keys)), key=lambda i: (keys[i] is not None, str(keys[i] or ""))),
+                         dtype=np.int64)
+        totals = dict(zip(BREAKDOWN_COLUMNS, self._group_totals[by][:, order]))
+        trades = totals["trades"]
+        gross_profit, gross_loss = totals["gross_profit"], totals["gross_loss"]
+        safe_loss = np.where(gross_loss > 0, gross_loss, 1.0)
+        return {
+            "key": np.array(keys, dtype=object)[order],
+            "trades": trades.astype(np.int64),
+            "wins": totals["wins"].astype(np.int64),
+            "losses": totals["losses"].astype(np.int64),
+            "win_rate": np.divide(totals["wins"] * 100, trades, out=np.zeros(len(trades)), where=trades > 0),
+            "pnl": totals["pnl"],
+            "fees": totals["fees"],
+            "profit_factor": np.where(gross_loss > 0, gross_profit / safe_loss,
+                                      np.where(gross_profit > 0, np.inf, 0.0)),
+        }
+
+
+def compute_metrics(trades, initial_balance=CAPITAL_USDT):
+    """Summary metrics of a complete trade list (see MetricsEngine.summary)."""
+    return MetricsEngine(initial_balance).update(trades).summary()
+
+
+def equity_metrics(equity, periods_per_year=None):
+    """
+    Metrics of an equity curve (pandas Series with a DatetimeIndex, such as
+    the backtester's, or a plain array of evenly spaced points). Returns are
+    per point; without dates `periods_per_year` must be given for Sharpe and
+    Sortino to be annualized, and the drawdown duration is in points rather
+    than days. Exposure is the share of periods in which equity moved.
+    """
+    values = np.asarray(equity, dtype=np.float64)
+    times = None
+    if isinstance(equity, pd.Series) and isinstance(equity.index, pd.DatetimeIndex):
+        times = equity.index.as_unit("ms").asi8
+    if not len(values):
+        return {"return_pct": 0.0, "sharpe": 0.0, "sortino": 0.0, "max_drawdown_pct": 0.0,
+                "max_drawdown_duration": 0.0, "exposure_pct": 0.0}
+
+    steps = np.arange(len(values), dtype=np.int64) if times is None else times
+    if periods_per_year is None:
+        periods_per_year = YEAR_MS / np.median(np.diff(times)) if times is not None and len(times) > 1 else 1
+    returns = np.diff(values) / np.where(values[:-1] != 0, values[:-1], np.nan)
+    returns = np.nan_to_num(returns)
+    sharpe, sortino = _ratios(returns, periods_per_year)
+    drawdown, duration, _, _, _ = _drawdown(values, steps, values[0], int(steps[0]))
+    duration = int(duration.max())
+    return {
+        "return_pct": (values[-1] / values[0] - 1) * 100 if values[0] else 0.0,
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "max_drawdown_pct": float(drawdown.max() * 100),
+        "max_drawdown_duration": duration / DAY_MS if times is not None else float(duration),
+        "exposure_pct": float((returns != 0).mean() * 100) if len(returns) else 0.0,
+    }
+
+
+def benchmark(trades=1_000_000, batches=10, symbols=20, strategies=8, days=365, seed=0):
+    """
+    Seconds to compute every metric for `trades` random trades at once
+    ("full") and again when the same trades arrive in `batches` appends
+    ("incremental", total over all updates, plus "last_update").
+    """
+    rng = np.random.default_rng(seed)
+    exit_ts = np.sort(rng.integers(0, days * DAY_MS, trades)) + 1_700_000_000_000
+    columns = {
+        "pnl": rng.normal(0.5, 10, trades),
+        "fees": np.full(trades, 0.04),
+        "entry_ts": exit_ts - rng.integers(60_000, 4 * 3_600_000, trades),
+        "exit_ts": exit_ts,
+        "symbol": np.array([f"SYM{i}USDT" for i in range(symbols)], dtype=object)[np.arange(trades) % symbols],
+        "strategy": np.array([f"strategy_{i}" for i in range(strategies)], dtype=object)[
+            np.arange(trades) % strategies],
+    }
+
+    timings = {}
+    start = time.perf_counter()
+    engine = MetricsEngine(100_000).update(columns)
+    engine.summary()
+    engine.breakdown("strategy")
+    engine.breakdown("symbol")
+    timings["full"] = time.perf_counter() - start
+
+    engine = MetricsEngine(100_000)
+    bounds = np.linspace(0, trades, batches + 1).astype(np.int64)
+    start = time.perf_counter()
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        step = time.perf_counter()
+        engine.update({name: values[lo:hi] for name, values in columns.items()}).summary()
+        timings["last_update"] = time.perf_counter() - step
+    timings["incremental"] = time.perf_counter() - start
+    return timings
+
+
+# مثال للاستخدام:
+if __name__ == "__main__":
+    for name, seconds in benchmark().items():
+        print(f"{name}: {seconds * 1000:.0f} ms")
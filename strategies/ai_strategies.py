@@ -3,21 +3,25 @@ import os
 
 STRATEGY_FOLDER = os.path.dirname(__file__)
 
+# ملفات مساعدة داخل مجلد الاستراتيجيات وليست استراتيجيات
+NON_STRATEGY_MODULES = {
+    "strategy_engine.py", "ai_strategies.py", "base_strategy.py", "trade_executor.py",
+    "indicators.py", "incremental.py", "parallel_engine.py",
+}
+
 def list_available_strategies():
     files = os.listdir(STRATEGY_FOLDER)
     strategies = []
     for file in files:
-        if file.endswith(".py") and not file.startswith("__") and file not in [
-            "strategy_engine.py", "ai_strategies.py", "base_strategy.py", "trade_executor.py"
-        ]:
+        if file.endswith(".py") and not file.startswith("__") and file not in NON_STRATEGY_MODULES:
             strategies.append(file[:-3])  # Remove .py extension
     return strategies
 
-def load_strategy(name, symbol, timeframe):
+def load_strategy(name, symbol, timeframe, config=None):
     try:
         module = importlib.import_module(f"strategies.{name}")
         strategy_class = getattr(module, "Strategy")
-        return strategy_class(symbol, timeframe)
+        return strategy_class(symbol, timeframe, config)
     except Exception as e:
         print(f"❌ Failed to load strategy {name}: {e}")
         return None
\ No newline at end of file
@@ -1,10 +1,45 @@
 from abc import ABC, abstractmethod
+import numpy as np
+from strategies.indicators import IndicatorCache
+
+# ترميز الإشارات في generate_signals
+ACTIONS = {"BUY": 1, "SELL": -1, "NONE": 0}
+
+def make_signals(n, buy=None, sell=None, buy_confidence=0.0, sell_confidence=0.0, exit=None, exit_confidence=0.0):
+    """
+    تجميع أقنعة الشراء/البيع/الخروج في شكل generate_signals:
+    action (1 شراء، -1 بيع، 0 لا شيء)، confidence، exit (bool)، exit_confidence.
+    """
+    buy = np.zeros(n, dtype=bool) if buy is None else np.asarray(buy, dtype=bool)
+    sell = np.zeros(n, dtype=bool) if sell is None else np.asarray(sell, dtype=bool) & ~buy
+    exit = np.zeros(n, dtype=bool) if exit is None else np.asarray(exit, dtype=bool)
+    action = np.zeros(n, dtype=np.int8)
+    action[buy] = 1
+    action[sell] = -1
+    confidence = np.where(buy, buy_confidence, np.where(sell, sell_confidence, 0.0)).astype(np.float64)
+    return {
+        "action": action,
+        "confidence": confidence,
+        "exit": exit,
+        "exit_confidence": np.where(exit, exit_confidence, 0.0).astype(np.float64),
+    }
+
+def crossed_above(a, b):
+    """True on bars where a crosses above b: a[i-1] < b[i-1] and a[i] > b[i]."""
+    cross = np.zeros(len(a), dtype=bool)
+    cross[1:] = (a[:-1] < b[:-1]) & (a[1:] > b[1:])
+    return cross
 
 class BaseStrategy(ABC):
     def __init__(self, symbol, timeframe, config=None):
         self.symbol = symbol
         self.timeframe = timeframe
         self.config = config or {}
+        # يستبدله StrategyEngine بكاش مشترك بين كل الاستراتيجيات
+        self.indicators = IndicatorCache()
+
+    def indicator(self, data, name, **params):
+        return self.indicators.get(data, name, **params)
 
     @abstractmethod
     def should_enter_trade(self, data):
@@ -14,4 +49,28 @@ class BaseStrategy(ABC):
         return {"action": "NONE", "confidence": 0}
 
     def get_stop_loss_take_profit(self, data, entry_price):
-        return {"sl": None, "tp": []}
\ No newline at end of file
+        return {"sl": None, "tp": []}
+
+    def generate_signals(self, data):
+        """
+        إشارات الدخول والخروج لكل شمعة في data دفعة واحدة (انظر make_signals).
+        القيمة عند الشمعة i تطابق should_enter_trade/should_exit_trade على data.iloc[:i + 1].
+        الاستراتيجيات التي لا تعيد تعريفها تُقيَّم شمعة بشمعة هنا.
+        """
+        n = len(data)
+        signals = make_signals(n)
+        for i in range(n):
+            window = data.iloc[: i + 1]
+            entry = self.should_enter_trade(window)
+            signals["action"][i] = ACTIONS.get(entry["action"], 0)
+            signals["confidence"][i] = entry["confidence"]
+            exit = self.should_exit_trade(window)
+            if exit["action"] == "EXIT":
+                signals["exit"][i] = True
+                signals["exit_confidence"][i] = exit["confidence"]
+        return signals
+
+    def _exit_below_sma(self, data, period=20):
+        """Vectorized form of the shared "close below SMA(20)" exit rule."""
+        close = data["close"].to_numpy()
+        return close < self.indicator(data, "sma", period=period).to_numpy()
@@ -1,5 +1,6 @@
+import numpy as np
 import pandas as pd
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, make_signals
 
 class Strategy(BaseStrategy):
     def __init__(self, symbol, timeframe, config=None):
@@ -14,8 +15,8 @@ class Strategy(BaseStrategy):
         close = data["close"]
         if len(close) < self.config["period"] + 2:
             return { "action": "NONE", "confidence": 0 }
-        ma = close.rolling(window=self.config["period"]).mean()
-        std = close.rolling(window=self.config["period"]).std()
+        ma = self.indicator(data, "sma", period=self.config["period"])
+        std = self.indicator(data, "std", period=self.config["period"])
         upper = ma + self.config["deviation"] * std
         lower = ma - self.config["deviation"] * std
         last_close = close.iloc[-1]
@@ -34,7 +35,7 @@ class Strategy(BaseStrategy):
 
     def should_exit_trade(self, data):
         price = data['close'].iloc[-1]
-        ma = data['close'].rolling(window=20).mean().iloc[-1]
+        ma = self.indicator(data, "sma", period=20).iloc[-1]
         if price < ma:
             return { "action": "EXIT", "confidence": 0.7 }
         return { "action": "NONE", "confidence": 0 }
@@ -44,4 +45,18 @@ class Strategy(BaseStrategy):
         tp_pct = 0.02
         sl = round(entry_price * (1 - sl_pct), 4)
         tp = [round(entry_price * (1 + tp_pct), 4)]
-        return { "sl": sl, "tp": tp }
\ No newline at end of file
+        return { "sl": sl, "tp": tp }
+
+    def generate_signals(self, data):
+        close = data["close"].to_numpy()
+        ma = self.indicator(data, "sma", period=self.config["period"]).to_numpy()
+        std = self.indicator(data, "std", period=self.config["period"]).to_numpy()
+        upper = ma + self.config["deviation"] * std
+        lower = ma - self.config["deviation"] * std
+        ready = (np.arange(len(close)) >= self.config["period"] + 1) & ~np.isnan(upper) & ~np.isnan(lower)
+        return make_signals(
+            len(close),
+            buy=ready & (close < lower), sell=ready & (close > upper),
+            buy_confidence=0.9, sell_confidence=0.9,
+            exit=self._exit_below_sma(data), exit_confidence=0.7
+        )
@@ -1,5 +1,6 @@
+import numpy as np
 import pandas as pd
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, make_signals
 
 class Strategy(BaseStrategy):
     def __init__(self, symbol, timeframe, config=None):
@@ -32,7 +33,7 @@ class Strategy(BaseStrategy):
 
     def should_exit_trade(self, data):
         price = data['close'].iloc[-1]
-        ma = data['close'].rolling(window=20).mean().iloc[-1]
+        ma = self.indicator(data, "sma", period=20).iloc[-1]
         if price < ma:
             return { "action": "EXIT", "confidence": 0.7 }
         return { "action": "NONE", "confidence": 0 }
@@ -42,4 +43,18 @@ class Strategy(BaseStrategy):
         tp_pct = 0.03
         sl = round(entry_price * (1 - sl_pct), 4)
         tp = [round(entry_price * (1 + tp_pct), 4)]
-        return { "sl": sl, "tp": tp }
\ No newline at end of file
+        return { "sl": sl, "tp": tp }
+
+    def generate_signals(self, data):
+        lookback = self.config["range_lookback"]
+        close = data["close"].to_numpy()
+        recent_high = data["high"].rolling(lookback).max().shift(1).to_numpy()
+        recent_low = data["low"].rolling(lookback).min().shift(1).to_numpy()
+        buffer = self.config["breakout_buffer_pct"] * close
+        ready = np.arange(len(close)) >= lookback
+        return make_signals(
+            len(close),
+            buy=ready & (close > recent_high + buffer), sell=ready & (close < recent_low - buffer),
+            buy_confidence=0.85, sell_confidence=0.85,
+            exit=self._exit_below_sma(data), exit_confidence=0.7
+        )
@@ -1,6 +1,8 @@
 
 from config.settings import CAPITAL_USDT, CAPITAL_PERCENTAGE_PER_TRADE, LEVERAGE
 from core.binance_api import get_price
+from core.symbol_info import symbol_info
+from strategies.base_strategy import make_signals
 class Strategy:
     def __init__(self, symbol, timeframe, config=None):
         pass
@@ -8,6 +10,8 @@ class Strategy:
         return {"action": "NONE", "confidence": 0}
     def should_exit_trade(self, data):
         return {"action": "NONE", "confidence": 0}
+    def generate_signals(self, data):
+        return make_signals(len(data))
 
 def get_trade_quantity(symbol: str, entry_price: float = None) -> float:
     """
@@ -21,5 +25,6 @@ def get_trade_quantity(symbol: str, entry_price: float = None) -> float:
     capital_to_use = (CAPITAL_USDT * CAPITAL_PERCENTAGE_PER_TRADE / 100.0) * LEVERAGE
     quantity = capital_to_use / entry_price
 
-    # تقريب الكمية لأقرب رقم عشري مناسب (يجب تعديله لاحقًا حسب كل عملة)
-    return round(quantity, 3)
\ No newline at end of file
+    # تقريب الكمية حسب stepSize للعملة من exchangeInfo، و 3 خانات إن لم تتوفر بياناتها
+    rounded = symbol_info.round_quantity(symbol, quantity)
+    return rounded if rounded is not None else round(quantity, 3)
\ No newline at end of file
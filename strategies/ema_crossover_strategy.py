@@ -1,5 +1,5 @@
 import pandas as pd
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, crossed_above, make_signals
 
 class Strategy(BaseStrategy):
     def __init__(self, symbol, timeframe, config=None):
@@ -11,9 +11,8 @@ class Strategy(BaseStrategy):
         super().__init__(symbol, timeframe, merged_config)
 
     def should_enter_trade(self, data):
-        close = data["close"]
-        fast_ema = close.ewm(span=self.config["fast_period"], adjust=False).mean()
-        slow_ema = close.ewm(span=self.config["slow_period"], adjust=False).mean()
+        fast_ema = self.indicator(data, "ema", span=self.config["fast_period"])
+        slow_ema = self.indicator(data, "ema", span=self.config["slow_period"])
 
         if len(fast_ema) < 2 or len(slow_ema) < 2 or pd.isna(fast_ema.iloc[-1]) or pd.isna(slow_ema.iloc[-1]):
             return { "action": "NONE", "confidence": 0 }
@@ -27,7 +26,7 @@ class Strategy(BaseStrategy):
 
     def should_exit_trade(self, data):
         price = data['close'].iloc[-1]
-        ma = data['close'].rolling(window=20).mean().iloc[-1]
+        ma = self.indicator(data, "sma", period=20).iloc[-1]
         if price < ma:
             return { "action": "EXIT", "confidence": 0.7 }
         return { "action": "NONE", "confidence": 0 }
@@ -37,4 +36,14 @@ class Strategy(BaseStrategy):
         tp_pct = 0.03   # 3% TP
         sl = round(entry_price * (1 - sl_pct), 4)
         tp = [round(entry_price * (1 + tp_pct), 4)]
-        return { "sl": sl, "tp": tp }
\ No newline at end of file
+        return { "sl": sl, "tp": tp }
+
+    def generate_signals(self, data):
+        fast = self.indicator(data, "ema", span=self.config["fast_period"]).to_numpy()
+        slow = self.indicator(data, "ema", span=self.config["slow_period"]).to_numpy()
+        return make_signals(
+            len(fast),
+            buy=crossed_above(fast, slow), sell=crossed_above(slow, fast),
+            buy_confidence=1.0, sell_confidence=1.0,
+            exit=self._exit_below_sma(data), exit_confidence=0.7
+        )
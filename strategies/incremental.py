@@ -0,0 +1,215 @@
+import math
+from collections import deque
+
+# نسخ تراكمية من مؤشرات strategies/indicators.py: كل update يكلّف O(1)
+# بدل إعادة حساب النافذة كاملة عند وصول شمعة جديدة. تعطي NaN حتى تكتمل فترة الإحماء
+# في نفس المواضع التي تعطي فيها صيغ pandas قيمة NaN.
+
+NAN = float("nan")
+
+
+class EMA:
+    """Same as series.ewm(span=span, adjust=False).mean()."""
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = NAN
+        self._started = False
+
+    def update(self, x):
+        if not self._started:
+            self.value = x
+            self._started = True
+        else:
+            self.value = self.alpha * x + (1.0 - self.alpha) * self.value
+        return self.value
+
+
+class SMA:
+    """Same as series.rolling(period).mean(), NaN while any value in the window is NaN."""
+
+    def __init__(self, period):
+        self.period = period
+        self.value = NAN
+        self._window = deque()
+        self._sum = 0.0
+        self._nans = 0
+        self._updates = 0
+
+    def update(self, x):
+        window = self._window
+        window.append(x)
+        if math.isnan(x):
+            self._nans += 1
+        else:
+            self._sum += x
+        if len(window) > self.period:
+            old = window.popleft()
+            if math.isnan(old):
+                self._nans -= 1
+            else:
+                self._sum -= old
+
+        # إعادة جمع النافذة مرة كل `period` تحديثات تمنع تراكم خطأ الفاصلة العائمة
+        self._updates += 1
+        if self._updates % self.period == 0:
+            self._sum = math.fsum(v for v in window if not math.isnan(v))
+
+        if len(window) < self.period or self._nans:
+            self.value = NAN
+        else:
+            self.value = self._sum / self.period
+        return self.value
+
+
+class RollingStd:
+    """Same as series.rolling(period).std() (sample standard deviation, ddof=1)."""
+
+    def __init__(self, period):
+        self.period = period
+        self.value = NAN
+        self._window = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._updates = 0
+
+    def _resync(self):
+        n = len(self._window)
+        self._mean = math.fsum(self._window) / n
+        self._m2 = math.fsum((v - self._mean) ** 2 for v in self._window)
+
+    def update(self, x):
+        window = self._window
+        window.append(x)
+        if len(window) > self.period:
+            # Welford بنافذة منزلقة: إضافة x وحذف أقدم قيمة في خطوة واحدة
+            old = window.popleft()
+            old_mean = self._mean
+            self._mean += (x - old) / self.period
+            self._m2 += (x - old) * (x - self._mean + old - old_mean)
+        else:
+            n = len(window)
+            delta = x - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (x - self._mean)
+
+        self._updates += 1
+        if self._updates % self.period == 0:
+            self._resync()
+
+        if len(window) < self.period or self.period < 2:
+            self.value = NAN
+        else:
+            self.value = math.sqrt(max(self._m2, 0.0) / (self.period - 1))
+        return self.value
+
+
+class RSI:
+    """Same as strategies.indicators.rsi (simple moving average of gains and losses)."""
+
+    def __init__(self, period):
+        self._gain = SMA(period)
+        self._loss = SMA(period)
+        self._prev = None
+        self.value = NAN
+
+    def update(self, close):
+        # أول قيمة بلا سابقة تُحسب كتغير صفري كما يفعل delta.where(..., 0)
+        delta = 0.0 if self._prev is None else close - self._prev
+        self._prev = close
+        gain = self._gain.update(delta if delta > 0 else 0.0)
+        loss = self._loss.update(-delta if delta < 0 else 0.0)
+
+        if math.isnan(gain) or math.isnan(loss):
+            self.value = NAN
+        elif loss == 0:
+            self.value = 100.0 if gain > 0 else NAN
+        else:
+            self.value = 100 - (100 / (1 + gain / loss))
+        return self.value
+
+
+class MACD:
+    """Same as strategies.indicators.macd; value is (macd, signal)."""
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        self._fast = EMA(fast)
+        self._slow = EMA(slow)
+        self._signal = EMA(signal)
+        self.value = (NAN, NAN)
+
+    def update(self, close):
+        line = self._fast.update(close) - self._slow.update(close)
+        self.value = (line, self._signal.update(line))
+        return self.value
+
+
+class Bollinger:
+    """Moving average with upper/lower bands; value is (ma, upper, lower)."""
+
+    def __init__(self, period=20, deviation=2):
+        self.deviation = deviation
+        self._ma = SMA(period)
+        self._std = RollingStd(period)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, close):
+        ma = self._ma.update(close)
+        std = self._std.update(close)
+        self.value = (ma, ma + self.deviation * std, ma - self.deviation * std)
+        return self.value
+
+
+class RollingExtreme:
+    """
+    Same as series.rolling(period, min_periods).max() (or .min()) with a
+    monotonic deque, amortized O(1) per update. NaN values are skipped, and
+    the result is NaN while the window holds fewer than `min_periods`
+    (default `period`) non-NaN values, as in pandas.
+    """
+
+    def __init__(self, period, mode="max", min_periods=None):
+        self.period = period
+        self.min_periods = period if min_periods is None else min_periods
+        self._better = (lambda a, b: a >= b) if mode == "max" else (lambda a, b: a <= b)
+        self._candidates = deque()
+        self._nans = deque()
+        self._count = 0
+        self.value = NAN
+
+    def update(self, x):
+        candidates = self._candidates
+        if math.isnan(x):
+            self._nans.append(self._count)
+        else:
+            while candidates and self._better(x, candidates[-1][1]):
+                candidates.pop()
+            candidates.append((self._count, x))
+        oldest = self._count - self.period
+        if candidates and candidates[0][0] <= oldest:
+            candidates.popleft()
+        if self._nans and self._nans[0] <= oldest:
+            self._nans.popleft()
+        self._count += 1
+        valid = min(self._count, self.period) - len(self._nans)
+        self.value = candidates[0][1] if candidates and valid >= max(self.min_periods, 1) else NAN
+        return self.value
+
+
+class Stochastic:
+    """Same as strategies.indicators.stochastic; value is (k, d)."""
+
+    def __init__(self, fastk_period=14, slowd_period=3):
+        self._lowest = RollingExtreme(fastk_period, "min")
+        self._highest = RollingExtreme(fastk_period, "max")
+        self._d = SMA(slowd_period)
+        self.value = (NAN, NAN)
+
+    def update(self, high, low, close):
+        lowest_low = self._lowest.update(low)
+        highest_high = self._highest.update(high)
+        span = highest_high - lowest_low
+        # span == 0 يعني أن close == lowest_low فتكون النتيجة 0/0 = NaN كما في pandas
+        k = NAN if math.isnan(span) or span == 0 else 100 * (close - lowest_low) / span
+        self.value = (k, self._d.update(k))
+        return self.value
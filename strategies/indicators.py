@@ -0,0 +1,154 @@
+# المؤشرات المشتركة بين الاستراتيجيات بنفس الصيغ التي كانت مكررة داخل كل ملف
+import numpy as np
+import pandas as pd
+
+
+def sma(series, period):
+    return series.rolling(window=period).mean()
+
+
+def rolling_std(series, period):
+    return series.rolling(window=period).std()
+
+
+def ema(series, span):
+    return series.ewm(span=span, adjust=False).mean()
+
+
+def rsi(series, period):
+    delta = series.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def macd(series, fast, slow, signal):
+    line = ema(series, fast) - ema(series, slow)
+    return line, ema(line, signal)
+
+
+def stochastic(high, low, close, fastk_period, slowd_period):
+    lowest_low = low.rolling(fastk_period).min()
+    highest_high = high.rolling(fastk_period).max()
+    k = 100 * (close - lowest_low) / (highest_high - lowest_low)
+    return k, k.rolling(slowd_period).mean()
+
+
+INDICATORS = {
+    "sma": lambda data, period, source="close": sma(data[source], period),
+    "std": lambda data, period, source="close": rolling_std(data[source], period),
+    "ema": lambda data, span, source="close": ema(data[source], span),
+    "rsi": lambda data, period, source="close": rsi(data[source], period),
+    "macd": lambda data, fast, slow, signal, source="close": macd(data[source], fast, slow, signal),
+    "stochastic": lambda data, fastk_period, slowd_period: stochastic(
+        data["high"], data["low"], data["close"], fastk_period, slowd_period),
+}
+
+
+# نسخ تراكمية (strategies/incremental.py) والأعمدة التي تقرؤها من كل شمعة
+def _live(name, params):
+    from strategies import incremental
+    source = params.get("source", "close")
+    if name == "sma":
+        return incremental.SMA(params["period"]), (source,)
+    if name == "std":
+        return incremental.RollingStd(params["period"]), (source,)
+    if name == "ema":
+        return incremental.EMA(params["span"]), (source,)
+    if name == "rsi":
+        return incremental.RSI(params["period"]), (source,)
+    if name == "macd":
+        return incremental.MACD(params["fast"], params["slow"], params["signal"]), (source,)
+    if name == "stochastic":
+        return incremental.Stochastic(params["fastk_period"], params["slowd_period"]), ("high", "low", "close")
+    return None
+
+
+def _extends(previous, data):
+    """True when `data` is `previous` plus one new candle (a stream window moving on)."""
+    if previous is None or len(data) < 2 or len(data) - len(previous) not in (0, 1):
+        return False
+    last = previous.iloc[-1]
+    row = data.iloc[-2]
+    return data.index[-2] == previous.index[-1] and row["close"] == last["close"] and row["volume"] == last["volume"]
+
+
+class IndicatorCache:
+    """
+    Computes each (indicator, params) once per data version.
+
+    A new version starts whenever a different DataFrame, or the same one with
+    a new last candle, is passed in; older results are dropped then, so memory
+    stays at one candle's worth of indicators. StrategyEngine shares a single
+    cache between all of its strategies.
+
+    When a version is the previous window plus one closed candle (what
+    KlineStream and the scheduler hand over on every close), indicators
+    with an incremental form are advanced by that one candle in O(1) instead
+    of being recomputed over the window. Their state is built on the first
+    such step by replaying the previous window once; a gap, or unrelated
+    data such as a backtest, goes back to the pandas formulas. Finite-window
+    indicators match pandas exactly; EMA-based ones (ema, macd) keep the
+    history from before the window, so they differ from a recompute of the
+    window by the (decaying) weight of the dropped candles.
+    """
+
+    def __init__(self):
+        self._data = None
+        self._previous = None
+        self._version = None
+        self._values = {}
+        self._live = {}
+        self.hits = 0
+        self.misses = 0
+        self.steps = 0
+
+    def _version_of(self, data):
+        return id(data), len(data), data.index[-1] if len(data) else None
+
+    def get(self, data, name, **params):
+        version = self._version_of(data)
+        if version != self._version:
+            self._values.clear()
+            self._version = version
+            self._previous = self._data if _extends(self._data, data) else None
+            # نحتفظ بمرجع للبيانات حتى لا يُعاد استخدام id لكائن آخر
+            self._data = data
+
+        key = (name, tuple(sorted(params.items())))
+        if key in self._values:
+            self.hits += 1
+            return self._values[key]
+        self.misses += 1
+        value = self._values[key] = self._compute(data, name, params, key)
+        return value
+
+    def _compute(self, data, name, params, key):
+        if self._previous is None:
+            return INDICATORS[name](data, **params)
+        live = self._live.get(key)
+        if live is None or live["last"] != self._previous.index[-1]:
+            created = _live(name, params)
+            if created is None:
+                return INDICATORS[name](data, **params)
+            # أول خطوة لهذا المؤشر: نمرر النافذة السابقة مرة واحدة ثم نتابع شمعة بشمعة
+            live = self._live[key] = {"indicator": created[0], "columns": created[1], "outputs": None}
+            previous = self._previous
+            inputs = [previous[column].to_numpy(dtype=np.float64) for column in live["columns"]]
+            values = [live["indicator"].update(*row) for row in zip(*inputs)]
+            live["outputs"] = [np.array(column, dtype=np.float64) for column in zip(*map(_as_tuple, values))]
+            live["last"] = previous.index[-1]
+
+        indicator = live["indicator"]
+        value = _as_tuple(indicator.update(*(float(data[column].iloc[-1]) for column in live["columns"])))
+        live["outputs"] = [np.append(output[max(len(output) + 1 - len(data), 0):], v)
+                           for output, v in zip(live["outputs"], value)]
+        live["last"] = data.index[-1]
+        self.steps += 1
+        series = [pd.Series(output, index=data.index) for output in live["outputs"]]
+        return tuple(series) if len(series) > 1 else series[0]
+
+
+def _as_tuple(value):
+    return value if isinstance(value, tuple) else (value,)
@@ -1,5 +1,5 @@
 import pandas as pd
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, crossed_above, make_signals
 
 class Strategy(BaseStrategy):
     def __init__(self, symbol, timeframe, config=None):
@@ -12,11 +12,10 @@ class Strategy(BaseStrategy):
         super().__init__(symbol, timeframe, merged_config)
 
     def should_enter_trade(self, data):
-        close = data["close"]
-        fast_ema = close.ewm(span=self.config["fast_period"], adjust=False).mean()
-        slow_ema = close.ewm(span=self.config["slow_period"], adjust=False).mean()
-        macd = fast_ema - slow_ema
-        macd_signal = macd.ewm(span=self.config["signal_period"], adjust=False).mean()
+        macd, macd_signal = self.indicator(
+            data, "macd",
+            fast=self.config["fast_period"], slow=self.config["slow_period"], signal=self.config["signal_period"]
+        )
 
         if len(macd) < 2 or len(macd_signal) < 2 or pd.isna(macd.iloc[-1]) or pd.isna(macd_signal.iloc[-1]):
             return { "action": "NONE", "confidence": 0 }
@@ -30,7 +29,7 @@ class Strategy(BaseStrategy):
 
     def should_exit_trade(self, data):
         price = data['close'].iloc[-1]
-        ma = data['close'].rolling(window=20).mean().iloc[-1]
+        ma = self.indicator(data, "sma", period=20).iloc[-1]
         if price < ma:
             return { "action": "EXIT", "confidence": 0.7 }
         return { "action": "NONE", "confidence": 0 }
@@ -40,4 +39,17 @@ class Strategy(BaseStrategy):
         tp_pct = 0.025
         sl = round(entry_price * (1 - sl_pct), 4)
         tp = [round(entry_price * (1 + tp_pct), 4)]
-        return { "sl": sl, "tp": tp }
\ No newline at end of file
+        return { "sl": sl, "tp": tp }
+
+    def generate_signals(self, data):
+        macd, macd_signal = self.indicator(
+            data, "macd",
+            fast=self.config["fast_period"], slow=self.config["slow_period"], signal=self.config["signal_period"]
+        )
+        macd, macd_signal = macd.to_numpy(), macd_signal.to_numpy()
+        return make_signals(
+            len(macd),
+            buy=crossed_above(macd, macd_signal), sell=crossed_above(macd_signal, macd),
+            buy_confidence=1.0, sell_confidence=1.0,
+            exit=self._exit_below_sma(data), exit_confidence=0.7
+        )
@@ -1,5 +1,6 @@
+import numpy as np
 import pandas as pd
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, make_signals
 
 class Strategy(BaseStrategy):
     def __init__(self, symbol, timeframe, config=None):
@@ -14,7 +15,7 @@ class Strategy(BaseStrategy):
         if len(data) < self.config["ma_period"] + 2:
             return { "action": "NONE", "confidence": 0 }
         close = data["close"]
-        ma = close.rolling(window=self.config["ma_period"]).mean()
+        ma = self.indicator(data, "sma", period=self.config["ma_period"])
         last_price = close.iloc[-1]
         last_ma = ma.iloc[-1]
         tolerance = last_price * self.config["bounce_tolerance_pct"]
@@ -34,7 +35,7 @@ class Strategy(BaseStrategy):
 
     def should_exit_trade(self, data):
         price = data['close'].iloc[-1]
-        ma = data['close'].rolling(window=20).mean().iloc[-1]
+        ma = self.indicator(data, "sma", period=20).iloc[-1]
         if price < ma:
             return { "action": "EXIT", "confidence": 0.7 }
         return { "action": "NONE", "confidence": 0 }
@@ -44,4 +45,19 @@ class Strategy(BaseStrategy):
         tp_pct = 0.025
         sl = round(entry_price * (1 - sl_pct), 4)
         tp = [round(entry_price * (1 + tp_pct), 4)]
-        return { "sl": sl, "tp": tp }
\ No newline at end of file
+        return { "sl": sl, "tp": tp }
+
+    def generate_signals(self, data):
+        close = data["close"].to_numpy()
+        ma = self.indicator(data, "sma", period=self.config["ma_period"]).to_numpy()
+        prev_close = np.concatenate([[np.nan], close[:-1]])
+        prev_ma = np.concatenate([[np.nan], ma[:-1]])
+        near = np.abs(close - ma) <= close * self.config["bounce_tolerance_pct"]
+        ready = (np.arange(len(close)) >= self.config["ma_period"] + 1) & ~np.isnan(ma) & near
+        return make_signals(
+            len(close),
+            buy=ready & (prev_close < prev_ma) & (close > ma),
+            sell=ready & (prev_close > prev_ma) & (close < ma),
+            buy_confidence=0.8, sell_confidence=0.8,
+            exit=self._exit_below_sma(data), exit_confidence=0.7
+        )
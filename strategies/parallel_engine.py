@@ -0,0 +1,190 @@
+import os
+import time
+from multiprocessing import Pool, resource_tracker
+
+from core.news_filter import is_safe_to_trade
+from core.shared_ohlcv import SharedOHLCV, attach
+from strategies.ai_strategies import list_available_strategies, load_strategy
+from strategies.indicators import IndicatorCache
+
+# ───── حالة كل عملية عاملة ─────
+# الاستراتيجيات وكاش المؤشرات تبقى بين الدورات لأن المجموعة دائمة
+_worker = {"cycle": None, "attached": {}, "strategies": {}, "indicators": {}}
+
+
+def _attached(cycle, spec):
+    if cycle != _worker["cycle"]:
+        # بيانات الدورة السابقة لم تعد مستخدمة
+        for shm, _ in _worker["attached"].values():
+            shm.close()
+        _worker["attached"] = {}
+        _worker["cycle"] = cycle
+    entry = _worker["attached"].get(spec[0])
+    if entry is None:
+        entry = _worker["attached"][spec[0]] = attach(spec)
+    return entry[1]
+
+
+def _strategy(pair, name):
+    key = (pair, name)
+    if key not in _worker["strategies"]:
+        strategy = load_strategy(name, pair[0], pair[1])
+        if strategy is not None:
+            # كاش واحد لكل زوج داخل العملية، كما يشارك StrategyEngine كاشه
+            strategy.indicators = _worker["indicators"].setdefault(pair, IndicatorCache())
+        _worker["strategies"][key] = strategy
+    return _worker["strategies"][key]
+
+
+def evaluate_strategy(strategy, data):
+    """One strategy's entry in StrategyEngine.analyze_market, or None without a signal."""
+    signal = strategy.should_enter_trade(data)
+    if signal["action"] == "NONE":
+        return None
+    entry_price = data["close"].iloc[-1]
+    return {
+        "strategy": strategy.__class__.__name__,
+        "signal": signal,
+        "entry": entry_price,
+        "sl_tp": strategy.get_stop_loss_take_profit(data, entry_price),
+    }
+
+
+def _evaluate(task):
+    cycle, pair, spec, name = task
+    strategy = _strategy(pair, name)
+    if strategy is None:
+        return None
+    try:
+        return evaluate_strategy(strategy, _attached(cycle, spec))
+    except Exception as e:
+        print(f"❌ {name} failed on {pair[0]} {pair[1]}: {e}")
+        return None
+
+
+class ParallelEvaluator:
+    """
+    Evaluates every strategy on many (symbol, timeframe) frames over a
+    persistent process pool.
+
+    Each cycle copies every frame once into shared memory; the work is
+    sharded as (pair, strategy) tasks and workers attach to the blocks
+    instead of receiving pickled candles. Strategy instances and their
+    indicator caches live in the workers across cycles. Results come back
+    per pair in the order of `strategies` (sorted names by default), so the
+    output does not depend on which worker ran what.
+    """
+
+    def __init__(self, processes=None, strategies=None):
+        self.strategies = sorted(strategies if strategies is not None else list_available_strategies())
+        self.processes = processes or os.cpu_count() or 1
+        # متتبع الذاكرة المشتركة يجب أن يعمل قبل إنشاء العمليات حتى تشاركه بدل أن
+        # تشغّل كل عملية متتبعًا خاصًا يحسب الكتل المربوطة فيها تسريبًا
+        resource_tracker.ensure_running()
+        self._pool = Pool(self.processes)
+        self._cycle = 0
+
+    def evaluate(self, frames):
+        """
+        `frames` maps (symbol, timeframe) to a DataFrame. Returns {pair: list of
+        analyze_market-style results}; empty frames give an empty list.
+        """
+        self._cycle += 1
+        pairs = [pair for pair, data in frames.items() if data is not None and len(data)]
+        shared = {pair: SharedOHLCV(frames[pair]) for pair in pairs}
+        try:
+            tasks = [(self._cycle, pair, shared[pair].spec, name) for pair in pairs for name in self.strategies]
+            # مهام متتالية لنفس الزوج في نفس الدفعة تستفيد من كاش المؤشرات
+            chunksize = max(1, len(tasks) // (4 * self.processes))
+            results = self._pool.map(_evaluate, tasks, chunksize) if tasks else []
+        finally:
+            for block in shared.values():
+                block.close()
+
+        analysis = {pair: [] for pair in frames}
+        for (_, pair, _, _), result in zip(tasks, results):
+            if result is not None:
+                analysis[pair].append(result)
+        return analysis
+
+    def analyze(self, engines, frames):
+        """
+        Parallel StrategyEngine.analyze_market for many engines at once.
+        Returns [(engine, analysis)] for the engines whose pair has data.
+        """
+        if not is_safe_to_trade():
+            print("🛑 News risk detected. Trading disabled.")
+            return []
+        pairs = sorted({(engine.symbol.upper(), engine.timeframe) for engine in engines})
+        analysis = self.evaluate({pair: frames.get(pair) for pair in pairs})
+        results = []
+        for engine in engines:
+            pair = (engine.symbol.upper(), engine.timeframe)
+            if frames.get(pair) is not None and len(frames[pair]):
+                results.append((engine, analysis[pair]))
+        return results
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark(symbols=8, bars=500, worker_counts=(1, 2, 4), cycles=3, timeframe="15m", seed=0):
+    """
+    Per-cycle wall time of ParallelEvaluator against the serial loop, on
+    random-walk frames for `symbols` symbols. Returns {workers: seconds};
+    0 is the in-process serial baseline.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01", periods=bars, freq="15min", name="timestamp")
+    frames = {}
+    for i in range(symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+        spread = close * rng.uniform(0, 0.01, bars)
+        frames[(f"SYM{i}USDT", timeframe)] = pd.DataFrame({
+            "open": close, "high": close + spread, "low": close - spread, "close": close,
+            "volume": rng.uniform(100, 1000, bars),
+        }, index=index)
+
+    timings = {}
+    names = sorted(list_available_strategies())
+    serial = {}
+    for pair in frames:
+        # كاش مؤشرات واحد لكل زوج كما في StrategyEngine
+        cache = IndicatorCache()
+        for name in names:
+            strategy = load_strategy(name, pair[0], pair[1])
+            if strategy is not None:
+                strategy.indicators = cache
+                serial[(pair, name)] = strategy
+    start = time.perf_counter()
+    for _ in range(cycles):
+        # نسخة جديدة في كل دورة كما تصل البيانات من market_data
+        cycle_frames = {pair: data.copy() for pair, data in frames.items()}
+        for (pair, name), strategy in serial.items():
+            evaluate_strategy(strategy, cycle_frames[pair])
+    timings[0] = (time.perf_counter() - start) / cycles
+
+    for workers in worker_counts:
+        with ParallelEvaluator(processes=workers, strategies=names) as evaluator:
+            evaluator.evaluate(frames)  # تحميل الاستراتيجيات في العمليات
+            start = time.perf_counter()
+            for _ in range(cycles):
+                evaluator.evaluate(frames)
+            timings[workers] = (time.perf_counter() - start) / cycles
+    return timings
+
+
+# مثال للاستخدام:
+if __name__ == "__main__":
+    for workers, seconds in benchmark(symbols=16, worker_counts=(1, 2, 4, os.cpu_count() or 1)).items():
+        print(f"{'serial' if workers == 0 else f'{workers} workers'}: {seconds * 1000:.1f} ms per cycle")
@@ -1,5 +1,6 @@
+import numpy as np
 import pandas as pd
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, make_signals
 
 class Strategy(BaseStrategy):
     def __init__(self, symbol, timeframe, config=None):
@@ -43,7 +44,7 @@ class Strategy(BaseStrategy):
 
     def should_exit_trade(self, data):
         price = data['close'].iloc[-1]
-        ma = data['close'].rolling(window=20).mean().iloc[-1]
+        ma = self.indicator(data, "sma", period=20).iloc[-1]
         if price < ma:
             return { "action": "EXIT", "confidence": 0.7 }
         return { "action": "NONE", "confidence": 0 }
@@ -53,4 +54,20 @@ class Strategy(BaseStrategy):
         tp_pct = 0.027
         sl = round(entry_price * (1 - sl_pct), 4)
         tp = [round(entry_price * (1 + tp_pct), 4)]
-        return { "sl": sl, "tp": tp }
\ No newline at end of file
+        return { "sl": sl, "tp": tp }
+
+    def generate_signals(self, data):
+        open_ = data["open"].to_numpy()
+        close = data["close"].to_numpy()
+        prev_open = np.concatenate([[np.nan], open_[:-1]])
+        prev_close = np.concatenate([[np.nan], close[:-1]])
+        ready = np.arange(len(close)) >= self.config["lookback"] - 1
+        # Bullish / Bearish engulfing
+        bullish = (prev_close < prev_open) & (close > open_) & (close > prev_open) & (open_ < prev_close)
+        bearish = (prev_close > prev_open) & (close < open_) & (close < prev_open) & (open_ > prev_close)
+        return make_signals(
+            len(close),
+            buy=ready & bullish, sell=ready & bearish,
+            buy_confidence=0.75, sell_confidence=0.75,
+            exit=self._exit_below_sma(data), exit_confidence=0.7
+        )
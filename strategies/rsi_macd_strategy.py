@@ -1,5 +1,6 @@
+import numpy as np
 import pandas as pd
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, crossed_above, make_signals
 
 class Strategy(BaseStrategy):
     def __init__(self, symbol, timeframe, config=None):
@@ -14,25 +15,12 @@ class Strategy(BaseStrategy):
         merged_config = default_config | (config or {})
         super().__init__(symbol, timeframe, merged_config)
 
-    def compute_rsi(self, series, period):
-        delta = series.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
-
-    def compute_macd(self, series, fast, slow, signal):
-        fast_ema = series.ewm(span=fast, adjust=False).mean()
-        slow_ema = series.ewm(span=slow, adjust=False).mean()
-        macd = fast_ema - slow_ema
-        macd_signal = macd.ewm(span=signal, adjust=False).mean()
-        return macd, macd_signal
-
     def should_enter_trade(self, data):
-        close = data["close"]
-        rsi = self.compute_rsi(close, self.config["rsi_period"])
-        macd, macd_signal = self.compute_macd(close, self.config["macd_fast"], self.config["macd_slow"], self.config["macd_signal"])
+        rsi = self.indicator(data, "rsi", period=self.config["rsi_period"])
+        macd, macd_signal = self.indicator(
+            data, "macd",
+            fast=self.config["macd_fast"], slow=self.config["macd_slow"], signal=self.config["macd_signal"]
+        )
 
         if len(rsi) < 2 or len(macd) < 2 or len(macd_signal) < 2 or pd.isna(rsi.iloc[-1]) or pd.isna(macd.iloc[-1]) or pd.isna(macd_signal.iloc[-1]):
             return { "action": "NONE", "confidence": 0 }
@@ -50,7 +38,7 @@ class Strategy(BaseStrategy):
 
     def should_exit_trade(self, data):
         price = data['close'].iloc[-1]
-        ma = data['close'].rolling(window=20).mean().iloc[-1]
+        ma = self.indicator(data, "sma", period=20).iloc[-1]
         if price < ma:
             return { "action": "EXIT", "confidence": 0.7 }
         return { "action": "NONE", "confidence": 0 }
@@ -60,4 +48,20 @@ class Strategy(BaseStrategy):
         tp_pct = 0.025
         sl = round(entry_price * (1 - sl_pct), 4)
         tp = [round(entry_price * (1 + tp_pct), 4)]
-        return { "sl": sl, "tp": tp }
\ No newline at end of file
+        return { "sl": sl, "tp": tp }
+
+    def generate_signals(self, data):
+        rsi = self.indicator(data, "rsi", period=self.config["rsi_period"]).to_numpy()
+        macd, macd_signal = self.indicator(
+            data, "macd",
+            fast=self.config["macd_fast"], slow=self.config["macd_slow"], signal=self.config["macd_signal"]
+        )
+        macd, macd_signal = macd.to_numpy(), macd_signal.to_numpy()
+        ready = ~np.isnan(rsi)
+        return make_signals(
+            len(rsi),
+            buy=ready & (rsi < self.config["rsi_oversold"]) & crossed_above(macd, macd_signal),
+            sell=ready & (rsi > self.config["rsi_overbought"]) & crossed_above(macd_signal, macd),
+            buy_confidence=0.9, sell_confidence=0.9,
+            exit=self._exit_below_sma(data), exit_confidence=0.7
+        )
@@ -1,5 +1,5 @@
 import pandas as pd
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, make_signals
 
 class Strategy(BaseStrategy):
     def __init__(self, symbol, timeframe, config=None):
@@ -11,17 +11,8 @@ class Strategy(BaseStrategy):
         merged_config = default_config | (config or {})
         super().__init__(symbol, timeframe, merged_config)
 
-    def compute_rsi(self, series, period):
-        delta = series.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
-
     def should_enter_trade(self, data):
-        close = data["close"]
-        rsi = self.compute_rsi(close, self.config["period"])
+        rsi = self.indicator(data, "rsi", period=self.config["period"])
         if len(rsi) == 0 or pd.isna(rsi.iloc[-1]):
             return { "action": "NONE", "confidence": 0 }
 
@@ -35,7 +26,7 @@ class Strategy(BaseStrategy):
 
     def should_exit_trade(self, data):
         price = data['close'].iloc[-1]
-        ma = data['close'].rolling(window=20).mean().iloc[-1]
+        ma = self.indicator(data, "sma", period=20).iloc[-1]
         if price < ma:
             return { "action": "EXIT", "confidence": 0.7 }
         return { "action": "NONE", "confidence": 0 }
@@ -45,4 +36,15 @@ class Strategy(BaseStrategy):
         tp_pct = 0.02  # 2% take profit
         sl = round(entry_price * (1 - sl_pct), 4)
         tp = [round(entry_price * (1 + tp_pct), 4)]
-        return { "sl": sl, "tp": tp }
\ No newline at end of file
+        return { "sl": sl, "tp": tp }
+
+    def generate_signals(self, data):
+        rsi = self.indicator(data, "rsi", period=self.config["period"]).to_numpy()
+        sell = rsi > self.config["overbought"]
+        buy = rsi < self.config["oversold"]
+        signals = make_signals(len(rsi), buy=buy, sell=sell, exit=self._exit_below_sma(data), exit_confidence=0.7)
+        # round() بايثون على شموع الإشارة فقط حتى تطابق should_enter_trade تمامًا
+        confidence = signals["confidence"]
+        confidence[sell] = [round((v - self.config["overbought"]) / 30, 2) for v in rsi[sell]]
+        confidence[buy] = [round((self.config["oversold"] - v) / 30, 2) for v in rsi[buy]]
+        return signals
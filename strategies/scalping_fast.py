@@ -1,4 +1,4 @@
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, make_signals
 
 class Strategy(BaseStrategy):
     def should_enter_trade(self, data):
@@ -11,4 +11,12 @@ class Strategy(BaseStrategy):
         if data['close'].iloc[-1] < data['open'].iloc[-1]:
             return {"action": "EXIT", "confidence": 0.75}
         else:
-            return {"action": "NONE", "confidence": 0}
\ No newline at end of file
+            return {"action": "NONE", "confidence": 0}
+
+    def generate_signals(self, data):
+        close = data["close"].to_numpy()
+        open_ = data["open"].to_numpy()
+        return make_signals(
+            len(close), buy=close > open_, buy_confidence=0.75,
+            exit=close < open_, exit_confidence=0.75
+        )
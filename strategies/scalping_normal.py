@@ -1,14 +1,22 @@
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, make_signals
 
 class Strategy(BaseStrategy):
     def should_enter_trade(self, data):
-        if data['close'].iloc[-1] > data['close'].rolling(window=10).mean().iloc[-1]:
+        if data['close'].iloc[-1] > self.indicator(data, "sma", period=10).iloc[-1]:
             return {"action": "BUY", "confidence": 0.7}
         else:
             return {"action": "NONE", "confidence": 0}
 
     def should_exit_trade(self, data):
-        if data['close'].iloc[-1] < data['close'].rolling(window=10).mean().iloc[-1]:
+        if data['close'].iloc[-1] < self.indicator(data, "sma", period=10).iloc[-1]:
             return {"action": "EXIT", "confidence": 0.7}
         else:
-            return {"action": "NONE", "confidence": 0}
\ No newline at end of file
+            return {"action": "NONE", "confidence": 0}
+
+    def generate_signals(self, data):
+        close = data["close"].to_numpy()
+        ma = self.indicator(data, "sma", period=10).to_numpy()
+        return make_signals(
+            len(close), buy=close > ma, buy_confidence=0.7,
+            exit=close < ma, exit_confidence=0.7
+        )
@@ -1,5 +1,6 @@
+import numpy as np
 import pandas as pd
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, make_signals
 
 class Strategy(BaseStrategy):
     def __init__(self, symbol, timeframe, config=None):
@@ -12,14 +13,10 @@ class Strategy(BaseStrategy):
         super().__init__(symbol, timeframe, merged_config)
 
     def should_enter_trade(self, data):
-        high = data["high"]
-        low = data["low"]
-        close = data["close"]
-
-        lowest_low = low.rolling(self.config["fastk_period"]).min()
-        highest_high = high.rolling(self.config["fastk_period"]).max()
-        k = 100 * (close - lowest_low) / (highest_high - lowest_low)
-        d = k.rolling(self.config["slowd_period"]).mean()
+        k, d = self.indicator(
+            data, "stochastic",
+            fastk_period=self.config["fastk_period"], slowd_period=self.config["slowd_period"]
+        )
 
         if len(k) < 2 or len(d) < 2 or pd.isna(k.iloc[-1]) or pd.isna(d.iloc[-1]):
             return { "action": "NONE", "confidence": 0 }
@@ -36,7 +33,7 @@ class Strategy(BaseStrategy):
 
     def should_exit_trade(self, data):
         price = data['close'].iloc[-1]
-        ma = data['close'].rolling(window=20).mean().iloc[-1]
+        ma = self.indicator(data, "sma", period=20).iloc[-1]
         if price < ma:
             return { "action": "EXIT", "confidence": 0.7 }
         return { "action": "NONE", "confidence": 0 }
@@ -46,4 +43,18 @@ class Strategy(BaseStrategy):
         tp_pct = 0.022
         sl = round(entry_price * (1 - sl_pct), 4)
         tp = [round(entry_price * (1 + tp_pct), 4)]
-        return { "sl": sl, "tp": tp }
\ No newline at end of file
+        return { "sl": sl, "tp": tp }
+
+    def generate_signals(self, data):
+        k, d = self.indicator(
+            data, "stochastic",
+            fastk_period=self.config["fastk_period"], slowd_period=self.config["slowd_period"]
+        )
+        k, d = k.to_numpy(), d.to_numpy()
+        ready = np.arange(len(k)) >= 1
+        return make_signals(
+            len(k),
+            buy=ready & (k < 20) & (k > d), sell=ready & (k > 80) & (k < d),
+            buy_confidence=0.8, sell_confidence=0.8,
+            exit=self._exit_below_sma(data), exit_confidence=0.7
+        )
@@ -1,26 +1,33 @@
 # strategy_engine.py
 
-import time
 from strategies.ai_strategies import list_available_strategies, load_strategy
+from strategies.indicators import IndicatorCache
 from core.news_filter import is_safe_to_trade  # سيتم تنفيذه لاحقًا
-from market_data import get_historical_data
+from core.binance_api import get_stream_url
+from core.candle_scheduler import CandleScheduler
+from core.kline_stream import KlineStream
+from market_data import get_historical_data, kline_cache, resampler, stream_resampled
 
 class StrategyEngine:
     def __init__(self, symbol, timeframe):
         self.symbol = symbol
         self.timeframe = timeframe
         self.strategies = []
+        # كل مؤشر يُحسب مرة واحدة لكل شمعة مهما كان عدد الاستراتيجيات التي تستخدمه
+        self.indicators = IndicatorCache()
 
     def load_strategies(self):
         self.strategies.clear()
         for name in list_available_strategies():
             strategy = load_strategy(name, self.symbol, self.timeframe)
             if strategy:
+                strategy.indicators = self.indicators
                 self.strategies.append(strategy)
 
-    def analyze_market(self):
-        # إحضار بيانات السوق
-        data = get_historical_data(self.symbol, self.timeframe)
+    def analyze_market(self, data=None):
+        # إحضار بيانات السوق (أو استخدام الشموع القادمة من البث المباشر)
+        if data is None:
+            data = get_historical_data(self.symbol, self.timeframe)
         if data is None or data.empty:
             print("❌ No data available")
             return None
@@ -46,27 +53,91 @@ class StrategyEngine:
 
         return results
 
+def stream_engines(engines, on_results, base_url=None, window=100, resample=True):
+    """
+    وضع البث المباشر: اشتراك واحد في شموع كل المحركات وتقييم الاستراتيجيات
+    لحظة إغلاق الشمعة بدلاً من الانتظار 15 دقيقة.
+    مع resample يكفي بث دقيقة واحد لكل رمز وتُبنى باقي الفريمات منه.
+    """
+    by_pair = {}
+    for engine in engines:
+        by_pair.setdefault((engine.symbol.upper(), engine.timeframe), []).append(engine)
+
+    def on_candle_close(symbol, interval, data):
+        for engine in by_pair.get((symbol, interval), []):
+            analysis = engine.analyze_market(data)
+            if analysis:
+                on_results(engine, analysis)
+
+    derived = {resampler.base_interval, *resampler.intervals}
+    if resample and all(interval in derived for _, interval in by_pair):
+        return stream_resampled(list(by_pair), on_candle_close, base_url=base_url, window=window)
+    return KlineStream(list(by_pair), on_candle_close, base_url=base_url or get_stream_url(), window=window, seed=kline_cache.get)
+
+def schedule_engines(engines, on_results, limit=100, evaluator=None):
+    """
+    وضع الاستطلاع عبر REST بدل البث: كل محرك يُقيَّم عند إغلاق شمعته حسب ساعة المنصة،
+    والفريمات التي تُغلق معًا تُحمَّل في دفعة واحدة. مع evaluator (ParallelEvaluator)
+    تُوزع الاستراتيجيات على عدة عمليات.
+    """
+    return CandleScheduler(engines, on_results, limit=limit, evaluator=evaluator)
+
+def execute_signals(engine, analysis):
+    from core.trade_manager import trade_journal
+    from strategies.trade_executor import TradeExecutor
+    for res in analysis:
+        tp = res["sl_tp"]["tp"]
+        trade_journal.record_signal(engine.symbol, res["strategy"], res["signal"]["action"], res["entry"],
+                                    timeframe=engine.timeframe, sl=res["sl_tp"]["sl"],
+                                    tp=tp[-1] if isinstance(tp, (list, tuple)) else tp)
+        # تحديد نوع السكالب (مبدئيًا نستخدم True لو الاستراتيجية فيها "ScalpingFast")
+        is_scalp_fast = "Fast" in res["strategy"]
+        executor = TradeExecutor(engine.symbol, is_scalp_fast)
+        executor.execute_trade(
+            side=res["signal"]["action"],
+            entry_price=res["entry"],
+            sl=res["sl_tp"]["sl"],
+            tp=res["sl_tp"]["tp"],
+            use_trailing=res["signal"].get("trailing", False)
+        )
+        print(f"✅ {res['strategy']}: {res['signal']['action']} @ {res['entry']} | SL: {res['sl_tp']['sl']} TP: {res['sl_tp']['tp']}")
+
 # مثال للاستخدام:
 if __name__ == "__main__":
-    engine = StrategyEngine("TRXUSDT", "15m")
-    engine.load_strategies()
-
-    while True:
-        analysis = engine.analyze_market()
-        if analysis:
-            for res in analysis:
-                from core.trade_executor import TradeExecutor
-                # تحديد نوع السكالب (مبدئيًا نستخدم True لو الاستراتيجية فيها "ScalpingFast")
-                is_scalp_fast = "Fast" in res["strategy"]
-                executor = TradeExecutor("TRXUSDT", is_scalp_fast)
-                executor.execute_trade(
-                side=res["signal"]["action"],
-                entry_price=res["entry"],
-                sl=res["sl_tp"]["sl"],
-                tp=res["sl_tp"]["tp"],
-                use_trailing=res["signal"].get("trailing", False)
-                )
-
-        
-                print(f"✅ {res['strategy']}: {res['signal']['action']} @ {res['entry']} | SL: {res['sl_tp']['sl']} TP: {res['sl_tp']['tp']}")
-        time.sleep(60 * 15)  # كل 15 دقيقة
\ No newline at end of file
+    import sys
+
+    # أي عدد من (الرمز، الفريم)؛ كل زوج له محرك مستقل
+    RUN_PAIRS = [("TRXUSDT", "15m")]
+    engines = []
+    for symbol, timeframe in RUN_PAIRS:
+        engine = StrategyEngine(symbol, timeframe)
+        engine.load_strategies()
+        engines.append(engine)
+
+    # العمليات تُنشأ قبل خيوط البث حتى لا تُنسخ أقفالها مع fork
+    evaluator = None
+    if "--parallel" in sys.argv:
+        from strategies.parallel_engine import ParallelEvaluator
+        evaluator = ParallelEvaluator()
+
+    # أوامر TP/SL والرصيد والمراكز تُتابع من بث بيانات المستخدم في الخلفية
+    from core.account_state import account_state
+    from core.binance_api import create_listen_key, keepalive_listen_key
+    from core.mark_price_stream import MarkPriceStream
+    from core.order_tracker import order_manager
+    from core.user_stream import UserDataStream
+    stream_url = get_stream_url()
+    user_stream = UserDataStream(create_listen_key, keepalive_listen_key, base_url=stream_url)
+    from core.trade_manager import trade_journal
+    order_manager.attach(user_stream)
+    account_state.attach(user_stream)
+    # الإشارات والأوامر والتنفيذات والصفقات المغلقة تُحفظ في دفتر الصفقات
+    trade_journal.attach(user_stream)
+    user_stream.start()
+    MarkPriceStream(account_state.on_mark_price, base_url=stream_url).start()
+
+    # التقييم يتم عند إغلاق كل شمعة: من بث Binance، أو بطلبات REST مجدولة مع --poll
+    if "--poll" in sys.argv:
+        schedule_engines(engines, execute_signals, evaluator=evaluator).run_forever()
+    else:
+        stream_engines(engines, execute_signals).run_forever()
@@ -1,5 +1,55 @@
-import pandas as pd
-from strategies.base_strategy import BaseStrategy
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from strategies.base_strategy import BaseStrategy, make_signals
+
+class LevelIndex:
+    """مستويات سعرية مرتبة: أقرب مستوى لسعر معين عبر بحث ثنائي."""
+
+    def __init__(self, levels):
+        self.prices = np.sort(np.fromiter(levels, dtype=np.float64))
+
+    def nearest(self, price):
+        if len(self.prices) == 0:
+            return None
+        i = int(np.searchsorted(self.prices, price))
+        below = self.prices[max(i - 1, 0)]
+        above = self.prices[min(i, len(self.prices) - 1)]
+        return below if abs(price - below) <= abs(above - price) else above
+
+    def is_near(self, price, threshold):
+        level = self.nearest(price)
+        return level is not None and abs(price - level) / price < threshold
+
+def near_active_level(prices, levels, activation, threshold, block=1024):
+    """
+    For every bar i: is any level whose activation bar is <= i within
+    `threshold` (relative to prices[i])? Bars are processed in blocks against a
+    sorted array of already-active levels, so the cost stays close to
+    O(n log k) without a Python loop per bar.
+    """
+    n = len(prices)
+    near = np.zeros(n, dtype=bool)
+    order = np.argsort(activation, kind="stable")
+    activation, levels = activation[order], levels[order]
+    active = np.empty(0)
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        q = prices[start:stop]
+        if len(active):
+            i = np.searchsorted(active, q)
+            below = active[np.clip(i - 1, 0, len(active) - 1)]
+            above = active[np.clip(i, 0, len(active) - 1)]
+            gap = np.minimum(np.abs(q - below), np.abs(above - q))
+            near[start:stop] |= gap / q < threshold
+        # المستويات التي تُفعَّل داخل هذه الكتلة تُفحص بمصفوفة صغيرة
+        lo, hi = np.searchsorted(activation, [start, stop])
+        if hi > lo:
+            fresh, fresh_at = levels[lo:hi], activation[lo:hi]
+            bars = np.arange(start, stop)
+            hits = (np.abs(q[:, None] - fresh[None, :]) / q[:, None] < threshold) & (fresh_at[None, :] <= bars[:, None])
+            near[start:stop] |= hits.any(axis=1)
+            active = np.sort(np.concatenate([active, fresh]))
+    return near
 
 class Strategy(BaseStrategy):
     def __init__(self, symbol, timeframe, config=None):
@@ -11,16 +61,31 @@ class Strategy(BaseStrategy):
         super().__init__(symbol, timeframe, merged_config)
 
     def detect_levels(self, highs, lows):
-        support = []
-        resistance = []
+        """
+        قمم وقيعان محلية: القاع أقل من window-1 شمعة على كل جانب والقمة أعلى منها.
+        بنافذة منزلقة من NumPy بدل حلقتين متداخلتين.
+        """
+        highs = np.asarray(highs, dtype=np.float64)
+        lows = np.asarray(lows, dtype=np.float64)
         window = self.config["window"]
-        for i in range(window, len(highs) - window):
-            is_support = all(lows[i] < lows[i - j] and lows[i] < lows[i + j] for j in range(1, window))
-            is_resistance = all(highs[i] > highs[i - j] and highs[i] > highs[i + j] for j in range(1, window))
-            if is_support:
-                support.append((i, lows[i]))
-            if is_resistance:
-                resistance.append((i, highs[i]))
+        idx = np.arange(window, len(highs) - window)
+        if len(idx) == 0:
+            return [], []
+
+        k = window - 1
+        if k < 1:
+            is_support = is_resistance = np.ones(len(idx), dtype=bool)
+        else:
+            # low_min[j] = min(lows[j:j+k]) فيكون الجيران يسارًا عند idx-k ويمينًا عند idx+1
+            low_min = sliding_window_view(lows, k).min(axis=1)
+            high_max = sliding_window_view(highs, k).max(axis=1)
+            is_support = (lows[idx] < low_min[idx - k]) & (lows[idx] < low_min[idx + 1])
+            is_resistance = (highs[idx] > high_max[idx - k]) & (highs[idx] > high_max[idx + 1])
+
+        support_idx = idx[is_support]
+        resistance_idx = idx[is_resistance]
+        support = list(zip(support_idx.tolist(), lows[support_idx].tolist()))
+        resistance = list(zip(resistance_idx.tolist(), highs[resistance_idx].tolist()))
         return support, resistance
 
     def should_enter_trade(self, data):
@@ -35,18 +100,16 @@ class Strategy(BaseStrategy):
         support_levels, resistance_levels = self.detect_levels(highs.values, lows.values)
         last_price = close.iloc[-1]
 
-        for _, level in support_levels:
-            if abs(last_price - level) / last_price < self.config["threshold"]:
-                return { "action": "BUY", "confidence": 0.7 }
-        for _, level in resistance_levels:
-            if abs(last_price - level) / last_price < self.config["threshold"]:
-                return { "action": "SELL", "confidence": 0.7 }
+        if LevelIndex(level for _, level in support_levels).is_near(last_price, self.config["threshold"]):
+            return { "action": "BUY", "confidence": 0.7 }
+        if LevelIndex(level for _, level in resistance_levels).is_near(last_price, self.config["threshold"]):
+            return { "action": "SELL", "confidence": 0.7 }
 
         return { "action": "NONE", "confidence": 0 }
 
     def should_exit_trade(self, data):
         price = data['close'].iloc[-1]
-        ma = data['close'].rolling(window=20).mean().iloc[-1]
+        ma = self.indicator(data, "sma", period=20).iloc[-1]
         if price < ma:
             return { "action": "EXIT", "confidence": 0.7 }
         return { "action": "NONE", "confidence": 0 }
@@ -56,4 +119,25 @@ class Strategy(BaseStrategy):
         tp_pct = 0.03
         sl = round(entry_price * (1 - sl_pct), 4)
         tp = [round(entry_price * (1 + tp_pct), 4)]
-        return { "sl": sl, "tp": tp }
\ No newline at end of file
+        return { "sl": sl, "tp": tp }
+
+    def generate_signals(self, data):
+        window = self.config["window"]
+        threshold = self.config["threshold"]
+        close = data["close"].to_numpy(dtype=np.float64)
+        support, resistance = self.detect_levels(data["high"].values, data["low"].values)
+
+        # القاع عند p يظهر في detect_levels على data.iloc[:i+1] فقط عندما p <= i - window
+        def near(levels):
+            if not levels:
+                return np.zeros(len(close), dtype=bool)
+            idx, values = map(np.asarray, zip(*levels))
+            return near_active_level(close, values.astype(np.float64), idx + window, threshold)
+
+        ready = np.arange(len(close)) >= window * 2 + 1
+        return make_signals(
+            len(close),
+            buy=ready & near(support), sell=ready & near(resistance),
+            buy_confidence=0.7, sell_confidence=0.7,
+            exit=self._exit_below_sma(data), exit_confidence=0.7
+        )
@@ -1,19 +1,19 @@
-import time
 from core.binance_api import (
     place_market_order,
-    place_limit_order,
+    place_bracket_order,
     place_trailing_stop_order,
-    cancel_order,
     get_price
 )
 from config.settings import CAPITAL_PERCENTAGE_PER_TRADE, TRAILING_STOP_CALLBACK
 from strategies.capital_manager import get_trade_quantity
-from core.order_tracker import track_order_execution
+from core.order_tracker import track_order_execution, order_manager as default_order_manager
+from core.symbol_info import symbol_info
 
 class TradeExecutor:
-    def __init__(self, symbol, is_scalp_fast):
+    def __init__(self, symbol, is_scalp_fast, order_manager=None):
         self.symbol = symbol
         self.is_scalp_fast = is_scalp_fast
+        self.order_manager = order_manager or default_order_manager
 
     def execute_trade(self, side, entry_price, sl, tp, use_trailing=False):
         print(f"🔃 Preparing to execute {side} trade on {self.symbol}...")
@@ -21,21 +21,20 @@ class TradeExecutor:
         # حساب الكمية بناءً على رأس المال ونسبة المخاطرة
         quantity = get_trade_quantity(self.symbol, entry_price)
 
-        # تنفيذ أمر الدخول
-        if self.is_scalp_fast or use_trailing:
-            order = place_market_order(self.symbol, side, quantity)
-            print(f"✅ Market order placed: {order}")
-        else:
-            order = place_limit_order(self.symbol, side, quantity, entry_price)
-            print(f"✅ Limit order placed at {entry_price}")
-
-        # تأكيد تنفيذ الدخول
-        if not track_order_execution(order):
-            print("❌ Order failed to execute.")
+        # رفض محلي بدل رحلة ضائعة إلى المنصة إذا خالفت الكمية فلاتر الرمز
+        known_symbol = symbol_info.get(self.symbol) is not None
+        problem = symbol_info.check_order(self.symbol, quantity, entry_price) if known_symbol else None
+        if problem:
+            print(f"❌ Order not sent: {problem}")
             return
 
-        # تنفيذ Trailing Stop بدلاً من SL/TP إذا مفعل
+        # Trailing Stop بدلاً من SL/TP إذا مفعل
         if use_trailing:
+            order = place_market_order(self.symbol, side, quantity)
+            print(f"✅ Market order placed: {order}")
+            if not track_order_execution(order):
+                print("❌ Order failed to execute.")
+                return
             trailing_order = place_trailing_stop_order(
                 symbol=self.symbol,
                 side="SELL" if side == "BUY" else "BUY",
@@ -45,21 +44,29 @@ class TradeExecutor:
             print(f"🎯 Trailing Stop order placed: {trailing_order}")
             return
 
-        # أوامر TP و SL (يدويًا كـ OCO)
-        opposite_side = "SELL" if side == "BUY" else "BUY"
-        tp_order = place_limit_order(self.symbol, opposite_side, quantity, tp)
-        sl_order = place_limit_order(self.symbol, opposite_side, quantity, sl, stop=True)
+        # الأسعار على شبكة tickSize للرمز (الاستراتيجيات تقرّب لأربع خانات فقط)
+        tp = tp if isinstance(tp, (list, tuple)) else [tp]
+        if known_symbol:
+            entry_price = symbol_info.round_price(self.symbol, entry_price)
+            sl = symbol_info.round_price(self.symbol, sl) if sl else sl
+            tp = [symbol_info.round_price(self.symbol, price) for price in tp if price]
 
-        print(f"📍 TP Order: {tp_order}, SL Order: {sl_order}")
+        # الدخول و SL و TP في طلب واحد حتى لا تبقى الصفقة بلا حماية بين الطلبات
+        order = place_bracket_order(
+            self.symbol, side, quantity,
+            entry_type="MARKET" if self.is_scalp_fast else "LIMIT",
+            price=entry_price,
+            stop_loss=sl,
+            take_profits=tp
+        )
+        if not order or order["main"] is None or not track_order_execution(order):
+            print("❌ Order failed to execute.")
+            return
+        print(f"✅ Bracket placed: entry {order['main'].get('orderId')} | SL {len(order['sl'])} | TP {len(order['tp'])}")
+        if not order["sl"] or not order["tp"]:
+            print(f"⚠️ {self.symbol} position is missing protection: {order['errors']}")
+            return order
 
-        # متابعة تنفيذ أوامر الخروج
-        while True:
-            if track_order_execution(tp_order):
-                cancel_order(sl_order)
-                print("✅ TP hit, SL cancelled.")
-                break
-            elif track_order_execution(sl_order):
-                cancel_order(tp_order)
-                print("🛑 SL hit, TP cancelled.")
-                break
-            time.sleep(3)
\ No newline at end of file
+        # متابعة أوامر الخروج عبر بث بيانات المستخدم بدل الانتظار هنا؛
+        # المدير يلغي ما بقي من الأطراف عند تنفيذ SL أو اكتمال سلم TP.
+        return self.order_manager.track_bracket(self.symbol, order["tp"], order["sl"][0])
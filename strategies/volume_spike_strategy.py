@@ -1,5 +1,7 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import pandas as pd
-from strategies.base_strategy import BaseStrategy
+from strategies.base_strategy import BaseStrategy, make_signals
 
 class Strategy(BaseStrategy):
     def __init__(self, symbol, timeframe, config=None):
@@ -33,7 +35,7 @@ class Strategy(BaseStrategy):
 
     def should_exit_trade(self, data):
         price = data['close'].iloc[-1]
-        ma = data['close'].rolling(window=20).mean().iloc[-1]
+        ma = self.indicator(data, "sma", period=20).iloc[-1]
         if price < ma:
             return { "action": "EXIT", "confidence": 0.7 }
         return { "action": "NONE", "confidence": 0 }
@@ -43,4 +45,19 @@ class Strategy(BaseStrategy):
         tp_pct = 0.028
         sl = round(entry_price * (1 - sl_pct), 4)
         tp = [round(entry_price * (1 + tp_pct), 4)]
-        return { "sl": sl, "tp": tp }
\ No newline at end of file
+        return { "sl": sl, "tp": tp }
+
+    def generate_signals(self, data):
+        window = self.config["volume_window"]
+        volume = data["volume"].to_numpy()
+        body = data["close"].to_numpy() - data["open"].to_numpy()
+        avg_volume = np.full(len(volume), np.nan)
+        if len(volume) > window:
+            avg_volume[window:] = sliding_window_view(volume[:-1], window).mean(axis=1)
+        spike = volume > self.config["spike_multiplier"] * avg_volume
+        return make_signals(
+            len(volume),
+            buy=spike & (body > 0), sell=spike & (body < 0),
+            buy_confidence=0.85, sell_confidence=0.85,
+            exit=self._exit_below_sma(data), exit_confidence=0.7
+        )
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import time
+
+from aiohttp import web
+
+from core.account_state import AccountState
+from core.mark_price_stream import MarkPriceStream
+from core.user_stream import UserDataStream
+
+BALANCES = [{"asset": "USDT", "balance": "1000.0", "crossWalletBalance": "1000.0", "updateTime": 100}]
+POSITIONS = [
+    {"symbol": "BTCUSDT", "positionAmt": "0.010", "entryPrice": "60000", "unRealizedProfit": "5",
+     "positionSide": "BOTH", "updateTime": 100},
+    {"symbol": "ETHUSDT", "positionAmt": "0", "entryPrice": "0", "unRealizedProfit": "0",
+     "positionSide": "BOTH", "updateTime": 100},
+]
+
+
+def account_update(time_ms, balance, positions):
+    return {"e": "ACCOUNT_UPDATE", "E": time_ms, "T": time_ms, "a": {
+        "m": "ORDER",
+        "B": [{"a": "USDT", "wb": balance, "cw": balance, "bc": "0"}],
+        "P": [{"s": s, "pa": amount, "ep": entry, "up": "0", "mt": "cross", "ps": "BOTH"}
+              for s, amount, entry in positions],
+    }}
+
+
+def test_account_updates_apply_in_event_time_order():
+    state = AccountState(lambda: BALANCES, lambda: POSITIONS)
+    state.seed()
+    assert state.get_balance("USDT") == 1000.0
+    assert state.get_position("BTCUSDT")["positionAmt"] == "0.010"
+    assert state.get_position("ETHUSDT") is None
+
+    state.on_account_update(account_update(200, "990.5", [("BTCUSDT", "0", "0"), ("ETHUSDT", "-0.5", "3000")]))
+    # حدث أقدم من الحالة الحالية لا يعيدها للوراء
+    state.on_account_update(account_update(150, "1500", [("ETHUSDT", "0", "0")]))
+
+    assert state.get_balance("USDT") == 990.5
+    assert state.get_position("BTCUSDT") is None
+    eth = state.get_position("ETHUSDT")
+    assert (eth["positionAmt"], eth["entryPrice"], eth["marginType"]) == ("-0.5", "3000", "cross")
+    assert [p["symbol"] for p in state.positions()] == ["ETHUSDT"]
+
+
+def test_mark_prices_expire():
+    state = AccountState(None, None)
+    state.on_mark_price({"e": "markPriceUpdate", "s": "BTCUSDT", "p": "65000.5"})
+    assert state.get_mark_price("BTCUSDT") == 65000.5
+    state._marks["BTCUSDT"] = (65000.5, time.time() - 60)
+    assert state.get_mark_price("BTCUSDT") is None
+    assert state.get_mark_price("BTCUSDT", max_age=None) == 65000.5
+
+
+async def run_streams(state):
+    async def user_handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        # ننتظر أن تنتهي التعبئة من REST قبل إرسال الحدث
+        while not state.seeded:
+            await asyncio.sleep(0.01)
+        await ws.send_str(json.dumps(account_update(300, "1200", [("BTCUSDT", "0.02", "61000")])))
+        await ws.receive()
+        return ws
+
+    async def mark_handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({"stream": request.query["streams"], "data": [
+            {"e": "markPriceUpdate", "s": "BTCUSDT", "p": "61500.1"},
+            {"e": "markPriceUpdate", "s": "ETHUSDT", "p": "3100.2"},
+        ]}))
+        await ws.receive()
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/ws/{key}", user_handler)
+    app.router.add_get("/stream", mark_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    user_stream = UserDataStream(lambda: "key", base_url=base)
+    state.attach(user_stream)
+    marks = MarkPriceStream(state.on_mark_price, base_url=base)
+    tasks = [asyncio.create_task(user_stream.run()), asyncio.create_task(marks.run())]
+
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        position = state.get_position("BTCUSDT")
+        if position and position["positionAmt"] == "0.02" and state.get_mark_price("ETHUSDT"):
+            break
+        await asyncio.sleep(0.01)
+    live = state.is_live()
+    user_stream.stop()
+    marks.stop()
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=5)
+    await runner.cleanup()
+    return live
+
+
+def test_streams_keep_cache_current():
+    state = AccountState(lambda: BALANCES, lambda: POSITIONS)
+    assert not state.is_live()
+
+    live = asyncio.run(run_streams(state))
+
+    assert live
+    assert not state.is_live()
+    assert state.get_balance("USDT") == 1200.0
+    assert state.get_position("BTCUSDT")["entryPrice"] == "61000"
+    assert state.get_mark_price("BTCUSDT") == 61500.1
+    assert state.get_mark_price("ETHUSDT") == 3100.2
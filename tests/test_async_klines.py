@@ -0,0 +1,47 @@
+import asyncio
+
+from aiohttp import web
+
+from core.async_klines import KlineFetcher, klines_weight
+
+
+def test_klines_weight_brackets():
+    assert [klines_weight(n) for n in (50, 100, 500, 1000, 1500)] == [1, 2, 5, 5, 10]
+
+
+def test_fetch_many_runs_requests_concurrently():
+    state = {"in_flight": 0, "peak": 0, "weight": 0}
+
+    async def klines(request):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.05)
+        state["in_flight"] -= 1
+        state["weight"] += 2
+        symbol = request.query["symbol"]
+        rows = [[0, "1", "2", "0.5", "1.5", "10", 59_999, "0", 1, "0", "0", "0"]]
+        return web.json_response({"symbol": symbol, "rows": rows},
+                                 headers={"X-MBX-USED-WEIGHT-1M": str(state["weight"])})
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/fapi/v1/klines", klines)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        fetcher = KlineFetcher(f"http://127.0.0.1:{port}", concurrency=8)
+        requests = [(f"SYM{i}USDT", "1m", 100, None) for i in range(16)]
+        results = await fetcher.fetch_many(requests)
+        await fetcher.close()
+        await runner.cleanup()
+        return fetcher, results
+
+    fetcher, results = asyncio.run(scenario())
+    assert len(results) == 16
+    assert results[("SYM3USDT", "1m")]["symbol"] == "SYM3USDT"
+    assert state["peak"] == 8
+    assert fetcher.total_weight == 32
+    assert fetcher.used_weight == 32
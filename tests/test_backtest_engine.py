@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.backtest_engine import run_backtest
+from strategies import ema_crossover_strategy, rsi_strategy
+from strategies.base_strategy import BaseStrategy, make_signals
+from tests.test_strategies import make_data
+
+
+def reference_trades(data, strategy, use_exit_signals):
+    """Plain bar-by-bar simulation with the same rules as run_backtest."""
+    signals = strategy.generate_signals(data)
+    open_, high, low, close = (data[c].to_numpy() for c in ("open", "high", "low", "close"))
+    n = len(close)
+    trades = []
+    i = 0
+    while i < n:
+        side = int(signals["action"][i])
+        if side == 0:
+            i += 1
+            continue
+        entry = close[i]
+        levels = strategy.get_stop_loss_take_profit(data.iloc[: i + 1], entry)
+        sl = entry - side * abs(entry - levels["sl"])
+        tp = entry + side * abs(levels["tp"][0] - entry)
+        for j in range(i + 1, n):
+            hit_sl = low[j] <= sl if side > 0 else high[j] >= sl
+            hit_tp = high[j] >= tp if side > 0 else low[j] <= tp
+            if hit_sl:
+                price, reason = (min(open_[j], sl) if side > 0 else max(open_[j], sl)), "SL"
+                break
+            if hit_tp:
+                price, reason = tp, "TP"
+                break
+            if use_exit_signals and signals["exit"][j]:
+                price, reason = close[j], "EXIT"
+                break
+        else:
+            j, price, reason = n - 1, close[n - 1], "END"
+        trades.append((i, j, "BUY" if side > 0 else "SELL", price, reason))
+        i = j + 1
+    return trades
+
+
+class CloseScaledLevels(BaseStrategy):
+    """Levels that depend on the data, so the engine has to ask per trade."""
+
+    def should_enter_trade(self, data):
+        return {"action": "NONE", "confidence": 0}
+
+    def get_stop_loss_take_profit(self, data, entry_price):
+        width = abs(data["close"].iloc[-1] - data["open"].iloc[-1]) + 0.5
+        return {"sl": entry_price - width, "tp": [entry_price + 2 * width]}
+
+    def generate_signals(self, data):
+        close = data["close"].to_numpy()
+        buy = np.zeros(len(close), dtype=bool)
+        buy[::7] = True
+        sell = np.zeros(len(close), dtype=bool)
+        sell[3::7] = True
+        return make_signals(len(close), buy=buy, sell=sell)
+
+
+@pytest.mark.parametrize("module", [ema_crossover_strategy, rsi_strategy])
+@pytest.mark.parametrize("use_exit_signals", [False, True])
+def test_matches_bar_by_bar_simulation(module, use_exit_signals):
+    data = make_data(3000, seed=4)
+    strategy = module.Strategy("BTCUSDT", "1m")
+    result = run_backtest(data, strategy, use_exit_signals=use_exit_signals)
+    trades = result["trades"]
+    expected = reference_trades(data, strategy, use_exit_signals)
+
+    assert len(trades) == len(expected) > 10
+    assert list(trades["entry_time"]) == [data.index[t[0]] for t in expected]
+    assert list(trades["exit_time"]) == [data.index[t[1]] for t in expected]
+    assert list(trades["side"]) == [t[2] for t in expected]
+    assert list(trades["reason"]) == [t[4] for t in expected]
+    # النسب تُستنتج من get_stop_loss_take_profit دون تقريب الاستراتيجية لأربع خانات
+    np.testing.assert_allclose(trades["exit_price"], [t[3] for t in expected], rtol=1e-6)
+
+
+def test_data_dependent_levels_are_computed_per_trade():
+    data = make_data(1500, seed=5)
+    strategy = CloseScaledLevels("BTCUSDT", "1m")
+    trades = run_backtest(data, strategy)["trades"]
+    expected = reference_trades(data, strategy, False)
+    assert list(trades["exit_time"]) == [data.index[t[1]] for t in expected]
+    np.testing.assert_allclose(trades["exit_price"], [t[3] for t in expected], rtol=1e-12)
+
+
+def test_short_levels_are_mirrored_and_stop_wins_ties():
+    index = pd.date_range("2024-01-01", periods=4, freq="min", name="timestamp")
+    data = pd.DataFrame({
+        "open": [100.0, 100.0, 100.0, 100.0],
+        "high": [100.0, 100.5, 101.2, 100.0],
+        "low": [100.0, 99.5, 97.0, 100.0],
+        "close": [100.0, 100.0, 100.0, 100.0],
+        "volume": [1.0] * 4,
+    }, index=index)
+
+    class SellFirstBar(rsi_strategy.Strategy):
+        def generate_signals(self, data):
+            sell = np.zeros(len(data), dtype=bool)
+            sell[0] = True
+            return make_signals(len(data), sell=sell, sell_confidence=1.0)
+
+    result = run_backtest(data, SellFirstBar("BTCUSDT", "1m"), fee_rate=0.0)
+    trade = result["trades"].iloc[0]
+    # rsi_strategy: 1% SL و 2% TP، فوق وتحت سعر الدخول لصفقة البيع
+    assert trade["sl"] == pytest.approx(101.0)
+    assert trade["tp"] == pytest.approx(98.0)
+    # الشمعة الثالثة تلمس المستويين معًا فيُحتسب SL
+    assert trade["reason"] == "SL"
+    assert trade["exit_time"] == index[2]
+    assert trade["pnl"] < 0
+
+
+def test_equity_curve_and_summary():
+    data = make_data(3000, seed=6)
+    result = run_backtest(data, ema_crossover_strategy.Strategy("BTCUSDT", "1m"), initial_balance=1000)
+    trades, equity, summary = result["trades"], result["equity"], result["summary"]
+
+    assert len(equity) == len(data)
+    first_entry = data.index.get_loc(trades["entry_time"].iloc[0])
+    assert (equity.iloc[:first_entry] == 1000).all()
+    assert equity.iloc[-1] == pytest.approx(1000 + trades["pnl"].sum())
+    assert summary["trades"] == len(trades)
+    assert summary["wins"] + summary["losses"] <= summary["trades"]
+    assert summary["final_balance"] == pytest.approx(equity.iloc[-1])
+    assert 0 <= summary["max_drawdown_pct"] < 100
@@ -0,0 +1,111 @@
+import itertools
+import json
+
+from binance.exceptions import BinanceAPIException
+
+from core.bracket_orders import bracket_legs, place_bracket
+
+
+def api_error(code, msg):
+    return BinanceAPIException(None, 400, json.dumps({"code": code, "msg": msg}))
+
+
+class FakeClient:
+    def __init__(self, reject=(), batch_error=None):
+        self.reject = set(reject)
+        self.batch_error = batch_error
+        self.batches = []
+        self.created = []
+        self.cancelled = []
+        self._ids = itertools.count(1)
+
+    def _accept(self, params):
+        if params["type"] in self.reject:
+            self.reject.discard(params["type"])
+            return {"code": -2022, "msg": f"{params['type']} rejected"}
+        return {"orderId": next(self._ids), **params}
+
+    def futures_place_batch_order(self, batchOrders):
+        if self.batch_error:
+            raise self.batch_error
+        self.batches.append(batchOrders)
+        return [self._accept(params) for params in batchOrders]
+
+    def futures_create_order(self, **params):
+        self.created.append(params)
+        result = self._accept(params)
+        if "code" in result:
+            raise api_error(result["code"], result["msg"])
+        return result
+
+    def futures_cancel_order(self, symbol, orderId):
+        self.cancelled.append((symbol, orderId))
+
+
+def test_bracket_legs_are_string_params():
+    legs = bracket_legs("BTCUSDT", "BUY", 0.01, "LIMIT", 100, stop_loss=98.5,
+                        take_profits=[103, {"price": 104, "quantity": 0.005}])
+    assert [leg for leg, _ in legs] == ["entry", "sl", "tp", "tp"]
+    assert all(isinstance(value, str) for _, params in legs for value in params.values())
+    entry, sl, tp_all, tp_part = (params for _, params in legs)
+    assert (entry["side"], entry["type"], entry["price"]) == ("BUY", "LIMIT", "100")
+    assert (sl["side"], sl["type"], sl["closePosition"]) == ("SELL", "STOP_MARKET", "true")
+    assert (tp_all["type"], tp_all["stopPrice"]) == ("TAKE_PROFIT_MARKET", "103")
+    assert (tp_part["type"], tp_part["reduceOnly"], tp_part["quantity"]) == ("LIMIT", "true", "0.005")
+
+
+def test_whole_bracket_goes_out_in_one_request():
+    client = FakeClient()
+    placed = place_bracket(client, "BTCUSDT", "SELL", 0.01, stop_loss=101, take_profits=[98])
+    assert len(client.batches) == 1 and len(client.batches[0]) == 3
+    assert client.created == []
+    assert placed["main"]["side"] == "SELL"
+    assert [o["side"] for o in placed["sl"] + placed["tp"]] == ["BUY", "BUY"]
+    assert placed["errors"] == {}
+
+
+def test_rejected_protective_leg_is_retried_alone():
+    client = FakeClient(reject={"LIMIT"})
+    placed = place_bracket(client, "BTCUSDT", "BUY", 0.01, stop_loss=99,
+                           take_profits=[{"price": 101, "quantity": 0.01}])
+    assert [p["type"] for p in client.created] == ["LIMIT"]
+    assert len(placed["tp"]) == 1 and placed["errors"] == {}
+
+
+def test_rejected_entry_cancels_accepted_legs():
+    client = FakeClient(reject={"MARKET"})
+    placed = place_bracket(client, "BTCUSDT", "BUY", 0.01, stop_loss=99, take_profits=[101])
+    assert placed["main"] is None
+    assert "entry" in placed["errors"]
+    assert client.cancelled == [("BTCUSDT", 1), ("BTCUSDT", 2)]
+
+
+def test_falls_back_to_single_orders_and_splits_large_ladders():
+    client = FakeClient(batch_error=api_error(-1000, "batch disabled"))
+    placed = place_bracket(client, "BTCUSDT", "BUY", 0.01, stop_loss=99, take_profits=[101, 102])
+    assert len(client.created) == 4
+    assert placed["main"] is not None and len(placed["tp"]) == 2
+
+    client = FakeClient()
+    ladder = [{"price": 100 + i, "quantity": 0.002} for i in range(1, 6)]
+    placed = place_bracket(client, "BTCUSDT", "BUY", 0.01, stop_loss=99, take_profits=ladder)
+    assert [len(batch) for batch in client.batches] == [5, 2]
+    assert len(placed["tp"]) == 5
+
+
+def test_network_error_on_a_later_chunk_keeps_the_placed_entry():
+    class FlakyClient(FakeClient):
+        def futures_place_batch_order(self, batchOrders):
+            if self.batches:
+                raise ConnectionError("connection reset")
+            return super().futures_place_batch_order(batchOrders)
+
+    client = FlakyClient()
+    ladder = [{"price": 101 + i, "quantity": 0.002} for i in range(5)]
+    placed = place_bracket(client, "BTCUSDT", "BUY", 0.01, stop_loss=99, take_profits=ladder)
+    assert placed["main"]["type"] == "MARKET"
+    assert len(placed["sl"]) == 1 and len(placed["tp"]) == 3
+    # حالة أطراف الدفعة الفاشلة غير معروفة فلا يُعاد إرسالها
+    assert client.created == []
+    assert set(placed["errors"]) == {"tp4", "tp5"}
+    assert placed["errors"]["tp4"] == "connection reset"
@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+
+from core.candle_scheduler import CLOSE_GRACE, RETRY_DELAY, CandleScheduler, ServerClock, next_close
+from core.kline_cache import interval_to_ms
+
+HOUR_MS = 60 * 60_000
+# 2024-01-01 13:00:00 UTC (يوم اثنين)
+TOP_OF_HOUR = 1_704_114_000_000
+
+
+class FakeTime:
+    def __init__(self, start):
+        self.now = start
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class Engine:
+    def __init__(self, symbol, timeframe):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.seen = []
+
+    def analyze_market(self, data):
+        self.seen.append(data.index[-1])
+        return [{"strategy": "Dummy", "last": data["close"].iloc[-1]}]
+
+
+def frame(interval, last_open_ms, n=5):
+    step = interval_to_ms(interval)
+    index = pd.to_datetime(np.arange(last_open_ms - (n - 1) * step, last_open_ms + 1, step), unit="ms")
+    values = np.arange(n, dtype=np.float64)[:, None].repeat(5, axis=1)
+    return pd.DataFrame(values, index=index, columns=["open", "high", "low", "close", "volume"])
+
+
+def test_next_close_aligns_on_exchange_boundaries():
+    now = TOP_OF_HOUR - 110_000
+    assert next_close(now, "1m") == TOP_OF_HOUR - 60_000
+    assert next_close(now, "5m") == next_close(now, "15m") == next_close(now, "1h") == TOP_OF_HOUR
+    assert next_close(TOP_OF_HOUR, "1h") == TOP_OF_HOUR + HOUR_MS
+    # الأسبوع يُغلق ليلة الاثنين 00:00 UTC
+    monday = TOP_OF_HOUR - 13 * HOUR_MS
+    assert next_close(TOP_OF_HOUR, "1w") == monday + 7 * 24 * HOUR_MS
+
+
+def test_server_clock_uses_request_midpoint_and_resyncs():
+    fake = FakeTime(1000.0)
+    calls = []
+
+    def server_time():
+        calls.append(fake.now)
+        fake.now += 0.2
+        return (fake.now - 0.1 + 2.5) * 1000
+
+    clock = ServerClock(server_time, clock=fake.clock, resync_interval=60)
+    assert abs(clock.now() - (fake.now + 2.5)) < 1e-6
+    assert abs(clock.round_trip - 0.2) < 1e-9
+    fake.now += 30
+    clock.now()
+    assert len(calls) == 1
+    fake.now += 31
+    clock.now()
+    assert len(calls) == 2
+
+
+def test_closes_that_coincide_share_one_batched_fetch():
+    # الساعة المحلية متأخرة 3 ثوانٍ عن المنصة
+    fake = FakeTime((TOP_OF_HOUR - 110_000) / 1000 - 3)
+    server = ServerClock(lambda: (fake.now + 3) * 1000, clock=fake.clock)
+    engines = [Engine("BTCUSDT", "5m"), Engine("BTCUSDT", "15m"), Engine("btcusdt", "1h"),
+               Engine("ETHUSDT", "15m"), Engine("ETHUSDT", "1m")]
+    fetches = []
+
+    def fetch_batch(pairs, limit):
+        fetches.append((sorted(pairs), limit))
+        close_ms = next_close(server.now() * 1000 - 1000 * CLOSE_GRACE - 1, "1m")
+        # المنصة تعيد الشمعة الجارية أيضًا
+        return {pair: frame(pair[1], close_ms) for pair in pairs}
+
+    results = []
+    scheduler = CandleScheduler(engines, lambda engine, analysis: results.append(engine),
+                                fetch_batch=fetch_batch, server_clock=server, limit=3, sleep=fake.sleep)
+
+    assert scheduler.run_once() == (TOP_OF_HOUR - 60_000, [("ETHUSDT", "1m")])
+    assert abs(server.now() - ((TOP_OF_HOUR - 60_000) / 1000 + CLOSE_GRACE)) < 1e-6
+
+    close_ms, pairs = scheduler.run_once()
+    assert close_ms == TOP_OF_HOUR
+    assert fetches[1] == (sorted(pairs), 4)
+    # 1m و 5m و 15m و 1h كلها تُغلق رأس الساعة
+    assert sorted(pairs) == [("BTCUSDT", "15m"), ("BTCUSDT", "1h"), ("BTCUSDT", "5m"),
+                             ("ETHUSDT", "15m"), ("ETHUSDT", "1m")]
+    assert len(fetches) == 2
+
+    # الشمعة الجارية مستبعدة: آخر شمعة هي التي أُغلقت للتو
+    for engine in engines:
+        assert engine.seen[-1] == pd.Timestamp(TOP_OF_HOUR - interval_to_ms(engine.timeframe), unit="ms")
+    assert len(results) == 6
+
+
+def test_missing_closed_candle_is_fetched_again():
+    fake = FakeTime(TOP_OF_HOUR / 1000 - 10)
+    server = ServerClock(lambda: fake.now * 1000, clock=fake.clock)
+    engine = Engine("BTCUSDT", "5m")
+    attempts = []
+
+    def fetch_batch(pairs, limit):
+        attempts.append(pairs)
+        # أول طلب يصل قبل أن تنشر المنصة الشمعة المغلقة
+        last = TOP_OF_HOUR - 2 * 300_000 if len(attempts) == 1 else TOP_OF_HOUR
+        return {pair: frame("5m", last) for pair in pairs}
+
+    scheduler = CandleScheduler([engine], lambda *args: None, fetch_batch=fetch_batch, server_clock=server,
+                                sleep=fake.sleep)
+    scheduler.run_once()
+    assert len(attempts) == 2
+    assert fake.sleeps[-1] == RETRY_DELAY
+    assert engine.seen == [pd.Timestamp(TOP_OF_HOUR - 300_000, unit="ms")]
+
+
+def test_evaluator_runs_all_pairs_of_a_pass_together():
+    fake = FakeTime(TOP_OF_HOUR / 1000 - 10)
+    server = ServerClock(lambda: fake.now * 1000, clock=fake.clock)
+    engines = [Engine("BTCUSDT", "5m"), Engine("ETHUSDT", "1h")]
+    calls = []
+
+    class Evaluator:
+        def analyze(self, engines, frames):
+            calls.append(sorted(frames))
+            return [(engine, [{"strategy": "Dummy"}]) for engine in engines]
+
+    results = []
+    scheduler = CandleScheduler(engines, lambda engine, analysis: results.append(engine.symbol),
+                                fetch_batch=lambda pairs, limit: {p: frame(p[1], TOP_OF_HOUR) for p in pairs},
+                                server_clock=server, sleep=fake.sleep, evaluator=Evaluator())
+    scheduler.run_once()
+    assert calls == [[("BTCUSDT", "5m"), ("ETHUSDT", "1h")]]
+    assert sorted(results) == ["BTCUSDT", "ETHUSDT"]
+    assert engines[0].seen == []
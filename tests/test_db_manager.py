@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+
+import database.db_manager as db_manager
+from database.db_manager import ConnectionManager
+from database.log_writer import log_writer
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    manager = ConnectionManager(str(tmp_path / "test.db"))
+    monkeypatch.setattr(db_manager, "db", manager)
+    db_manager.init_db()
+    yield manager
+    manager.close_all()
+
+
+def test_connections_are_reused_per_thread_with_wal(db):
+    conn = db.connection()
+    assert db.connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(db.connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+
+def test_transaction_rolls_back_and_nests(db):
+    with pytest.raises(RuntimeError):
+        with db_manager.transaction() as cursor:
+            cursor.execute("INSERT INTO activity_logs (user_id, action) VALUES (1, 'a')")
+            with db_manager.transaction() as inner:
+                inner.execute("INSERT INTO activity_logs (user_id, action) VALUES (1, 'b')")
+            raise RuntimeError
+    assert db_manager.fetch_one("SELECT COUNT(*) FROM activity_logs")[0] == 0
+
+    db_manager.log_action(1, "login")
+    log_writer.flush()
+    assert db_manager.fetch_all("SELECT user_id, action FROM activity_logs") == [(1, "login")]
+
+
+def test_get_connection_callers_keep_working(db):
+    conn, cursor = db_manager.get_connection()
+    cursor.execute("INSERT INTO users (username, status) VALUES ('basim', 'active')")
+    conn.commit()
+    conn.close()
+
+    # close() بدون commit يلغي التغييرات كما كان مع الاتصال الجديد
+    conn, cursor = db_manager.get_connection()
+    cursor.execute("UPDATE users SET status = 'rejected'")
+    conn.close()
+    assert db_manager.check_user_status("basim") == "active"
+    assert db.connection().execute("SELECT 1").fetchone() == (1,)
+
+
+def test_concurrent_writers_do_not_hit_locked_errors(db):
+    errors = []
+
+    def writer(user_id):
+        try:
+            for i in range(50):
+                db_manager.log_action(user_id, f"event {i}")
+                db_manager.user_exists("basim")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    log_writer.flush()
+    assert db_manager.fetch_one("SELECT COUNT(*) FROM activity_logs")[0] == 200
+
+
+def test_login_lookup_uses_indexes_and_one_query(db):
+    from core import auth
+
+    db_manager.insert_user_with_subscription("basim", "secret", None, "2000-01-01", "2999-01-01")
+    user_id = db_manager.get_user_id("basim")
+    db_manager.add_subscription(user_id, "2001-01-01", "2998-01-01")
+    db_manager.add_subscription(user_id, "2002-01-01", "2997-01-01")
+    db_manager.execute("UPDATE subscriptions SET is_active = 0 WHERE start_date = '2002-01-01'")
+
+    record = db_manager.get_login_record("basim")
+    assert record[1] == "basim"
+    assert record[db_manager.LOGIN_START_DATE:] == ("2001-01-01", "2998-01-01")
+    assert db_manager.check_login_record(record, "secret")
+    assert not db_manager.check_login_record(record, "wrong")
+    assert db_manager.get_login_record("nobody") is None
+
+    plan = " ".join(row[-1] for row in db.connection().execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM subscriptions WHERE user_id = 1 AND is_active = 1 ORDER BY id DESC LIMIT 1"))
+    assert "idx_subscriptions_user_active" in plan
+    plan = " ".join(row[-1] for row in db.connection().execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM activity_logs WHERE user_id = 1 ORDER BY timestamp DESC"))
+    assert "idx_activity_logs_user_time" in plan
+
+    statements = []
+    db.connection().set_trace_callback(statements.append)
+    try:
+        assert auth.login("basim", "secret", device_id="device") == {"status": "success", "role": "user"}
+    finally:
+        db.connection().set_trace_callback(None)
+    assert len(statements) == 1
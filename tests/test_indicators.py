@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from strategies import incremental, indicators
+from tests.test_strategies import make_data
+
+
+def assert_parity(actual, expected):
+    np.testing.assert_allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float),
+                               rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.fixture
+def data():
+    return make_data(n=2000, seed=7)
+
+
+@pytest.mark.parametrize("span", [9, 12, 21, 26])
+def test_ema_parity(data, span):
+    ema = incremental.EMA(span)
+    assert_parity([ema.update(x) for x in data["close"]], indicators.ema(data["close"], span))
+
+
+@pytest.mark.parametrize("period", [10, 20, 50])
+def test_sma_and_std_parity(data, period):
+    sma, std = incremental.SMA(period), incremental.RollingStd(period)
+    assert_parity([sma.update(x) for x in data["close"]], indicators.sma(data["close"], period))
+    assert_parity([std.update(x) for x in data["close"]], indicators.rolling_std(data["close"], period))
+
+
+@pytest.mark.parametrize("period", [2, 14])
+def test_rsi_parity(data, period):
+    rsi = incremental.RSI(period)
+    assert_parity([rsi.update(x) for x in data["close"]], indicators.rsi(data["close"], period))
+
+
+def test_rsi_parity_on_one_sided_moves():
+    close = make_data(n=60)["close"].copy()
+    close.iloc[20:40] = np.arange(20, dtype=float) + 500
+    rsi = incremental.RSI(14)
+    assert_parity([rsi.update(x) for x in close], indicators.rsi(close, 14))
+
+
+def test_macd_parity(data):
+    macd = incremental.MACD(12, 26, 9)
+    values = np.array([macd.update(x) for x in data["close"]])
+    line, signal = indicators.macd(data["close"], 12, 26, 9)
+    assert_parity(values[:, 0], line)
+    assert_parity(values[:, 1], signal)
+
+
+def test_bollinger_parity(data):
+    bands = incremental.Bollinger(20, 2)
+    values = np.array([bands.update(x) for x in data["close"]])
+    ma = indicators.sma(data["close"], 20)
+    std = indicators.rolling_std(data["close"], 20)
+    assert_parity(values[:, 0], ma)
+    assert_parity(values[:, 1], ma + 2 * std)
+    assert_parity(values[:, 2], ma - 2 * std)
+
+
+def test_stochastic_parity(data):
+    stochastic = incremental.Stochastic(14, 3)
+    values = np.array([stochastic.update(h, l, c) for h, l, c in zip(data["high"], data["low"], data["close"])])
+    k, d = indicators.stochastic(data["high"], data["low"], data["close"], 14, 3)
+    assert_parity(values[:, 0], k)
+    assert_parity(values[:, 1], d)
+
+
+@pytest.mark.parametrize("min_periods", [None, 1, 3])
+def test_rolling_extreme_skips_nan_like_pandas(data, min_periods):
+    close = data["close"].iloc[:200].copy()
+    close.iloc[[5, 6, 30, 31, 32, 33, 34, 35, 36, 120]] = np.nan
+    for mode in ("max", "min"):
+        extreme = incremental.RollingExtreme(5, mode, min_periods=min_periods)
+        expected = getattr(close.rolling(5, min_periods=min_periods), mode)()
+        assert_parity([extreme.update(x) for x in close], expected)
+
+
+def test_cache_steps_stream_windows_incrementally(data, monkeypatch):
+    calls = []
+    for name, formula in list(indicators.INDICATORS.items()):
+        monkeypatch.setitem(indicators.INDICATORS, name,
+                            lambda *args, _name=name, _formula=formula, **kw: calls.append(_name) or _formula(*args, **kw))
+    cache = indicators.IndicatorCache()
+    requests = [("rsi", {"period": 14}), ("sma", {"period": 20}), ("std", {"period": 20}),
+                ("stochastic", {"fastk_period": 14, "slowd_period": 3}), ("ema", {"span": 21}),
+                ("macd", {"fast": 12, "slow": 26, "signal": 9})]
+
+    # نافذة منزلقة من 100 شمعة كما يسلمها KlineStream عند كل إغلاق
+    for end in range(100, 400):
+        window = data.iloc[end - 100:end].copy()
+        results = {name: cache.get(window, name, **params) for name, params in requests}
+        # المؤشرات ذات النافذة المحدودة تطابق pandas على النافذة نفسها
+        for name, params in requests[:4]:
+            expected = indicators.INDICATORS[name](window, **params)
+            for got, want in zip(*(v if isinstance(v, tuple) else (v,) for v in (results[name], expected))):
+                assert list(got.index) == list(want.index)
+                assert_parity(got, want)
+        # EMA تحتفظ بالتاريخ منذ أول نافذة
+        history = data.iloc[:end]
+        assert results["ema"].iloc[-1] == pytest.approx(indicators.ema(history["close"], 21).iloc[-1])
+        assert results["macd"][1].iloc[-1] == pytest.approx(indicators.macd(history["close"], 12, 26, 9)[1].iloc[-1])
+        calls.clear()
+
+    assert cache.steps == 299 * len(requests)
+
+    # فجوة (شمعة مفقودة) أو بيانات أخرى: إعادة الحساب الكامل
+    cache.get(data.iloc[301:401].copy(), "rsi", period=14)
+    assert calls == ["rsi"]
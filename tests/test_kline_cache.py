@@ -0,0 +1,84 @@
+from core.kline_cache import KlineCache
+
+STEP = 15 * 60_000
+
+
+def make_kline(open_time, close):
+    return [open_time, str(close), str(close + 1), str(close - 1), str(close), "10",
+            open_time + STEP - 1, "0", 0, "0", "0", "0"]
+
+
+class FakeExchange:
+    def __init__(self, candles):
+        self.candles = candles
+        self.calls = []
+
+    def __call__(self, symbol, interval, limit, start_time=None):
+        self.calls.append((limit, start_time))
+        rows = self.candles
+        if start_time is not None:
+            rows = [k for k in rows if k[0] >= start_time]
+            return rows[:limit]
+        return rows[-limit:]
+
+
+def test_warm_cache_only_fetches_new_candles(tmp_path):
+    candles = [make_kline(i * STEP, 100 + i) for i in range(200)]
+    exchange = FakeExchange(candles)
+    cache = KlineCache(exchange, cache_dir=str(tmp_path))
+
+    now = 199 * STEP + 10
+    rows = cache.get("BTCUSDT", "15m", 100, now_ms=now)
+    assert len(rows) == 100
+    assert exchange.calls == [(100, None)]
+
+    # شمعة جديدة أُغلقت وبدأت التالية
+    exchange.candles = candles + [make_kline(200 * STEP, 300)]
+    rows = cache.get("BTCUSDT", "15m", 100, now_ms=200 * STEP + 10)
+    assert exchange.calls[-1] == (2, 199 * STEP)
+    assert rows[-1, 0] == 200 * STEP
+    assert rows[-1, 4] == 300
+    assert len(rows) == 100
+
+
+def test_restart_warms_from_disk(tmp_path):
+    candles = [make_kline(i * STEP, 100 + i) for i in range(150)]
+    KlineCache(FakeExchange(candles), cache_dir=str(tmp_path)).get(
+        "ETHUSDT", "15m", 100, now_ms=150 * STEP)
+
+    exchange = FakeExchange(candles)
+    rows = KlineCache(exchange, cache_dir=str(tmp_path)).get(
+        "ETHUSDT", "15m", 100, now_ms=150 * STEP)
+    assert exchange.calls == [(2, 149 * STEP)]
+    assert rows[-1, 0] == 149 * STEP
+
+
+def test_large_gap_falls_back_to_full_window(tmp_path):
+    candles = [make_kline(i * STEP, 100 + i) for i in range(500)]
+    exchange = FakeExchange(candles[:120])
+    cache = KlineCache(exchange, cache_dir=str(tmp_path))
+    cache.get("TRXUSDT", "15m", 100, now_ms=120 * STEP)
+
+    exchange.candles = candles
+    rows = cache.get("TRXUSDT", "15m", 100, now_ms=499 * STEP + 10)
+    assert exchange.calls[-1] == (100, None)
+    assert rows[0, 0] == 400 * STEP
+
+
+def test_get_buffers_refreshes_all_pairs_in_one_round(tmp_path):
+    candles = {sym: [make_kline(i * STEP, 100 + i) for i in range(120)] for sym in ("BTCUSDT", "ETHUSDT")}
+    rounds = []
+
+    def fetch_many(requests):
+        rounds.append(requests)
+        return {(sym, itv): FakeExchange(candles[sym])(sym, itv, limit, start)
+                for sym, itv, limit, start in requests}
+
+    cache = KlineCache(None, cache_dir=str(tmp_path), fetch_many=fetch_many)
+    pairs = [("BTCUSDT", "15m"), ("ETHUSDT", "15m")]
+    cache.get_buffers(pairs, 100, now_ms=119 * STEP + 10)
+    buffers = cache.get_buffers(pairs, 100, now_ms=119 * STEP + 20)
+
+    assert rounds[0] == [("BTCUSDT", "15m", 100, None), ("ETHUSDT", "15m", 100, None)]
+    assert rounds[1] == [("BTCUSDT", "15m", 1, 119 * STEP), ("ETHUSDT", "15m", 1, 119 * STEP)]
+    assert all(len(buffer) == 100 for buffer in buffers.values())
@@ -0,0 +1,76 @@
+import asyncio
+import json
+
+from aiohttp import web
+
+from core.kline_stream import KlineStream
+
+STEP = 60_000
+
+
+def kline_event(symbol, open_time, close, closed):
+    return {
+        "stream": f"{symbol.lower()}@kline_1m",
+        "data": {
+            "e": "kline", "s": symbol,
+            "k": {"t": open_time, "T": open_time + STEP - 1, "s": symbol, "i": "1m",
+                  "o": str(close), "h": str(close + 1), "l": str(close - 1), "c": str(close),
+                  "v": "5", "x": closed},
+        },
+    }
+
+
+async def run_against_local_server(events, expected_closes):
+    requested = []
+
+    async def handler(request):
+        requested.append(request.query_string)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        for event in events:
+            await ws.send_str(json.dumps(event))
+        await ws.receive()
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/stream", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    closes = []
+    done = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def on_close(symbol, interval, data):
+        closes.append((symbol, interval, data))
+        if len(closes) == expected_closes:
+            loop.call_soon_threadsafe(done.set)
+
+    stream = KlineStream([("BTCUSDT", "1m"), ("ETHUSDT", "1m")], on_close,
+                         base_url=f"http://127.0.0.1:{port}")
+    task = asyncio.create_task(stream.run())
+    await asyncio.wait_for(done.wait(), timeout=5)
+    stream.stop()
+    await asyncio.wait_for(task, timeout=5)
+    await runner.cleanup()
+    return requested, closes, stream
+
+
+def test_candle_close_triggers_callback_with_rolling_window():
+    events = [
+        kline_event("BTCUSDT", 0, 100, False),
+        kline_event("BTCUSDT", 0, 101, True),
+        kline_event("BTCUSDT", STEP, 102, False),
+        kline_event("BTCUSDT", STEP, 103, True),
+    ]
+
+    requested, closes, stream = asyncio.run(run_against_local_server(events, expected_closes=2))
+
+    assert requested == ["streams=btcusdt@kline_1m/ethusdt@kline_1m"]
+    symbol, interval, data = closes[-1]
+    assert (symbol, interval) == ("BTCUSDT", "1m")
+    assert list(data["close"]) == [101.0, 103.0]
+    assert stream.get_data("BTCUSDT", "1m")["close"].iloc[-1] == 103.0
@@ -0,0 +1,130 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from database.db_manager import ConnectionManager
+from database.log_writer import ActivityLogWriter
+
+
+def make_db(tmp_path):
+    manager = ConnectionManager(str(tmp_path / "logs.db"))
+    manager.connection().execute(
+        "CREATE TABLE activity_logs (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, action TEXT, "
+        "timestamp TEXT DEFAULT CURRENT_TIMESTAMP)")
+    return manager
+
+
+def count(manager):
+    return manager.connection().execute("SELECT COUNT(*) FROM activity_logs").fetchone()[0]
+
+
+def test_batches_by_size_and_flushes_everything_on_close(tmp_path):
+    manager = make_db(tmp_path)
+    writer = ActivityLogWriter(manager.transaction, batch_size=100, flush_interval=60)
+    for i in range(1050):
+        assert writer.log(i, f"event {i}")
+    writer.close()
+    assert count(manager) == 1050
+    assert writer.stats["written"] == 1050
+    assert writer.stats["batches"] <= 11
+    # الترتيب محفوظ ووقت الحدث بنفس صيغة CURRENT_TIMESTAMP
+    rows = manager.connection().execute("SELECT user_id, timestamp FROM activity_logs ORDER BY id").fetchall()
+    assert [row[0] for row in rows] == list(range(1050))
+    assert len(rows[0][1]) == 19
+    assert not writer.log(1, "after close")
+    manager.close_all()
+
+
+def test_time_trigger_and_flush(tmp_path):
+    manager = make_db(tmp_path)
+    writer = ActivityLogWriter(manager.transaction, batch_size=1000, flush_interval=0.05)
+    writer.log(1, "signal")
+    deadline = time.monotonic() + 5
+    while count(manager) == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert count(manager) == 1
+
+    writer.flush_interval = 60
+    writer.log(2, "order")
+    writer.flush()
+    assert count(manager) == 2
+    writer.close()
+    manager.close_all()
+
+
+def test_full_queue_applies_backpressure_then_drops():
+    release = threading.Event()
+    written = []
+
+    @contextmanager
+    def slow_transaction():
+        release.wait(5)
+
+        class Cursor:
+            def executemany(self, sql, rows):
+                written.extend(rows)
+        yield Cursor()
+
+    writer = ActivityLogWriter(slow_transaction, batch_size=1, flush_interval=0, max_queue=2, timeout=0.05)
+    results = [writer.log(i, "fill") for i in range(6)]
+    # الكاتب مشغول بالدفعة الأولى، والطابور يتسع لحدثين فقط
+    assert results[:3] == [True, True, True]
+    assert results[3:] == [False, False, False]
+    assert writer.stats["dropped"] == 3
+    release.set()
+    writer.close()
+    assert [row[0] for row in written] == [0, 1, 2]
+
+
+def test_failed_batches_are_retried_before_counting_as_failed():
+    attempts = []
+    written = []
+
+    @contextmanager
+    def locked_twice():
+        attempts.append(1)
+        if len(attempts) <= 2:
+            raise RuntimeError("database is locked")
+
+        class Cursor:
+            def executemany(self, sql, rows):
+                written.extend(rows)
+        yield Cursor()
+
+    writer = ActivityLogWriter(locked_twice, batch_size=10, flush_interval=60, retry_delays=(0.01, 0.01))
+    for i in range(3):
+        writer.log(i, "fill")
+    writer.close()
+    assert [row[0] for row in written] == [0, 1, 2]
+    assert writer.stats["retries"] == 2 and writer.stats["failed"] == 0
+
+    @contextmanager
+    def always_locked():
+        raise RuntimeError("database is locked")
+        yield
+
+    writer = ActivityLogWriter(always_locked, flush_interval=60, retry_delays=(0.01,))
+    writer.log(1, "fill")
+    writer.close()
+    assert writer.stats == {"written": 0, "batches": 0, "dropped": 0, "failed": 1, "retries": 1}
+
+
+def test_every_accepted_row_is_written_when_closing_concurrently(tmp_path):
+    manager = make_db(tmp_path)
+    writer = ActivityLogWriter(manager.transaction, batch_size=50, flush_interval=60)
+    accepted = []
+
+    def produce(user_id):
+        for i in range(500):
+            if writer.log(user_id, f"event {i}"):
+                accepted.append(user_id)
+
+    threads = [threading.Thread(target=produce, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.005)
+    writer.close()
+    for thread in threads:
+        thread.join()
+    assert count(manager) == len(accepted) == writer.stats["written"]
+    manager.close_all()
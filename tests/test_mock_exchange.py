@@ -0,0 +1,141 @@
+import threading
+
+import pytest
+from binance.exceptions import BinanceAPIException
+
+from core.account_state import AccountState
+from core.bracket_orders import place_bracket
+from core.kline_stream import KlineStream
+from core.mock_exchange import MockExchange
+from core.order_tracker import OrderManager
+from core.user_stream import UserDataStream
+
+
+def test_bracket_fills_and_stop_gap_fills_at_open():
+    exchange = MockExchange({"BTCUSDT": [100, 101, (96, 96, 94, 95)]}, balance=1000, fee_rate=0.001)
+    exchange.step()
+
+    placed = place_bracket(exchange, "BTCUSDT", "BUY", 1, "MARKET", stop_loss=98, take_profits=[104])
+    assert placed["errors"] == {}
+    assert exchange.positions["BTCUSDT"] == [1.0, 100.0]
+    sl, tp = placed["sl"][0], placed["tp"][0]
+
+    exchange.step()
+    assert exchange.orders[sl["orderId"]]["status"] == "NEW"
+
+    # فجوة تحت الوقف: التنفيذ بسعر الافتتاح 96 لا بسعر الوقف 98
+    exchange.step()
+    assert exchange.orders[sl["orderId"]]["status"] == "FILLED"
+    assert exchange.orders[sl["orderId"]]["avgPrice"] == "96"
+    assert exchange.positions["BTCUSDT"][0] == 0
+    assert exchange.balance == pytest.approx(1000 - 4 - 0.1 - 0.096)
+    assert exchange.orders[tp["orderId"]]["status"] == "NEW"
+
+    exchange.futures_cancel_order(symbol="BTCUSDT", orderId=tp["orderId"])
+    with pytest.raises(BinanceAPIException) as e:
+        exchange.futures_cancel_order(symbol="BTCUSDT", orderId=tp["orderId"])
+    assert e.value.code == -2011
+
+
+def test_limit_orders_rest_until_price_trades_through():
+    exchange = MockExchange({"ETHUSDT": [100, 99, 97, 103]})
+    exchange.step()
+
+    order = exchange.futures_create_order(symbol="ETHUSDT", side="BUY", type="LIMIT", quantity="2",
+                                          price="98", timeInForce="GTC")
+    assert order["status"] == "NEW"
+    exchange.step()
+    assert exchange.positions["ETHUSDT"][0] == 0
+    exchange.step()
+    assert exchange.futures_get_order(symbol="ETHUSDT", orderId=order["orderId"])["avgPrice"] == "98"
+    assert exchange.futures_position_information(symbol="ETHUSDT")[0]["positionAmt"] == "2"
+
+    tp = exchange.futures_create_order(symbol="ETHUSDT", side="SELL", type="LIMIT", quantity="5",
+                                       price="102", reduceOnly="true")
+    exchange.step()
+    # reduceOnly لا يتجاوز حجم المركز
+    assert exchange.futures_get_order(symbol="ETHUSDT", orderId=tp["orderId"])["executedQty"] == "2"
+    assert exchange.positions["ETHUSDT"][0] == 0
+
+
+def test_rejections_use_binance_error_codes():
+    exchange = MockExchange({"BTCUSDT": [100, 100]}, balance=100, leverage=10)
+    exchange.step()
+
+    def code(**params):
+        with pytest.raises(BinanceAPIException) as e:
+            exchange.futures_create_order(symbol="BTCUSDT", **params)
+        return e.value.code
+
+    assert code(side="SELL", type="LIMIT", quantity="1", price="110", reduceOnly="true") == -2022
+    assert code(side="SELL", type="STOP_MARKET", stopPrice="101", closePosition="true") == -2021
+    assert code(side="BUY", type="MARKET", quantity="11") == -2019
+    assert code(side="BUY", type="FOO", quantity="1") == -1116
+
+    # في الدفعة يعود الرفض كعنصر بدل استثناء
+    results = exchange.futures_place_batch_order(batchOrders=[
+        {"symbol": "BTCUSDT", "side": "BUY", "type": "MARKET", "quantity": "1"},
+        {"symbol": "BTCUSDT", "side": "SELL", "type": "STOP_MARKET", "stopPrice": "101", "closePosition": "true"},
+    ])
+    assert results[0]["status"] == "FILLED"
+    assert results[1] == {"code": -2021, "msg": "Order would immediately trigger."}
+
+
+def test_market_data_endpoints():
+    exchange = MockExchange({"BTCUSDT": [100, 102, 101], "ETHUSDT": [10, 11, 12]})
+    exchange.step(2)
+
+    rows = exchange.futures_klines(symbol="BTCUSDT", interval="1m", limit=5)
+    assert [r[4] for r in rows] == ["100", "102"]
+    assert rows[1][0] - rows[0][0] == 60_000 and rows[0][6] == rows[1][0] - 1
+    assert exchange.futures_klines(symbol="BTCUSDT", interval="1m", startTime=rows[1][0])[0][0] == rows[1][0]
+    assert exchange.futures_symbol_ticker(symbol="ETHUSDT")["price"] == "11"
+    assert exchange.futures_account_balance()[0]["balance"] == "10000"
+    info = exchange.futures_exchange_info()
+    assert {s["symbol"] for s in info["symbols"]} == {"BTCUSDT", "ETHUSDT"}
+    assert exchange.step() is True and exchange.step() is False
+
+
+def test_streams_drive_order_manager_account_state_and_klines():
+    exchange = MockExchange({"BTCUSDT": [100, 100, 101, 106, 107]}, latency=0.001)
+    url = exchange.serve()
+    exchange.step()
+
+    manager = OrderManager(cancel=lambda symbol, oid: exchange.futures_cancel_order(symbol=symbol, orderId=oid))
+    account = AccountState(exchange.futures_account_balance, exchange.futures_position_information)
+    user_stream = UserDataStream(exchange.futures_stream_get_listen_key, base_url=url)
+    manager.attach(user_stream)
+    account.attach(user_stream)
+
+    closes = []
+    candles_seen = threading.Event()
+
+    def on_candle_close(symbol, interval, data):
+        closes.append(float(data["close"].iloc[-1]))
+        if len(closes) == 3:
+            candles_seen.set()
+
+    klines = KlineStream([("BTCUSDT", "1m")], on_candle_close, base_url=url)
+    user_stream.start()
+    klines.start()
+    try:
+        assert user_stream.connected.wait(5) and klines.connected.wait(5)
+        placed = place_bracket(exchange, "BTCUSDT", "BUY", 1, "MARKET", stop_loss=95, take_profits=[105])
+        bracket = manager.track_bracket("BTCUSDT", placed["tp"][0], placed["sl"][0])
+
+        exchange.step(3)
+        assert bracket["closed"].wait(5)
+        assert bracket["result"] == "TP"
+        assert exchange.orders[placed["sl"][0]["orderId"]]["status"] == "CANCELED"
+        assert candles_seen.wait(5)
+        assert closes == [100.0, 101.0, 106.0]
+
+        # الرصيد والمركز من أحداث ACCOUNT_UPDATE دون طلبات REST إضافية
+        assert account.is_live()
+        assert account.get_position("BTCUSDT") is None
+        assert account.get_balance() == pytest.approx(exchange.balance)
+    finally:
+        user_stream.stop()
+        klines.stop()
+        exchange.close()
+        manager.shutdown()
@@ -0,0 +1,42 @@
+import numpy as np
+
+from core.ohlcv_buffer import OHLCVBuffer
+
+
+def make_rows(start, n):
+    t = np.arange(start, start + n, dtype=np.float64)
+    return np.column_stack([t * 60_000, t, t + 1, t - 1, t + 0.5, t * 10, t * 60_000 + 59_999])
+
+
+def test_rolls_over_capacity_and_keeps_order():
+    buffer = OHLCVBuffer(5)
+    for row in make_rows(0, 12):
+        buffer.append(row)
+    assert len(buffer) == 5
+    np.testing.assert_array_equal(buffer.column("open"), [7, 8, 9, 10, 11])
+    np.testing.assert_array_equal(buffer.rows(), make_rows(7, 5))
+
+
+def test_column_views_share_memory():
+    buffer = OHLCVBuffer(4, make_rows(0, 3))
+    close = buffer.column("close")
+    assert np.shares_memory(close, buffer._data)
+    assert not close.flags.writeable
+
+
+def test_upsert_truncate_and_frame():
+    buffer = OHLCVBuffer(10, make_rows(0, 6))
+    forming = make_rows(5, 1)[0].copy()
+    forming[4] = 99.0
+    buffer.upsert(forming)
+    buffer.upsert(make_rows(2, 1)[0])
+    assert len(buffer) == 6
+    assert buffer.column("close")[-1] == 99.0
+
+    buffer.truncate_from(4 * 60_000)
+    np.testing.assert_array_equal(buffer.column("open"), [0, 1, 2, 3])
+
+    data = buffer.frame(2)
+    assert list(data.columns) == ["open", "high", "low", "close", "volume"]
+    assert list(data["close"]) == [2.5, 3.5]
+    assert data.index.name == "timestamp"
@@ -0,0 +1,52 @@
+import pytest
+
+from backtesting.backtest_engine import run_backtest
+from backtesting.optimizer import grid_params, optimize, random_params
+from core.shared_ohlcv import SharedOHLCV, attach
+from strategies import rsi_strategy
+from tests.test_strategies import make_data
+
+
+def test_shared_ohlcv_round_trip_is_read_only_view():
+    data = make_data(500)
+    with SharedOHLCV(data) as shared:
+        shm, view = attach(shared.spec)
+        assert view.equals(data)
+        assert view.index.name == "timestamp"
+        with pytest.raises(ValueError):
+            view["close"].to_numpy()[0] = 0
+        del view
+        shm.close()
+
+
+def test_grid_and_random_params():
+    grid = grid_params({"period": [7, 14], "oversold": [20, 25, 30]})
+    assert len(grid) == 6
+    assert {"period": 14, "oversold": 25} in grid
+
+    space = {"period": (5, 30), "overbought": [70, 80], "threshold": (0.001, 0.01)}
+    samples = random_params(space, 50, seed=3)
+    assert samples == random_params(space, 50, seed=3)
+    assert all(5 <= s["period"] <= 30 and isinstance(s["period"], int) for s in samples)
+    assert all(s["overbought"] in (70, 80) for s in samples)
+    assert all(0.001 <= s["threshold"] <= 0.01 for s in samples)
+
+
+def test_optimize_ranks_process_pool_results():
+    data = make_data(2000, seed=7)
+    combinations = grid_params({"period": [7, 14, 21], "oversold": [25, 30]})
+    seen = []
+    ranking = optimize(data, "rsi_strategy", combinations, metric="net_profit", processes=2,
+                       on_result=lambda result, ranking: seen.append(len(ranking)))
+
+    assert seen == list(range(1, len(combinations) + 1))
+    profits = [r["summary"]["net_profit"] for r in ranking]
+    assert profits == sorted(profits, reverse=True)
+    for result in ranking:
+        expected = run_backtest(data, rsi_strategy.Strategy("BTCUSDT", "1m", result["params"]))["summary"]
+        assert result["summary"]["net_profit"] == pytest.approx(expected["net_profit"])
+        assert result["summary"]["trades"] == expected["trades"]
+
+    drawdowns = optimize(data, "rsi_strategy", combinations[:3], metric="max_drawdown_pct", processes=2)
+    values = [r["summary"]["max_drawdown_pct"] for r in drawdowns]
+    assert values == sorted(values)
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from aiohttp import web
+
+from core.order_tracker import OrderManager
+from core.user_stream import UserDataStream
+
+
+def order_update(symbol, order_id, status):
+    return {"e": "ORDER_TRADE_UPDATE", "E": 1, "T": 1,
+            "o": {"s": symbol, "i": order_id, "X": status, "x": "TRADE" if status == "FILLED" else status}}
+
+
+async def run_user_stream(events, manager, expected_closes):
+    paths = []
+    keepalives = []
+
+    async def handler(request):
+        paths.append(request.path)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        for event in events:
+            await ws.send_str(json.dumps(event))
+        await ws.receive()
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/ws/{key}", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    closed = []
+    done = threading.Event()
+
+    def on_close(bracket):
+        closed.append(bracket)
+        if len(closed) == expected_closes:
+            done.set()
+
+    # BTC-1 سُجلت قبل الاتصال، و ETH تُسجَّل بعد أن يصل حدث تنفيذها
+    manager.track_bracket("BTCUSDT", {"main": {"orderId": 11}}, {"main": {"orderId": 12}}, on_close)
+    manager.track_bracket("BTCUSDT", 21, 22, on_close)
+
+    stream = UserDataStream(lambda: "testkey", keepalives.append, base_url=f"http://127.0.0.1:{port}",
+                            keepalive_interval=0.05)
+    manager.attach(stream)
+    task = asyncio.create_task(stream.run())
+    while not stream.connected.is_set():
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)
+    manager.track_bracket("ETHUSDT", 31, 32, on_close)
+    await asyncio.get_running_loop().run_in_executor(None, done.wait, 5)
+    stream.stop()
+    await asyncio.wait_for(task, timeout=5)
+    await runner.cleanup()
+    return paths, keepalives, closed
+
+
+def test_fills_cancel_the_sibling_leg_without_blocking():
+    cancelled = []
+    manager = OrderManager(cancel=lambda symbol, order_id: cancelled.append((symbol, order_id)))
+    events = [
+        order_update("BTCUSDT", 11, "NEW"),
+        order_update("BTCUSDT", 22, "PARTIALLY_FILLED"),
+        order_update("BTCUSDT", 11, "FILLED"),
+        order_update("ETHUSDT", 32, "FILLED"),
+        order_update("BTCUSDT", 22, "FILLED"),
+        order_update("BTCUSDT", 12, "CANCELED"),
+        {"e": "ACCOUNT_UPDATE", "a": {}},
+    ]
+
+    paths, keepalives, closed = asyncio.run(run_user_stream(events, manager, expected_closes=3))
+    manager.shutdown()
+
+    assert paths == ["/ws/testkey"]
+    assert keepalives and set(keepalives) == {"testkey"}
+    assert sorted(cancelled) == [("BTCUSDT", 12), ("BTCUSDT", 21), ("ETHUSDT", 31)]
+    assert sorted((b["symbol"], b["tp"], b["result"]) for b in closed) == [
+        ("BTCUSDT", [11], "TP"), ("BTCUSDT", [21], "SL"), ("ETHUSDT", [31], "SL")]
+    assert all(b["closed"].is_set() for b in closed)
+    assert len(manager.open_brackets()) == 0
+
+
+def test_ladder_cancels_every_open_leg_and_needs_order_ids():
+    cancelled = []
+    manager = OrderManager(cancel=lambda symbol, order_id: cancelled.append(order_id))
+    ladder = manager.track_bracket("BTCUSDT", [41, 42, 43], 44)
+    manager.on_order_update(order_update("BTCUSDT", 41, "FILLED"))
+    assert ladder["result"] is None
+    # SL بعد أول هدف: الهدفان الباقيان يُلغيان
+    manager.on_order_update(order_update("BTCUSDT", 44, "FILLED"))
+    assert ladder["closed"].wait(5) and ladder["result"] == "SL"
+    assert cancelled == [42, 43]
+
+    cancelled.clear()
+    full = manager.track_bracket("BTCUSDT", [{"orderId": 51}, {"orderId": 52}], {"orderId": 53})
+    for leg in (51, 52):
+        manager.on_order_update(order_update("BTCUSDT", leg, "FILLED"))
+    assert full["closed"].wait(5) and full["result"] == "TP"
+    assert cancelled == [53]
+
+    # TP بخاصية closePosition يغلق الصفقة وحده
+    cancelled.clear()
+    whole = manager.track_bracket("ETHUSDT", [{"orderId": 61, "closePosition": True}, 62], 63)
+    manager.on_order_update(order_update("ETHUSDT", 61, "FILLED"))
+    assert whole["closed"].wait(5) and cancelled == [62, 63]
+    manager.shutdown()
+    assert manager.open_brackets() == []
+
+    with pytest.raises(ValueError):
+        manager.track_bracket("BTCUSDT", {"main": None}, 71)
+    with pytest.raises(ValueError):
+        manager.track_bracket("BTCUSDT", [72], None)
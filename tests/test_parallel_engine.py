@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from strategies.ai_strategies import list_available_strategies, load_strategy
+from strategies.indicators import IndicatorCache
+from strategies.parallel_engine import ParallelEvaluator, evaluate_strategy
+
+
+def random_frame(seed, bars=300):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, bars)))
+    spread = close * rng.uniform(0, 0.01, bars)
+    index = pd.date_range("2024-01-01", periods=bars, freq="15min", name="timestamp")
+    return pd.DataFrame({"open": np.roll(close, 1), "high": close + spread, "low": close - spread,
+                         "close": close, "volume": rng.uniform(100, 1000, bars) * (1 + 5 * (rng.random(bars) > 0.97))},
+                        index=index)
+
+
+def serial(frames, names):
+    results = {}
+    for pair, data in frames.items():
+        cache = IndicatorCache()
+        results[pair] = []
+        if data.empty:
+            continue
+        for name in names:
+            strategy = load_strategy(name, pair[0], pair[1])
+            strategy.indicators = cache
+            result = evaluate_strategy(strategy, data)
+            if result is not None:
+                results[pair].append(result)
+    return results
+
+
+class Engine:
+    def __init__(self, symbol, timeframe):
+        self.symbol = symbol
+        self.timeframe = timeframe
+
+
+def test_parallel_results_match_serial_in_deterministic_order():
+    names = sorted(list_available_strategies())
+    frames = {(f"SYM{seed}USDT", "15m"): random_frame(seed) for seed in range(6)}
+    frames[("EMPTYUSDT", "15m")] = random_frame(0).iloc[:0]
+    expected = serial(frames, names)
+    assert sum(len(results) for results in expected.values()) > 0
+
+    with ParallelEvaluator(processes=2, strategies=names) as evaluator:
+        for _ in range(2):
+            assert evaluator.evaluate(frames) == expected
+
+        # الدورة التالية ببيانات أحدث تعيد حساب المؤشرات في العمليات
+        newer = {pair: data.iloc[:-1] for pair, data in frames.items()}
+        assert evaluator.evaluate(newer) == serial(newer, names)
+
+        engines = [Engine("sym1usdt", "15m"), Engine("SYM1USDT", "15m"), Engine("MISSINGUSDT", "15m")]
+        analyzed = evaluator.analyze(engines, frames)
+        assert [engine for engine, _ in analyzed] == engines[:2]
+        assert analyzed[0][1] == expected[("SYM1USDT", "15m")]
+
+
+def test_shared_blocks_are_released_after_each_cycle():
+    frames = {("SYM0USDT", "15m"): random_frame(0, bars=50)}
+    before = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+    with ParallelEvaluator(processes=1, strategies=["rsi_strategy"]) as evaluator:
+        evaluator.evaluate(frames)
+        evaluator.evaluate(frames)
+    after = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+    assert not {name for name in after - before if name.startswith("psm_")}
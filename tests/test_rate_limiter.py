@@ -0,0 +1,151 @@
+import threading
+import time
+
+from core.rate_limiter import (
+    PRIORITY_ACCOUNT, PRIORITY_MARKET, PRIORITY_ORDER, RateLimitedClient, RateLimiter,
+)
+
+
+def minute_clock():
+    # ساعة تبدأ في أول الدقيقة حتى لا تتجدد النافذة أثناء الاختبار
+    start = time.monotonic()
+    return lambda: time.monotonic() - start + 1.0
+
+
+def test_concurrent_callers_never_exceed_the_budget():
+    limiter = RateLimiter(weight_limit=100, order_headroom=0, clock=minute_clock())
+    peak = []
+    granted = []
+    lock = threading.Lock()
+
+    def worker():
+        if not limiter.acquire(5, PRIORITY_MARKET, timeout=0.3):
+            return
+        with lock:
+            granted.append(1)
+            peak.append(limiter.used_weight + limiter._reserved_weight)
+        time.sleep(0.01)
+        limiter.settle(5)
+
+    threads = [threading.Thread(target=worker) for _ in range(40)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # يصل إلى الحد تمامًا ولا يتجاوزه
+    assert len(granted) == 20
+    assert max(peak) <= 100
+    assert limiter.used_weight == 100
+    assert limiter.acquire(1, PRIORITY_MARKET, timeout=0) is False
+
+
+def test_orders_keep_headroom_that_market_data_cannot_use():
+    limiter = RateLimiter(weight_limit=100, order_headroom=0.1, clock=minute_clock())
+    limiter.acquire(90, PRIORITY_MARKET)
+    limiter.settle(90)
+
+    assert limiter.acquire(1, PRIORITY_MARKET, timeout=0) is False
+    assert limiter.acquire(1, PRIORITY_ACCOUNT, timeout=0) is False
+    assert limiter.acquire(10, PRIORITY_ORDER, orders=1, timeout=0) is True
+
+
+def test_orders_jump_ahead_of_queued_market_requests():
+    limiter = RateLimiter(weight_limit=10, order_headroom=0, clock=minute_clock())
+    served = []
+
+    # حظر قصير يجمع الطلبات في الطابور
+    limiter.settle(0, headers={"Retry-After": "0.3"}, status=429)
+
+    def worker(name, priority):
+        limiter.acquire(10, priority)
+        served.append(name)
+        # الوزن الكامل يسمح بطلب واحد فقط في كل مرة؛ الترويسة تعيد العداد إلى الصفر
+        limiter.settle(10, headers={"X-MBX-USED-WEIGHT-1M": "0"})
+
+    threads = []
+    for name, priority in [("klines-1", PRIORITY_MARKET), ("klines-2", PRIORITY_MARKET),
+                           ("balance", PRIORITY_ACCOUNT), ("order", PRIORITY_ORDER)]:
+        t = threading.Thread(target=worker, args=(name, priority))
+        t.start()
+        threads.append(t)
+        while sum(limiter.metrics()["queued"].values()) < len(threads):
+            time.sleep(0.001)
+    for t in threads:
+        t.join()
+
+    assert served == ["order", "balance", "klines-1", "klines-2"]
+    assert limiter.metrics()["bans"] == 1
+
+
+def test_settle_follows_exchange_headers_and_metrics():
+    limiter = RateLimiter(weight_limit=2400, clock=minute_clock())
+    limiter.acquire(5, PRIORITY_ORDER, orders=3)
+    assert limiter.metrics()["reserved_weight"] == 5
+    limiter.settle(5, orders=3, headers={"X-MBX-USED-WEIGHT-1M": "700", "X-MBX-ORDER-COUNT-10S": "4",
+                                          "X-MBX-ORDER-COUNT-1M": "9"})
+
+    m = limiter.metrics()
+    assert m["used_weight"] == 700
+    assert m["remaining_weight"] == 1700
+    assert m["reserved_weight"] == 0
+    assert (m["orders_10s"], m["orders_1m"]) == (4, 9)
+    assert (m["calls"], m["total_weight"], m["bans"]) == (1, 5, 0)
+    assert 0 < m["window_reset_in"] <= 60
+
+
+def test_order_count_limit_holds_back_orders():
+    limiter = RateLimiter(orders_per_10s=5, clock=minute_clock())
+    assert limiter.acquire(5, PRIORITY_ORDER, orders=5, timeout=0)
+    limiter.settle(5, orders=5)
+    assert limiter.acquire(1, PRIORITY_ORDER, orders=1, timeout=0) is False
+    # الإلغاء لا يحسب ضمن عدد الأوامر
+    assert limiter.acquire(1, PRIORITY_ORDER, timeout=0) is True
+
+
+class Response:
+    def __init__(self, headers, status_code=200):
+        self.headers = headers
+        self.status_code = status_code
+
+
+class Session:
+    def __init__(self):
+        self.hooks = {"response": []}
+
+    def respond(self, headers):
+        for hook in self.hooks["response"]:
+            hook(Response(headers))
+
+
+class FakeClient:
+    API_URL = "https://api.binance.com/api"
+
+    def __init__(self):
+        self.session = Session()
+        self.calls = []
+
+    def futures_klines(self, **params):
+        self.calls.append(("futures_klines", params))
+        self.session.respond({"X-MBX-USED-WEIGHT-1M": "42"})
+        return []
+
+    def futures_place_batch_order(self, **params):
+        self.calls.append(("futures_place_batch_order", params))
+        self.session.respond({"X-MBX-USED-WEIGHT-1M": "47", "X-MBX-ORDER-COUNT-10S": "3"})
+        return [{}] * len(params["batchOrders"])
+
+
+def test_rate_limited_client_weights_calls_and_reads_headers():
+    limiter = RateLimiter(clock=minute_clock())
+    client = RateLimitedClient(FakeClient(), limiter)
+    client.API_URL = "https://fapi.binance.com"
+    assert client._client.API_URL == "https://fapi.binance.com"
+
+    client.futures_klines(symbol="BTCUSDT", interval="1m", limit=1000)
+    assert limiter.used_weight == 42
+    assert limiter.total_weight == 5
+
+    client.futures_place_batch_order(batchOrders=[{}, {}, {}])
+    m = limiter.metrics()
+    assert (m["used_weight"], m["orders_10s"], m["total_weight"]) == (47, 3, 10)
@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting.backtest_engine import run_backtest
+from reports.report_generator import DAY_MS, MetricsEngine, compute_metrics, equity_metrics
+from strategies import ema_crossover_strategy
+from tests.test_backtest_engine import make_data
+
+T0 = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+
+
+def random_trades(n, seed=0):
+    rng = np.random.default_rng(seed)
+    exit_ts = np.sort(rng.integers(0, 20 * DAY_MS, n)) + T0
+    return {
+        "pnl": rng.normal(0.2, 5, n),
+        "fees": np.full(n, 0.1),
+        "entry_ts": exit_ts - rng.integers(60_000, DAY_MS // 2, n),
+        "exit_ts": exit_ts,
+        "symbol": np.array(["BTCUSDT", "ETHUSDT", "TRXUSDT"], dtype=object)[rng.integers(0, 3, n)],
+        "strategy": np.array([None, "ema", "rsi"], dtype=object)[rng.integers(0, 3, n)],
+    }
+
+
+def reference(trades, balance):
+    """نفس المقاييس بحلقات عادية للمقارنة."""
+    equity, peak, peak_time, worst, longest = balance, balance, trades["entry_ts"].min(), 0.0, 0
+    below = False
+    for pnl, ts in zip(trades["pnl"], trades["exit_ts"]):
+        equity += pnl
+        # المدة من القمة حتى العودة إليها
+        if equity < peak or below:
+            longest = max(longest, ts - peak_time)
+        below = equity < peak
+        if equity >= peak:
+            peak, peak_time = equity, ts
+        worst = max(worst, (peak - equity) / peak)
+
+    covered, reach = 0, None
+    for start, end in sorted(zip(trades["entry_ts"], trades["exit_ts"])):
+        if reach is None or start > reach:
+            covered += end - start
+            reach = end
+        elif end > reach:
+            covered += end - reach
+            reach = end
+
+    days = pd.Series(trades["pnl"], index=pd.to_datetime(trades["exit_ts"], unit="ms")).resample("1D").sum()
+    returns = days / (balance + days.cumsum() - days)
+    return {
+        "max_drawdown_pct": worst * 100,
+        "max_drawdown_days": longest / DAY_MS,
+        "exposure_pct": covered / (trades["exit_ts"].max() - trades["entry_ts"].min()) * 100,
+        "sharpe": returns.mean() / returns.std() * np.sqrt(365),
+        "sortino": returns.mean() / np.sqrt((returns.clip(upper=0) ** 2).mean()) * np.sqrt(365),
+    }
+
+
+def test_metrics_match_a_plain_loop():
+    trades = random_trades(2000)
+    summary = compute_metrics(trades, initial_balance=1000)
+    pnl = trades["pnl"]
+    assert summary["trades"] == 2000
+    assert summary["win_rate"] == pytest.approx((pnl > 0).mean() * 100)
+    assert summary["profit_factor"] == pytest.approx(pnl[pnl > 0].sum() / -pnl[pnl < 0].sum())
+    assert summary["final_balance"] == pytest.approx(1000 + pnl.sum())
+    for name, value in reference(trades, 1000).items():
+        assert summary[name] == pytest.approx(value), name
+
+
+def test_incremental_updates_equal_one_pass_and_breakdowns():
+    trades = random_trades(3000, seed=1)
+    full = MetricsEngine(500).update(trades)
+    engine = MetricsEngine(500)
+    for lo, hi in [(0, 1), (1, 700), (700, 701), (701, 3000)]:
+        engine.update({name: values[lo:hi] for name, values in trades.items()})
+    assert engine.summary() == pytest.approx(full.summary())
+
+    by_strategy = engine.breakdown("strategy")
+    assert by_strategy["key"].tolist() == [None, "ema", "rsi"]
+    for key, count, pnl in zip(by_strategy["key"], by_strategy["trades"], by_strategy["pnl"]):
+        chosen = np.array([label == key for label in trades["strategy"]])
+        assert count == chosen.sum()
+        assert pnl == pytest.approx(trades["pnl"][chosen].sum())
+    by_symbol = engine.breakdown("symbol")
+    assert by_symbol["key"].tolist() == ["BTCUSDT", "ETHUSDT", "TRXUSDT"]
+    assert by_symbol["wins"].sum() == engine.summary()["wins"]
+    with pytest.raises(ValueError):
+        engine.breakdown("timeframe")
+
+
+def test_backtest_trades_and_equity_curve():
+    data = make_data(3000, seed=6)
+    result = run_backtest(data, ema_crossover_strategy.Strategy("BTCUSDT", "1m"), initial_balance=1000)
+    trades, equity, summary = result["trades"], result["equity"], result["summary"]
+
+    metrics = compute_metrics(trades, initial_balance=1000)
+    for name in ("trades", "wins", "losses", "win_rate", "net_profit", "total_fees", "profit_factor"):
+        assert metrics[name] == pytest.approx(summary[name]), name
+    assert 0 < metrics["exposure_pct"] <= 100
+
+    curve = equity_metrics(equity)
+    assert curve["max_drawdown_pct"] == pytest.approx(summary["max_drawdown_pct"])
+    assert curve["return_pct"] == pytest.approx(summary["return_pct"])
+    # رصيد ثابت بين الصفقات فقط
+    assert 0 < curve["exposure_pct"] < 100
+    assert equity_metrics(np.array([100.0, 90.0, 95.0, 100.0, 80.0]))["max_drawdown_duration"] == 3
@@ -0,0 +1,104 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core.mock_exchange import MockExchange
+from core.resampler import CandleResampler, ResampledKlineStream
+
+# 2024-01-01 13:00:00 UTC
+TOP_OF_HOUR = 1_704_114_000_000
+MINUTE = 60_000
+
+
+def minute_rows(start, n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    open_ = np.roll(close, 1)
+    open_[0] = close[0]
+    spread = close * rng.uniform(0, 0.003, n)
+    times = start + MINUTE * np.arange(n)
+    return np.column_stack([times, open_, np.maximum(open_, close) + spread, np.minimum(open_, close) - spread,
+                            close, rng.uniform(1, 10, n), times + MINUTE - 1])
+
+
+def pandas_resample(rows, rule):
+    data = pd.DataFrame(rows[:, 1:6], columns=["open", "high", "low", "close", "volume"],
+                        index=pd.to_datetime(rows[:, 0].astype(np.int64), unit="ms"))
+    return data.resample(rule).agg({"open": "first", "high": "max", "low": "min", "close": "last",
+                                    "volume": "sum"}).dropna()
+
+
+def test_incremental_candles_match_pandas_resample_and_report_closes():
+    # تبدأ السلسلة في منتصف شمعة الساعة وشمعة 15m
+    rows = minute_rows(TOP_OF_HOUR - 7 * MINUTE, 200)
+    resampler = CandleResampler(["5m", "15m", "1h"], window=100)
+    closes = [(int(row[0]), resampler.add("btcusdt", row)) for row in rows]
+
+    # أول شمعة مكتملة لكل فريم
+    first = {"5m": TOP_OF_HOUR - 5 * MINUTE, "15m": TOP_OF_HOUR, "1h": TOP_OF_HOUR}
+    for interval, rule in [("5m", "5min"), ("15m", "15min"), ("1h", "1h")]:
+        expected = pandas_resample(rows, rule)
+        expected = expected[expected.index >= pd.Timestamp(first[interval], unit="ms")]
+        got = resampler.frame("BTCUSDT", interval)
+        assert list(got.index) == list(expected.index)
+        np.testing.assert_allclose(got.to_numpy(), expected.to_numpy())
+
+    close_ms = {t + MINUTE: intervals for t, intervals in closes if intervals}
+    assert close_ms[TOP_OF_HOUR + 15 * MINUTE] == ["5m", "15m"]
+    assert close_ms[TOP_OF_HOUR + 60 * MINUTE] == ["5m", "15m", "1h"]
+    # مكررة أو أقدم: تُتجاهل
+    assert resampler.add("BTCUSDT", rows[10]) == []
+    assert resampler.extend("BTCUSDT", rows) == []
+
+
+def test_seed_keeps_exchange_history_until_base_series_takes_over():
+    rows = minute_rows(TOP_OF_HOUR - 60 * MINUTE, 150, seed=1)
+    exchange_1h = pandas_resample(rows, "1h")
+    open_times = exchange_1h.index.as_unit("ms").asi8
+    # سجل المنصة يحتوي أيضًا الشمعة الجارية، ويجب ألا تُستخدم
+    history = np.column_stack([open_times, exchange_1h.to_numpy(), open_times + 3_600_000 - 1])
+
+    resampler = CandleResampler(["1h"])
+    base = rows[45:]
+    resampler.seed("BTCUSDT", base, {"1h": history})
+    got = resampler.rows("BTCUSDT", "1h")
+    # الساعة الأولى من المنصة، والتالية من الدقائق (تبدأ عند رأس الساعة)
+    assert list(got[:, 0]) == [TOP_OF_HOUR - 3_600_000, TOP_OF_HOUR, TOP_OF_HOUR + 3_600_000]
+    np.testing.assert_allclose(got[:2, 1:6], history[:2, 1:6])
+    np.testing.assert_allclose(got[2, 1:6], pandas_resample(rows, "1h").to_numpy()[2])
+
+    resampler.extend("BTCUSDT", minute_rows(TOP_OF_HOUR + 150 * MINUTE, 3, seed=2))
+    assert resampler.last_base_time("btcusdt") == TOP_OF_HOUR + 152 * MINUTE
+
+
+def test_stream_subscribes_once_per_symbol_and_emits_higher_closes():
+    exchange = MockExchange({"BTCUSDT": np.linspace(100, 111, 12), "ETHUSDT": np.linspace(10, 21, 12)},
+                            start_time=TOP_OF_HOUR - 2 * MINUTE)
+    url = exchange.serve()
+    seen = []
+    done = threading.Event()
+
+    def on_candle_close(symbol, interval, data):
+        seen.append((symbol, interval, data.index[-1], float(data["close"].iloc[-1])))
+        if sum(interval == "5m" for _, interval, _, _ in seen) == 4:
+            done.set()
+
+    pairs = [("BTCUSDT", "5m"), ("BTCUSDT", "1m"), ("ETHUSDT", "5m")]
+    stream = ResampledKlineStream(pairs, on_candle_close, CandleResampler(["5m"]), base_url=url)
+    assert stream.pairs == [("BTCUSDT", "1m"), ("ETHUSDT", "1m")]
+    stream.start()
+    try:
+        assert stream.connected.wait(5)
+        exchange.step(12)
+        assert done.wait(5)
+    finally:
+        stream.stop()
+        exchange.close()
+
+    btc_5m = [(t, c) for s, i, t, c in seen if (s, i) == ("BTCUSDT", "5m")]
+    # أول دقيقتين قبل رأس الساعة لا تكفيان لشمعة 5m كاملة
+    assert btc_5m == [(pd.Timestamp(TOP_OF_HOUR, unit="ms"), 106.0),
+                      (pd.Timestamp(TOP_OF_HOUR + 5 * MINUTE, unit="ms"), 111.0)]
+    assert len([1 for s, i, _, _ in seen if (s, i) == ("BTCUSDT", "1m")]) == 12
+    assert not any(s == "ETHUSDT" and i == "1m" for s, i, _, _ in seen)
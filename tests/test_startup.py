@@ -0,0 +1,114 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# أقصى زمن مقبول لاستيراد وحدات التداول (pandas و python-binance وحدهما يأخذان معظمه)
+IMPORT_BUDGET = 5.0
+
+TRADING_MODULES = [
+    "core.binance_api",
+    "market_data",
+    "strategies.capital_manager",
+    "strategies.trade_executor",
+    "strategies.strategy_engine",
+]
+
+# يمنع أي اتصال شبكي ثم يستورد الوحدات ويطبع الزمن
+OFFLINE_IMPORT = """
+import importlib, socket, sys, time
+
+def offline(*args, **kwargs):
+    raise OSError("network access during import")
+
+socket.socket.connect = offline
+socket.create_connection = offline
+socket.getaddrinfo = offline
+
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+    if name == "strategies.ai_strategies":
+        from strategies.ai_strategies import list_available_strategies
+        for strategy in list_available_strategies():
+            importlib.import_module(f"strategies.{strategy}")
+print(time.perf_counter() - start)
+"""
+
+
+def import_offline(*modules):
+    result = subprocess.run([sys.executable, "-c", OFFLINE_IMPORT, *modules],
+                            cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def test_trading_modules_import_offline_within_budget():
+    elapsed = import_offline(*TRADING_MODULES, "strategies.ai_strategies")
+    assert elapsed < IMPORT_BUDGET
+
+
+def test_main_imports_offline_within_budget():
+    pytest.importorskip("PyQt5")
+    pytest.importorskip("telegram")
+    assert import_offline("main") < IMPORT_BUDGET
+
+
+def test_client_factory_is_lazy_and_swappable():
+    from core import binance_api
+
+    class FakeClient:
+        def futures_symbol_ticker(self, symbol):
+            return {"symbol": symbol, "price": "123.5"}
+
+    created = []
+
+    def factory():
+        created.append(FakeClient())
+        return created[-1]
+
+    binance_api.set_client_factory(factory)
+    try:
+        assert created == []
+        assert binance_api.get_price("NOMARKUSDT") == 123.5
+        assert binance_api.get_price("NOMARKUSDT") == 123.5
+        assert len(created) == 1
+        assert binance_api.get_client() is created[0]
+    finally:
+        binance_api.set_client_factory(None)
+
+
+def pinned_version(package):
+    with open(os.path.join(ROOT, "requirements.txt")) as f:
+        for line in f:
+            name, _, version = line.strip().partition("==")
+            if name == package:
+                return version
+    return None
+
+
+def test_default_factory_builds_with_the_pinned_python_binance(monkeypatch):
+    from core import binance_api
+
+    class PinnedClient:
+        # نفس توقيع Client.__init__ في python-binance 1.0.16 (لا يقبل ping)
+        def __init__(self, api_key=None, api_secret=None, requests_params=None, tld="com", testnet=False):
+            self.testnet = testnet
+
+    class NewerClient:
+        def __init__(self, api_key=None, api_secret=None, requests_params=None, tld="com", testnet=False,
+                     private_key=None, private_key_pass=None, ping=True):
+            self.testnet, self.ping = testnet, ping
+
+    assert pinned_version("python-binance") == "1.0.16"
+    monkeypatch.setattr(binance_api, "get_config",
+                        lambda: {"api_key": "key", "api_secret": "secret", "use_testnet": True})
+    monkeypatch.setattr(binance_api, "Client", PinnedClient)
+    assert binance_api.create_client()._client.testnet is True
+
+    monkeypatch.setattr(binance_api, "Client", NewerClient)
+    client = binance_api.create_client()._client
+    assert client.ping is False and client.testnet is True
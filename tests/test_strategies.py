@@ -0,0 +1,93 @@
+import importlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategies.base_strategy import BaseStrategy
+from strategies.indicators import IndicatorCache
+from strategies import macd_strategy, rsi_macd_strategy, rsi_strategy
+
+
+def make_data(n=300, seed=1):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.7, n)
+    high = np.maximum(open_, close) + rng.random(n)
+    low = np.minimum(open_, close) - rng.random(n)
+    volume = rng.lognormal(3, 0.8, n)
+    index = pd.date_range("2024-01-01", periods=n, freq="min", name="timestamp")
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume}, index=index)
+
+
+def test_shared_indicator_cache_computes_each_series_once_per_candle():
+    cache = IndicatorCache()
+    strategies = [module.Strategy("BTCUSDT", "15m") for module in (rsi_strategy, rsi_macd_strategy, macd_strategy)]
+    for strategy in strategies:
+        strategy.indicators = cache
+
+    data = make_data()
+    for strategy in strategies:
+        strategy.should_enter_trade(data)
+        strategy.should_exit_trade(data)
+    # rsi(14), macd(12/26/9), sma(20)
+    assert cache.misses == 3
+    assert cache.hits == 4
+
+    newer = make_data(301)
+    strategies[0].should_enter_trade(newer)
+    assert cache.misses == 4
+
+
+def reference_levels(highs, lows, window):
+    # الحلقة الأصلية قبل التحويل إلى NumPy
+    support, resistance = [], []
+    for i in range(window, len(highs) - window):
+        if all(lows[i] < lows[i - j] and lows[i] < lows[i + j] for j in range(1, window)):
+            support.append((i, lows[i]))
+        if all(highs[i] > highs[i - j] and highs[i] > highs[i + j] for j in range(1, window)):
+            resistance.append((i, highs[i]))
+    return support, resistance
+
+
+def test_vectorized_levels_match_reference_loop():
+    from strategies.support_resistance_strategy import Strategy
+
+    data = make_data(n=500, seed=3)
+    highs = data["high"].round(1).values
+    lows = data["low"].round(1).values
+    for window in (1, 2, 3, 5, 8):
+        strategy = Strategy("BTCUSDT", "15m", {"window": window})
+        assert strategy.detect_levels(highs, lows) == reference_levels(highs, lows, window)
+
+
+def test_level_index_nearest():
+    from strategies.support_resistance_strategy import LevelIndex
+
+    index = LevelIndex([105.0, 95.0, 100.0])
+    assert index.nearest(101.0) == 100.0
+    assert index.nearest(90.0) == 95.0
+    assert index.nearest(200.0) == 105.0
+    assert index.is_near(100.05, 0.001)
+    assert not LevelIndex([]).is_near(100.0, 0.001)
+
+
+SHIPPED_STRATEGIES = [
+    "bollinger_strategy", "breakout_strategy", "ema_crossover_strategy", "macd_strategy",
+    "moving_average_bounce_strategy", "price_action_strategy", "rsi_macd_strategy", "rsi_strategy",
+    "scalping_fast", "scalping_normal", "stochastic_strategy", "support_resistance_strategy",
+    "volume_spike_strategy",
+]
+
+
+@pytest.mark.parametrize("name", SHIPPED_STRATEGIES)
+@pytest.mark.parametrize("seed", [1, 2])
+def test_vectorized_signals_match_bar_by_bar(name, seed):
+    strategy = importlib.import_module(f"strategies.{name}").Strategy("BTCUSDT", "15m")
+    data = make_data(n=300, seed=seed)
+
+    vectorized = strategy.generate_signals(data)
+    looped = BaseStrategy.generate_signals(strategy, data)
+
+    for key in ("action", "confidence", "exit", "exit_confidence"):
+        np.testing.assert_array_equal(vectorized[key], looped[key], err_msg=f"{name}: {key}")
@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+
+from core.symbol_info import SymbolInfo, DEFAULT_PAIRS
+
+
+def exchange_info():
+    def symbol(name, quote, step, tick, notional, status="TRADING"):
+        return {
+            "symbol": name, "status": status, "baseAsset": name[:-len(quote)], "quoteAsset": quote,
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": "0.0001", "maxPrice": "100000", "tickSize": tick},
+                {"filterType": "LOT_SIZE", "minQty": step, "maxQty": "10000000", "stepSize": step},
+                {"filterType": "MIN_NOTIONAL", "notional": notional},
+            ],
+        }
+
+    return {"symbols": [
+        symbol("BTCUSDT", "USDT", "0.001", "0.10", "100"),
+        symbol("TRXUSDT", "USDT", "1", "0.00001", "5"),
+        symbol("ETHBUSD", "BUSD", "0.001", "0.01", "5"),
+        symbol("OLDUSDT", "USDT", "1", "0.0001", "5", status="SETTLING"),
+    ]}
+
+
+class Counter:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def test_lookups_rounding_and_filters(tmp_path):
+    brackets = Counter([{"symbol": "BTCUSDT", "brackets": [{"initialLeverage": 125}, {"initialLeverage": 50}]}])
+    info = SymbolInfo(Counter(exchange_info()), brackets, path=str(tmp_path / "info.json"))
+
+    assert info.symbols() == ["BTCUSDT", "TRXUSDT"]
+    assert info.max_leverage("BTCUSDT") == 125
+    assert info.max_leverage("TRXUSDT") is None
+    assert info.get("btcusdt")["step_size"] == 0.001
+
+    assert info.round_quantity("BTCUSDT", 0.0129999) == 0.012
+    assert info.round_quantity("BTCUSDT", 0.3) == 0.3
+    assert info.round_quantity("TRXUSDT", 1234.99) == 1234.0
+    assert info.round_price("BTCUSDT", 65432.16) == 65432.2
+    assert info.round_price("BTCUSDT", 65432.16, mode="floor") == 65432.1
+    assert info.round_price("TRXUSDT", 0.1234567) == 0.12346
+    np.testing.assert_array_equal(
+        info.round_quantity("BTCUSDT", np.array([0.0019, 1.23456, 0.7])), [0.001, 1.234, 0.7])
+    assert info.round_quantity("NOPE", 1.0) is None
+
+    assert info.check_order("BTCUSDT", 0.001, 65000) is not None
+    assert info.check_order("BTCUSDT", 0.002, 65000) is None
+    assert info.check_order("TRXUSDT", 0.5, 0.1) is not None
+
+
+def test_persisted_copy_is_reused_until_it_expires(tmp_path):
+    path = str(tmp_path / "info.json")
+    fetch = Counter(exchange_info())
+    SymbolInfo(fetch, None, path=path).symbols()
+    assert fetch.calls == 1
+    assert "BTCUSDT" in json.load(open(path))["symbols"]
+
+    # تشغيل جديد يقرأ الملف دون طلب
+    again = SymbolInfo(fetch, None, path=path)
+    assert again.get("TRXUSDT")["tick_size"] == 0.00001
+    assert fetch.calls == 1
+
+    expired = SymbolInfo(fetch, None, path=path, max_age=0)
+    expired.get("BTCUSDT")
+    assert fetch.calls == 2
+
+
+def test_failed_refresh_keeps_stale_copy_and_gui_fallback(tmp_path):
+    path = str(tmp_path / "info.json")
+    SymbolInfo(Counter(exchange_info()), None, path=path).symbols()
+
+    failing = Counter(ConnectionError("offline"))
+    stale = SymbolInfo(failing, None, path=path, max_age=0)
+    assert stale.get("BTCUSDT") is not None
+    stale.get("TRXUSDT")
+    # لا إعادة محاولة فورية بعد الفشل
+    assert failing.calls == 1
+
+    empty = SymbolInfo(failing, None, path=str(tmp_path / "missing.json"))
+    assert empty.pair_list() == DEFAULT_PAIRS
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from core.trade_manager import DAY_MS, TradeJournal
+
+T0 = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = TradeJournal(str(tmp_path / "journal.db"), batch_size=10, flush_interval=60)
+    yield journal
+    journal.close()
+
+
+def test_fills_become_round_trips_attributed_to_the_signal(journal):
+    journal.record_signal("btcusdt", "RSIStrategy", "BUY", 100, timeframe="15m", sl=95, tp=110, ts=T0)
+    assert journal.record_fill("BTCUSDT", 1, "BUY", 1, 100, fee=0.1, ts=T0 + 1) == []
+    journal.record_fill("BTCUSDT", 2, "BUY", 1, 102, fee=0.1, ts=T0 + 2)
+    # البيع 3 يغلق الشراء 2 ويفتح مركز بيع بالباقي
+    closed = journal.record_fill("BTCUSDT", 3, "SELL", 3, 105, fee=0.3, ts=T0 + 3)
+    assert closed == [("BTCUSDT", "RSIStrategy", "BUY", T0 + 1, T0 + 3, 2, 101, 105, 8, pytest.approx(0.4))]
+    assert journal.open_positions()["BTCUSDT"]["open"] == 1
+
+    # PnL المنصة يُستخدم كما هو عند توفره
+    journal.record_fill("BTCUSDT", 4, "BUY", 1, 104, realized_pnl=0.9, ts=T0 + 4)
+    positions = journal.query("positions")
+    assert list(positions["side"]) == ["BUY", "SELL"]
+    assert positions["pnl"].tolist() == [8, 0.9]
+    assert positions["exit_ts"].dtype == np.int64
+
+    fills = journal.query("fills", symbol="BTCUSDT", columns=("order_id", "quantity"))
+    assert fills["order_id"].tolist() == [1, 2, 3, 4]
+    signals = journal.frame("signals")
+    assert signals.loc[0, "strategy"] == "RSIStrategy" and signals.loc[0, "tp"] == 110
+
+
+def test_order_updates_upsert_and_trades_are_journaled(journal):
+    def event(status, execution, last_qty="0", rp="0"):
+        return {"e": "ORDER_TRADE_UPDATE", "T": T0, "o": {
+            "s": "ETHUSDT", "i": 7, "S": "BUY", "o": "LIMIT", "q": "2", "p": "50", "ap": "0", "sp": "0",
+            "x": execution, "X": status, "l": last_qty, "L": "50", "n": "0.02", "T": T0, "rp": rp}}
+
+    journal.on_order_update(event("NEW", "NEW"))
+    journal.on_order_update(event("PARTIALLY_FILLED", "TRADE", "1"))
+    journal.on_order_update(event("FILLED", "TRADE", "1"))
+    orders = journal.query("orders")
+    assert orders["status"].tolist() == ["FILLED"]
+    assert journal.query("fills")["quantity"].tolist() == [1, 1]
+    assert journal.open_positions()["ETHUSDT"]["quantity"] == 2
+
+
+def test_analytics_match_sql_and_survive_a_restart(tmp_path):
+    path = str(tmp_path / "journal.db")
+    journal = TradeJournal(path, batch_size=100)
+    rng = np.random.default_rng(0)
+    pnl = rng.normal(0, 5, 300)
+    for i in range(300):
+        journal.record_position(f"SYM{i % 3}USDT", "BUY" if i % 2 else "SELL", 1, 100, 100 + pnl[i], float(pnl[i]),
+                                T0 + i * DAY_MS // 10 - 1, T0 + i * DAY_MS // 10, fees=0.1,
+                                strategy=None if i % 5 == 0 else f"s{i % 4}")
+
+    cached = journal.positions(symbol="sym1usdt", start=T0 + DAY_MS, end=T0 + 20 * DAY_MS)
+    sql = journal.query("positions", symbol="SYM1USDT", start=T0 + DAY_MS, end=T0 + 20 * DAY_MS)
+    for name in sql:
+        assert cached[name].tolist() == sql[name].tolist()
+
+    daily = journal.daily_pnl()
+    assert daily["day"].tolist() == [T0 + d * DAY_MS for d in range(30)]
+    assert daily["trades"].tolist() == [10] * 30
+    assert daily["pnl"] == pytest.approx([pnl[d * 10:(d + 1) * 10].sum() for d in range(30)])
+
+    by_strategy = journal.breakdown("strategy")
+    assert by_strategy["key"].tolist() == [None, "s0", "s1", "s2", "s3"]
+    assert by_strategy["trades"].sum() == 300
+    assert by_strategy["wins"].sum() == (pnl > 0).sum()
+    journal.close()
+
+    restarted = TradeJournal(path)
+    restarted.record_position("SYM9USDT", "BUY", 1, 100, 101, 1.0, T0, T0 + 31 * DAY_MS, strategy="s9")
+    assert restarted.breakdown("symbol")["key"].tolist() == ["SYM0USDT", "SYM1USDT", "SYM2USDT", "SYM9USDT"]
+    assert len(restarted.positions()["pnl"]) == 301
+    assert restarted.positions(strategy="s9")["symbol"].tolist() == ["SYM9USDT"]
+    restarted.close()
+
+
+def test_open_round_trips_survive_a_restart(tmp_path):
+    path = str(tmp_path / "journal.db")
+    journal = TradeJournal(path)
+    journal.record_signal("BTCUSDT", "RSIStrategy", "BUY", 100, ts=T0)
+    journal.record_fill("BTCUSDT", 1, "BUY", 1, 100, fee=0.1, ts=T0 + 1)
+    journal.record_fill("BTCUSDT", 2, "SELL", 1, 101, fee=0.1, ts=T0 + 2)
+    journal.record_fill("BTCUSDT", 3, "BUY", 2, 100, fee=0.2, ts=T0 + 3)
+    journal.record_fill("BTCUSDT", 4, "SELL", 3, 105, fee=0.3, ts=T0 + 4)
+    journal.record_fill("ETHUSDT", 5, "BUY", 2, 50, ts=T0 + 5, strategy="ema")
+    journal.record_fill("ETHUSDT", 6, "SELL", 1, 55, ts=T0 + 6)
+    before = journal.open_positions()
+    journal.close()
+
+    restarted = TradeJournal(path)
+    after = restarted.open_positions()
+    assert set(after) == {"BTCUSDT", "ETHUSDT"}
+    for symbol in after:
+        assert after[symbol].keys() == before[symbol].keys()
+        for key, value in before[symbol].items():
+            assert after[symbol][key] == (pytest.approx(value) if isinstance(value, float) else value), key
+
+    # إغلاق البيع المفتوح قبل إعادة التشغيل، لا مركز شراء جديد
+    closed = restarted.record_fill("BTCUSDT", 7, "BUY", 1, 104, ts=T0 + 7)
+    assert closed == [("BTCUSDT", "RSIStrategy", "SELL", T0 + 4, T0 + 7, 1, 105, 104, 1, pytest.approx(0.1))]
+    closed = restarted.record_fill("ETHUSDT", 8, "SELL", 1, 60, ts=T0 + 8)
+    assert closed == [("ETHUSDT", "ema", "BUY", T0 + 5, T0 + 8, 2, 50, 57.5, 15, 0)]
+    assert restarted.open_positions() == {}
+    restarted.close()